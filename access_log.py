@@ -0,0 +1,272 @@
+"""
+Structured access logs written off the request thread.
+
+Each request becomes one JSON line (method, path, status, latency, user
+role, SQL statement count, ...). The request thread only appends a tuple
+to a bounded in-memory queue; a writer thread wakes every `interval`
+seconds, turns whatever is queued into JSON and appends it to a rotating
+file in one write. If the writer falls behind, records are dropped and
+counted rather than blocking requests.
+
+Successful GETs are logged in full up to `get_budget` per second; past
+that they are sampled at `sample_rate` and carry `"sample": 1/rate` so
+counts can be re-weighted. Errors and writes are always logged.
+
+Several gunicorn workers can share one file: lines are appended with one
+write per batch, and rotation happens under a lock file, with every
+worker reopening the file once it has been rotated.
+
+    ACCESS_LOG_FILE=logs/access.log   (empty to disable)
+    ACCESS_LOG_MAX_BYTES=10485760  ACCESS_LOG_BACKUPS=5
+    ACCESS_LOG_GET_BUDGET=20  ACCESS_LOG_SAMPLE_RATE=0.1
+"""
+import atexit
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+from flask import _app_ctx_stack, _request_ctx_stack, g, has_app_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: single process, no lock needed
+    fcntl = None
+
+QUEUE_SIZE = 10000
+FIELDS = ("ts", "method", "path", "status", "latency_ms", "sql", "bytes", "role", "user_id", "ip", "pid", "sample")
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    if has_app_context():
+        g.sql_count = g.get("sql_count", 0) + 1
+
+
+def _role(ctx):
+    # Only report a user flask-login has already loaded for this request;
+    # looking one up here would cost a query on every public route
+    user = getattr(ctx, "user", None)
+    if user is None or not getattr(user, "is_authenticated", False):
+        return None, None
+    return type(user).__name__.lower(), user.id
+
+
+class RotatingWriter:
+    """Appends batches to `path`, rotating to path.1 .. path.N at `max_bytes`."""
+
+    def __init__(self, path, max_bytes=10 * 1024 * 1024, backups=5):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._stream = None
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _open(self):
+        if self._stream is not None:
+            self._stream.close()
+        self._stream = open(self.path, "ab")
+
+    def _moved(self):
+        # Another worker rotated the file out from under us
+        try:
+            return os.stat(self.path).st_ino != os.fstat(self._stream.fileno()).st_ino
+        except FileNotFoundError:
+            return True
+
+    @contextmanager
+    def _locked(self):
+        if fcntl is None:
+            yield
+            return
+        with open(self.path + ".lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _rollover(self):
+        for i in range(self.backups - 1, 0, -1):
+            source = f"{self.path}.{i}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{i + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._open()
+
+    def write(self, data):
+        if self._stream is None or self._moved():
+            self._open()
+        if self.max_bytes and os.fstat(self._stream.fileno()).st_size + len(data) > self.max_bytes:
+            with self._locked():
+                if self._moved():
+                    self._open()
+                if os.fstat(self._stream.fileno()).st_size + len(data) > self.max_bytes:
+                    self._rollover()
+        self._stream.write(data)
+        self._stream.flush()
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+
+class AccessLog:
+    def __init__(self, writer, get_budget=20, sample_rate=0.1, interval=0.5, queue_size=QUEUE_SIZE):
+        self.writer = writer
+        self.get_budget = get_budget
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.queue_size = queue_size
+        self.dropped = 0
+        # deque.append/popleft are atomic, so the request thread takes no lock
+        self._queue = deque()
+        self._wake = threading.Event()
+        self._idle = threading.Event()
+        self._stopping = False
+        self._second = 0
+        self._gets = 0
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        app.before_request(self._start)
+        app.after_request(self._finish)
+
+    def _start(self):
+        g.access_started = time.perf_counter()
+        g.sql_count = 0
+
+    def _keep(self, method, status):
+        """Returns the sample weight to log with, or None to skip."""
+        if method != "GET" or status >= 400:
+            return 1
+        second = int(time.monotonic())
+        if second != self._second:
+            self._second, self._gets = second, 0
+        self._gets += 1
+        if self._gets <= self.get_budget:
+            return 1
+        if random.random() < self.sample_rate:
+            return round(1 / self.sample_rate, 2)
+        return None
+
+    def _finish(self, response):
+        # Resolve the context locals once; every proxy lookup costs a few us
+        ctx = _request_ctx_stack.top
+        req = ctx.request
+        weight = self._keep(req.method, response.status_code)
+        if weight is None:
+            return response
+        role, user_id = _role(ctx)
+        request_g = _app_ctx_stack.top.g
+        started = getattr(request_g, "access_started", None)
+        self.record((
+            time.time(),
+            req.method,
+            req.path,
+            response.status_code,
+            round((time.perf_counter() - started) * 1000, 2) if started else None,
+            getattr(request_g, "sql_count", 0),
+            response.calculate_content_length(),
+            role,
+            user_id,
+            req.remote_addr,
+            os.getpid(),
+            weight if weight != 1 else None,
+        ))
+        return response
+
+    def record(self, entry):
+        """Queue one entry: a FIELDS tuple or a ready dict."""
+        if len(self._queue) >= self.queue_size:
+            self.dropped += 1
+            return
+        self._queue.append(entry)
+        if self._thread is None or not self._thread.is_alive():
+            self._start_thread()
+
+    def _start_thread(self):
+        # Started lazily so each gunicorn worker gets its own writer after fork
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name="access-log", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _line(self, entry):
+        if isinstance(entry, tuple):
+            entry = dict(zip(FIELDS, entry))
+            if entry["sample"] is None:
+                del entry["sample"]
+        entry["ts"] = datetime.utcfromtimestamp(entry["ts"]).isoformat() + "Z"
+        return json.dumps(entry, separators=(",", ":")) + "\n"
+
+    def _drain(self):
+        lines = []
+        while self._queue:
+            lines.append(self._line(self._queue.popleft()))
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            lines.append(self._line({"ts": time.time(), "dropped": dropped, "pid": os.getpid()}))
+        if lines:
+            try:
+                self.writer.write("".join(lines).encode("utf-8"))
+            except OSError as e:
+                print(f"Access log write failed: {e}")
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self._idle.clear()
+            self._drain()
+            self._idle.set()
+            if self._stopping:
+                self.writer.close()
+                return
+
+    def flush(self, timeout=5):
+        """Wait until everything queued so far has been written."""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        deadline = time.monotonic() + timeout
+        while self._queue and time.monotonic() < deadline:
+            self._idle.clear()
+            self._wake.set()
+            self._idle.wait(deadline - time.monotonic())
+
+    def close(self, timeout=2):
+        if self._thread is not None and self._thread.is_alive():
+            self._stopping = True
+            self._wake.set()
+            self._thread.join(timeout)
+
+
+def make_access_log(path=None):
+    path = os.environ.get("ACCESS_LOG_FILE", "logs/access.log") if path is None else path
+    if not path:
+        return None
+    writer = RotatingWriter(
+        path,
+        max_bytes=int(os.environ.get("ACCESS_LOG_MAX_BYTES", 10 * 1024 * 1024)),
+        backups=int(os.environ.get("ACCESS_LOG_BACKUPS", 5))
+    )
+    return AccessLog(
+        writer,
+        get_budget=int(os.environ.get("ACCESS_LOG_GET_BUDGET", 20)),
+        sample_rate=float(os.environ.get("ACCESS_LOG_SAMPLE_RATE", 0.1))
+    )
@@ -0,0 +1,131 @@
+"""
+Ledger analytics for the admin dashboard.
+
+Every total is a GROUP BY over point_transactions run by the database;
+Python only sees the (small) grouped rows. Running totals use a window
+function when the database has them (Postgres, SQLite >= 3.25) and are
+summed over the grouped rows otherwise.
+"""
+import sqlite3
+
+from sqlalchemy import Integer, case, func
+
+from models import Admin, House, PointTransaction
+
+PERIODS = ("day", "week", "month")
+SQLITE_FORMATS = {"day": "%Y-%m-%d", "month": "%Y-%m"}
+REASON_LIMIT = 50
+
+
+def period_bucket(column, period, dialect):
+    """Period key for `column`; weeks are ISO weeks ("2026-W01") on every database."""
+    if dialect == "postgresql":
+        return func.to_char(
+            func.date_trunc(period, column),
+            {"day": "YYYY-MM-DD", "week": 'IYYY-"W"IW', "month": "YYYY-MM"}[period]
+        )
+    if period == "week":
+        # SQLite has no ISO week: the Thursday of the week decides its year and number
+        thursday = func.date(column, "-3 days", "weekday 4")
+        day_of_year = func.cast(func.strftime("%j", thursday), Integer)
+        return func.printf("%s-W%02d", func.strftime("%Y", thursday), (day_of_year - 1) / 7 + 1)
+    return func.strftime(SQLITE_FORMATS[period], column)
+
+
+def supports_windows(dialect):
+    if dialect == "sqlite":
+        return sqlite3.sqlite_version_info >= (3, 25, 0)
+    return True
+
+
+def _totals():
+    awarded = func.sum(case((PointTransaction.points_change > 0, PointTransaction.points_change), else_=0))
+    deducted = func.sum(case((PointTransaction.points_change < 0, -PointTransaction.points_change), else_=0))
+    return (
+        func.count(PointTransaction.id).label("transactions"),
+        awarded.label("awarded"),
+        deducted.label("deducted"),
+        func.sum(PointTransaction.points_change).label("net"),
+    )
+
+
+def _numbers(row):
+    return {
+        "transactions": row.transactions,
+        "awarded": int(row.awarded or 0),
+        "deducted": int(row.deducted or 0),
+        "net": int(row.net or 0),
+    }
+
+
+def ledger_analytics(session, period="week", since=None, until=None):
+    dialect = session.connection().dialect.name
+    filters = []
+    if since is not None:
+        filters.append(PointTransaction.timestamp >= since)
+    if until is not None:
+        filters.append(PointTransaction.timestamp < until)
+
+    by_house = (
+        session.query(House.id, House.name, *_totals())
+        .join(PointTransaction, PointTransaction.house_id == House.id)
+        .filter(*filters)
+        .group_by(House.id, House.name)
+        .order_by(func.sum(PointTransaction.points_change).desc())
+        .all()
+    )
+
+    admin_totals = (
+        session.query(PointTransaction.admin_id, *_totals())
+        .filter(*filters)
+        .group_by(PointTransaction.admin_id)
+        .subquery()
+    )
+    by_admin = (
+        session.query(admin_totals, Admin.name)
+        .outerjoin(Admin, Admin.id == admin_totals.c.admin_id)
+        .order_by(admin_totals.c.transactions.desc())
+        .all()
+    )
+
+    by_reason = (
+        session.query(PointTransaction.reason, *_totals())
+        .filter(*filters)
+        .group_by(PointTransaction.reason)
+        .order_by(func.count(PointTransaction.id).desc())
+        .limit(REASON_LIMIT)
+        .all()
+    )
+
+    bucket = period_bucket(PointTransaction.timestamp, period, dialect).label("period")
+    period_totals = (
+        session.query(bucket, *_totals())
+        .filter(*filters)
+        .group_by(bucket)
+        .subquery()
+    )
+    if supports_windows(dialect):
+        running = func.sum(period_totals.c.net).over(order_by=period_totals.c.period)
+        by_period = (
+            session.query(period_totals, running.label("running_net"))
+            .order_by(period_totals.c.period)
+            .all()
+        )
+        periods = [dict(_numbers(r), period=r.period, running_net=int(r.running_net or 0)) for r in by_period]
+    else:
+        running_net = 0
+        periods = []
+        for r in session.query(period_totals).order_by(period_totals.c.period).all():
+            running_net += int(r.net or 0)
+            periods.append(dict(_numbers(r), period=r.period, running_net=running_net))
+
+    return {
+        "period": period,
+        "by_house": [dict(_numbers(r), house={"id": r.id, "name": r.name}) for r in by_house],
+        "by_admin": [
+            dict(_numbers(r), admin={"id": r.admin_id, "name": r.name})
+            for r in by_admin
+        ],
+        "by_reason": [dict(_numbers(r), reason=r.reason) for r in by_reason],
+        "by_period": periods,
+    }
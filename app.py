@@ -1,11 +1,14 @@
 import os
+import base64
+import math
+import threading
 from flask import Flask, redirect, abort, request, jsonify
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 from werkzeug.security import check_password_hash
 from flask_migrate import Migrate
 from functools import wraps
 from flask_cors import CORS
-from models import Announcement, PointTransaction, db, Admin, House, Captain, Member, Achievement
+from models import Announcement, PointTransaction, PointTransactionArchive, db, Admin, House, Captain, Member, Achievement, Advisor, Event, ScoreSubmission, Season, ScoringRule, SyncTombstone
 from werkzeug.middleware.proxy_fix import ProxyFix
 from datetime import datetime
 from dotenv import load_dotenv
@@ -13,6 +16,33 @@ from werkzeug.utils import secure_filename
 import cloudinary
 import cloudinary.uploader
 from cloudinary.utils import cloudinary_url
+from sqlalchemy import func, select
+from live_updates import InProcessNotifier, StandingsFeed, make_notifier
+from standings import StandingsEngine, next_version
+from cache_bus import MemoryBus, NamespacedBus, TopicCache, make_bus
+from snapshots import SnapshotPublisher
+from cloudinary_outbox import enqueue_deletion, public_id_from_url
+from throttle import RateLimiter
+from idempotency import idempotent
+from analytics import PERIODS, ledger_analytics
+from logos import IMMUTABLE, LogoStore, house_logo_url, logo_token, placeholder_svg
+from access_log import make_access_log
+from http_cache import CachePolicy, ChangeClock, HttpCache
+from warmup import WarmUp, open_pool, warm_paths
+from member_search import MemberIndex, has_trigram, search_members, watch_members
+from ws_hub import GLOBAL, Hub, house_topic, make_broker
+from points import BelowFloor, PointsConflict, change_points
+from scoring import Result, ScoringEngine, award_json, build_rule, parse_table, rule_json, score_submissions, standings_impact
+import tenants
+from sync import (
+    SYNC_OVERLAP, changes_since, decode_token, encode_token, house_fingerprint,
+    maybe_prune_tombstones
+)
+from tenants import TenantLocal, current_tenant, unscoped_user_id
+from serializers import (
+    ANNOUNCEMENT, ANNOUNCEMENT_FEED, ANNOUNCEMENT_OWN, HOUSE, HOUSE_SUMMARY,
+    MEMBER, MEMBER_RESULT, STANDING, TRANSACTION, encode
+)
 load_dotenv()
 
 app = Flask(__name__)
@@ -26,7 +56,7 @@ app.config['SECRET_KEY'] = os.environ.get(
     'SECRET_KEY',
     '330bf9312848e19d9a88482a033cb4f566c4cbe06911fe1e452ebade42f0bc4c'
 )
-app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
+app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1)
 
 is_production = (
     os.environ.get('FLASK_ENV') == 'production' 
@@ -60,7 +90,7 @@ CORS(
         "https://darsahouse.netlify.app",
         "https://houses-web.onrender.com",
     ],
-    allow_headers=["Content-Type", "Authorization", "Accept"],
+    allow_headers=["Content-Type", "Authorization", "Accept", "Idempotency-Key", "X-Tenant"],
     methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     expose_headers=["Content-Type"],
     max_age=3600
@@ -71,6 +101,7 @@ cloudinary.config(
     api_secret=os.environ.get('CLOUDINARY_API_SECRET'),
     secure=True
 )
+
 @app.after_request
 def after_request(response):
     origin = request.headers.get('Origin')
@@ -85,19 +116,157 @@ def after_request(response):
         response.headers['Access-Control-Allow-Origin'] = origin
         response.headers['Access-Control-Allow-Credentials'] = 'true'
         response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
-        response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, Accept'
-    
-    print(f"Response: {request.method} {request.path} - Status: {response.status_code}")
-    
+        response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, Accept, Idempotency-Key, X-Tenant'
+    # The CORS headers depend on Origin, so shared caches must key on it
+    response.vary.add('Origin')
+
     return response
 
+# JSON access log lines, written in batches by a background thread
+access_log = make_access_log()
+if access_log:
+    access_log.init_app(app)
+
 db.init_app(app)
 migrate = Migrate(app, db)
+# Picks the school (tenant) for each request before anything queries; see tenants.py
+tenants.init_app(app, exempt=("healthz", "readyz", "metrics"))
 
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
 
+# Write routes publish a topic after commit; every worker drops what depends on it.
+# One bus for all tenants, with each tenant's topics under its own prefix
+CACHE_TTL_SECONDS = int(os.environ.get('CACHE_TTL_SECONDS', 60))
+cache_bus = make_bus(os.environ.get('CACHE_BUS'), database_url)
+
+def tenant_bus(tenant=None):
+    return NamespacedBus(cache_bus, (tenant or current_tenant()).prefix)
+
+cache = TenantLocal(lambda tenant: TopicCache(tenant_bus(tenant), ttl=CACHE_TTL_SECONDS))
+
+# Long-poll clients wait on this; "postgres" fans changes out to all workers
+LONG_POLL_MAX_SECONDS = 30
+live_points_notifier = TenantLocal(lambda tenant: make_notifier(
+    os.environ.get('LIVE_POINTS_NOTIFIER'),
+    database_url,
+    channel=tenant.channel("live_points"),
+    listener=getattr(cache_bus, "listener", None)
+))
+
+# Every standings read (points, ranks) is served from memory; see standings.py
+def make_standings_engine(tenant):
+    engine = StandingsEngine(max_age=CACHE_TTL_SECONDS)
+    notifier = live_points_notifier.for_tenant(tenant)
+    notifier.subscribe(engine.observe)
+    tenant_bus(tenant).subscribe("houses", engine.invalidate)
+    # An in-process notifier never hears other workers' points changes; the bus does
+    if type(notifier) is InProcessNotifier and type(cache_bus) is not MemoryBus:
+        tenant_bus(tenant).subscribe("ledger", engine.invalidate)
+    return engine
+
+standings_engine = TenantLocal(make_standings_engine)
+
+# WebSocket fan-out of announcements and points; the sockets live in ws_server.py
+live_hub = TenantLocal(lambda tenant: Hub(make_broker(
+    os.environ.get('LIVE_BROKER'),
+    database_url,
+    channel=tenant.channel("live_ws"),
+    listener=getattr(cache_bus, "listener", None)
+)))
+
+def broadcast_points(house_ids):
+    version, ranked = standings_engine.snapshot()
+    live_hub.publish([GLOBAL] + [house_topic(h) for h in house_ids], {
+        "type": "points",
+        "version": version,
+        "houses": [{"id": h.id, "points": h.points, "rank": h.rank} for h in ranked]
+    })
+
+# Optional static copy of the public site for nginx/CDN, rebuilt after writes
+snapshot_publisher = (
+    SnapshotPublisher(app, os.environ['SNAPSHOT_DIR'])
+    if os.environ.get('SNAPSHOT_DIR') else None
+)
+
+def publish_change(*topics):
+    bus = tenant_bus()
+    for topic in topics:
+        bus.publish(topic)
+    # The static copy is of the default school only
+    if snapshot_publisher and current_tenant().slug == tenants.DEFAULT_TENANT:
+        snapshot_publisher.schedule()
+
+# Typeahead index over member names; any commit touching members drops it
+def make_member_index(tenant):
+    index = MemberIndex()
+    tenant_bus(tenant).subscribe("members", index.invalidate)
+    tenant_bus(tenant).subscribe("houses", index.invalidate)
+    return index
+
+member_index = TenantLocal(make_member_index)
+watch_members(lambda: publish_change("members"))
+
+# Cache-Control and Last-Modified on the public GET routes; see http_cache.py
+# Write timestamps behind each topic's Last-Modified; tombstones stand for deletions
+CHANGE_COLUMNS = {
+    "houses": (House.updated_at,),
+    "ledger": (PointTransaction.timestamp, PointTransactionArchive.timestamp, Season.closed_at),
+    "members": (Member.updated_at, SyncTombstone.deleted_at),
+    "announcements": (Announcement.updated_at, SyncTombstone.deleted_at),
+    "events": (Event.created_at, Event.approved_at),
+    "seasons": (Season.closed_at,),
+}
+
+def load_change_stamps():
+    columns = list({str(c): c for cs in CHANGE_COLUMNS.values() for c in cs}.values())
+    row = db.session.execute(select(*[select(func.max(c)).scalar_subquery() for c in columns])).one()
+    newest = dict(zip(map(str, columns), row))
+    return {
+        topic: max((newest[str(c)] for c in cs if newest[str(c)]), default=None)
+        for topic, cs in CHANGE_COLUMNS.items()
+    }
+
+http_cache = HttpCache(TenantLocal(lambda tenant: ChangeClock(
+    load_change_stamps, tenant_bus(tenant), http_cache.topics(), ttl=CACHE_TTL_SECONDS
+)), {
+    "get_houses": CachePolicy(15, 60, ("houses", "ledger")),
+    "live_scores": CachePolicy(2, 10, ("houses", "ledger")),
+    "members": CachePolicy(60, 300, ("houses", "members")),
+    "member_search": CachePolicy(60, 300, ("houses", "members")),
+    "announcements": CachePolicy(15, 120, ("houses", "announcements")),
+    "house_announcements": CachePolicy(15, 120, ("houses", "announcements")),
+    "house_profile": CachePolicy(30, 300, ()),
+    "achievements": CachePolicy(300, 3600, ()),
+    "events": CachePolicy(30, 300, ("houses", "events")),
+    "seasons": CachePolicy(300, 3600, ("seasons",)),
+    "get_house_logo": CachePolicy(300, 86400, ("houses",)),
+    # Sets its own immutable Cache-Control and ETag; this adds If-None-Match
+    "house_logo_image": CachePolicy(0, 0, ()),
+})
+http_cache.init_app(app)
+
+# Scoring rules compiled once per worker; see scoring.py
+def make_scoring_engine(tenant):
+    engine = ScoringEngine(max_age=CACHE_TTL_SECONDS)
+    tenant_bus(tenant).subscribe("scoring-rules", engine.invalidate)
+    return engine
+
+scoring_engine = TenantLocal(make_scoring_engine)
+
+# Per-client token buckets for the public endpoints that get polled
+public_limiter = RateLimiter(
+    rate=float(os.environ.get('PUBLIC_RATE_PER_SECOND', 2)),
+    burst=int(os.environ.get('PUBLIC_RATE_BURST', 30))
+)
+
+# Logos are served from here under content-versioned URLs (see logos.py)
+logo_store = LogoStore(os.environ.get('LOGO_CACHE_DIR', '/tmp/houses-web-logos'))
+
+def json_body(body, status=200):
+    return app.response_class(body, status=status, mimetype='application/json')
+
 # =====================
 # Auth helpers
 # =====================
@@ -120,7 +289,10 @@ def captain_required(f):
 
 @login_manager.user_loader
 def load_user(user_id):
-    return Admin.query.get(int(user_id)) or Captain.query.get(int(user_id))
+    user_id = unscoped_user_id(user_id)
+    if user_id is None:
+        return None
+    return Admin.query.get(user_id) or Captain.query.get(user_id)
 
 @login_manager.unauthorized_handler
 def unauthorized():
@@ -131,83 +303,337 @@ def unauthorized():
 # =====================
 
 @app.route("/api/houses")
+@public_limiter.limit
 def get_houses():
-    houses = House.query.order_by(House.name).all()
-    return jsonify([
-        {
-            "id": h.id,
-            "name": h.name,
-            "points": h.house_points,
-            "description": h.description,
-            "logo_url": h.logo_url or f"https://via.placeholder.com/500?text={h.name}"  
-        }
-        for h in houses
-    ])
+    version, ranked = standings_engine.snapshot()
+
+    def load():
+        return encode(HOUSE.dump_many(sorted(ranked, key=lambda h: h.name)))
+
+    return json_body(cache.get("houses", load, topics=("houses",), version=version))
 
 @app.route('/api/live-points')
+@public_limiter.limit
 def live_scores():
-    houses = House.query.order_by(House.house_points.desc()).all()
-    return jsonify([
-        {
-            "rank": i + 1,
-            "name": h.name,
-            "points": h.house_points,
-            "description": h.description,
-            "logo_url": h.logo_url or f"https://via.placeholder.com/500?text={h.name}" 
-        }
-        for i, h in enumerate(houses)
-    ])
+    version, ranked = standings_engine.snapshot()
+
+    def load():
+        return encode(STANDING.dump_many(ranked))
+
+    return json_body(cache.get("live-points", load, topics=("houses",), version=version))
+
+def load_live_points():
+    version, ranked = standings_engine.snapshot()
+    return version, encode({"version": version, "changed": True, "standings": STANDING.dump_many(ranked)})
+
+# Each long-poll holds a request thread while it waits; past this many at
+# once the rest are answered straight away. 0 = no cap (the gevent service
+# in ws_server.py, where a waiter is a greenlet)
+LONG_POLL_MAX_WAITERS = int(os.environ.get('LONG_POLL_MAX_WAITERS', 16))
+long_poll_slots = threading.BoundedSemaphore(LONG_POLL_MAX_WAITERS) if LONG_POLL_MAX_WAITERS else None
+
+def make_live_points_feed(tenant):
+    feed = StandingsFeed(live_points_notifier.for_tenant(tenant), load_live_points, slots=long_poll_slots)
+    tenant_bus(tenant).subscribe("houses", feed.invalidate)
+    return feed
+
+live_points_feed = TenantLocal(make_live_points_feed)
+
+@app.route('/api/live-points/wait')
+@public_limiter.limit
+def live_scores_wait():
+    seen = request.args.get('version', default=-1, type=int)
+    timeout = request.args.get('timeout', default=LONG_POLL_MAX_SECONDS, type=float)
+    # NaN passes any min/max clamp and would never time out
+    if not math.isfinite(timeout):
+        return jsonify({"error": "timeout must be a number of seconds"}), 400
+    timeout = min(max(timeout, 0), LONG_POLL_MAX_SECONDS)
+
+    # Load (or reuse) the standings first, then don't hold a pooled
+    # connection while we sleep
+    live_points_feed.current()
+    db.session.remove()
+    version, body = live_points_feed.wait(seen, timeout)
+    if body is None:
+        return jsonify({"version": version, "changed": False})
+    return json_body(body)
 
 @app.route('/api/members')
+@public_limiter.limit
 def members():
     house_name = request.args.get('house')
-    houses = (
-        [House.query.filter_by(name=house_name).first()]
-        if house_name else
-        House.query.order_by(House.name).all()
-    )
 
-    if house_name and not houses[0]:
+    def load():
+        houses = HOUSE_SUMMARY.query(db.session)
+        houses = (
+            houses.filter(House.name == house_name).all()
+            if house_name else
+            houses.order_by(House.name).all()
+        )
+
+        if house_name and not houses:
+            return None
+
+        # Every house's members in one query instead of one per house
+        members_by_house = {}
+        rows = (
+            MEMBER.query(db.session)
+            .add_columns(Member.house_id)
+            .filter(Member.house_id.in_([h.id for h in houses]))
+            .order_by(Member.id)
+        )
+        for row in rows:
+            members_by_house.setdefault(row.house_id, []).append(MEMBER.row(row))
+
+        return encode([
+            {"house": HOUSE_SUMMARY.row(h), "members": members_by_house.get(h.id, [])}
+            for h in houses
+        ])
+
+    body = cache.get(f"members:{house_name or ''}", load, topics=("houses", "members"))
+    if body is None:
         return jsonify({"error": "House not found"}), 404
+    return json_body(body)
 
-    return jsonify([
-        {
-            "house": {
-                "id": h.id,
-                "name": h.name,
-                "description": h.description
-            },
-            "members": [
+MEMBER_SEARCH_LIMIT = 20
+MEMBER_SEARCH_MAX_LIMIT = 50
+
+@app.route('/api/members/search')
+@public_limiter.limit
+def member_search():
+    q = request.args.get('q', '').strip()
+    if not q:
+        return jsonify({"error": "q is required"}), 400
+    limit = min(max(request.args.get('limit', MEMBER_SEARCH_LIMIT, type=int), 1), MEMBER_SEARCH_MAX_LIMIT)
+
+    results = search_members(db.session, member_index, q, request.args.get('house'), limit)
+    return json_body(encode({"query": q, "results": MEMBER_RESULT.dump_many(results)}))
+
+@app.route('/api/announcements')
+@public_limiter.limit
+def announcements():
+    def load():
+        rows = (
+            ANNOUNCEMENT.query(db.session)
+            .join(House, House.id == Announcement.house_id)
+            # Announcements outlive their captain (captain_id is then NULL)
+            .outerjoin(Captain, Captain.id == Announcement.captain_id)
+            .order_by(Announcement.created_at.desc())
+            .all()
+        )
+        return encode(ANNOUNCEMENT.many(rows))
+
+    return json_body(cache.get("announcements", load, topics=("houses", "announcements")))
+
+@app.route('/api/houses/<int:house_id>/profile')
+@public_limiter.limit
+def house_profile(house_id):
+    version, ranked = standings_engine.snapshot()
+    house = next((h for h in ranked if h.id == house_id), None)
+    if house is None:
+        return jsonify({"error": "House not found"}), 404
+
+    def load_extras():
+        members_total = (
+            db.session.query(func.count(Member.id))
+            .filter(Member.house_id == house_id)
+            .scalar()
+        )
+        advisors = Advisor.query.filter_by(house_id=house_id).order_by(Advisor.name).all()
+        achievements = (
+            Achievement.query.filter_by(house_id=house_id)
+            .order_by(Achievement.id.desc())
+            .all()
+        )
+        return {
+            "member_count": members_total,
+            "advisors": [
+                {
+                    "id": a.id,
+                    "name": a.name,
+                    "role": a.role,
+                    "bio": a.bio
+                }
+                for a in advisors
+            ],
+            "achievements": [
                 {
-                    "id": m.id,
-                    "name": m.name,
-                    "role": m.role
+                    "id": a.id,
+                    "name": a.name,
+                    "description": a.description
                 }
-                for m in Member.query.filter_by(house_id=h.id).all()
+                for a in achievements
             ]
         }
-        for h in houses
-    ])
 
-@app.route('/api/announcements')
-def announcements():
-    anns = Announcement.query.order_by(Announcement.created_at.desc()).all()
-    return jsonify([
-        {
-            "id": a.id,
-            "title": a.title,
-            "content": a.content,
-            "image_url": a.image_url,
-            "created_at": a.created_at.isoformat(),
-            "house": {"id": a.house.id, "name": a.house.name},
-            "captain": {
-                "id": a.captain.id,
-                "username": a.captain.username,
-                "name": a.captain.name
+    # Points and rank come from the standings engine, the rest changes rarely
+    def load():
+        extras = cache.get(
+            f"house-extras:{house_id}",
+            load_extras,
+            topics=("houses", "members", "advisors", "achievements")
+        )
+        return encode(dict({
+            "id": house.id,
+            "name": house.name,
+            "description": house.description,
+            "points": house.points,
+            "rank": house.rank,
+            "logo_url": house_logo_url(house)
+        }, **extras))
+
+    body = cache.get(
+        f"house-profile:{house_id}",
+        load,
+        topics=("houses", "members", "advisors", "achievements"),
+        version=version
+    )
+    return json_body(body)
+
+@app.route('/api/achievements')
+@public_limiter.limit
+def achievements():
+    house_id = request.args.get('house_id', type=int)
+
+    def load():
+        query = db.session.query(Achievement, House.name).join(House)
+        if house_id:
+            query = query.filter(Achievement.house_id == house_id)
+        return encode([
+            {
+                "id": a.id,
+                "name": a.name,
+                "description": a.description,
+                "house": {"id": a.house_id, "name": house_name}
             }
-        }
-        for a in anns
-    ])
+            for a, house_name in query.order_by(Achievement.id.desc()).all()
+        ])
+
+    return json_body(cache.get(f"achievements:{house_id or ''}", load, topics=("houses", "achievements")))
+
+FEED_PAGE_SIZE = 20
+FEED_MAX_PAGE_SIZE = 100
+
+def encode_feed_cursor(created_at, announcement_id):
+    raw = f"{created_at.isoformat()}|{announcement_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_feed_cursor(cursor):
+    created_at, announcement_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+    return datetime.fromisoformat(created_at), int(announcement_id)
+
+@app.route('/api/houses/<int:house_id>/announcements')
+@public_limiter.limit
+def house_announcements(house_id):
+    limit = min(max(request.args.get('limit', FEED_PAGE_SIZE, type=int), 1), FEED_MAX_PAGE_SIZE)
+    cursor = request.args.get('cursor')
+    try:
+        after = decode_feed_cursor(cursor) if cursor else None
+    except (ValueError, UnicodeDecodeError):
+        return jsonify({"error": "Invalid cursor"}), 400
+
+    def load():
+        if after is None and not db.session.query(House.id).filter_by(id=house_id).first():
+            return None
+
+        # Only the feed columns, walked along ix_announcements_house_created
+        query = ANNOUNCEMENT_FEED.query(db.session).filter(Announcement.house_id == house_id)
+        if after is not None:
+            created_at, last_id = after
+            query = query.filter(db.or_(
+                Announcement.created_at < created_at,
+                db.and_(Announcement.created_at == created_at, Announcement.id < last_id)
+            ))
+        rows = query.order_by(
+            Announcement.created_at.desc(), Announcement.id.desc()
+        ).limit(limit + 1).all()
+
+        page = rows[:limit]
+        return encode({
+            "announcements": ANNOUNCEMENT_FEED.many(page),
+            "next_cursor": (
+                encode_feed_cursor(page[-1].created_at, page[-1].id)
+                if len(rows) > limit else None
+            )
+        })
+
+    # Only first pages are worth caching; deeper pages are cheap keyset reads
+    if after is None:
+        body = cache.get(
+            f"house-announcements:{house_id}:{limit}",
+            load,
+            topics=("houses", "announcements")
+        )
+    else:
+        body = load()
+    if body is None:
+        return jsonify({"error": "House not found"}), 404
+    return json_body(body)
+
+@app.route('/api/events')
+@public_limiter.limit
+def events():
+    def load():
+        event_list = Event.query.order_by(Event.created_at.desc()).all()
+        results = {}
+        approved = [e.id for e in event_list if e.status == 'approved']
+        if approved:
+            rows = (
+                db.session.query(ScoreSubmission, House.name)
+                .join(House)
+                .filter(ScoreSubmission.event_id.in_(approved))
+                .filter(ScoreSubmission.status == 'approved')
+                .order_by(ScoreSubmission.placement)
+                .all()
+            )
+            for sub, house_name in rows:
+                results.setdefault(sub.event_id, []).append({
+                    "house": {"id": sub.house_id, "name": house_name},
+                    "placement": sub.placement,
+                    "points": sub.points_awarded
+                })
+
+        return encode([
+            {
+                "id": e.id,
+                "name": e.name,
+                "description": e.description,
+                "status": e.status,
+                "created_at": e.created_at.isoformat(),
+                "results": results.get(e.id, [])
+            }
+            for e in event_list
+        ])
+
+    return json_body(cache.get("events", load, topics=("houses", "events")))
+
+@app.route('/api/seasons')
+@public_limiter.limit
+def seasons():
+    def load():
+        season_list = (
+            Season.query.options(db.selectinload(Season.standings))
+            .order_by(Season.closed_at.desc())
+            .all()
+        )
+        return encode([
+            {
+                "id": s.id,
+                "name": s.name,
+                "closed_at": s.closed_at.isoformat(),
+                "standings": [
+                    {
+                        "rank": st.rank,
+                        "house": {"id": st.house_id, "name": st.house_name},
+                        "points": st.points
+                    }
+                    for st in s.standings
+                ]
+            }
+            for s in season_list
+        ])
+
+    return json_body(cache.get("seasons", load, topics=("seasons",)))
 
 # =====================
 # LOGIN / LOGOUT
@@ -264,44 +690,61 @@ def logout():
 @login_required
 @admin_required
 def admin_dashboard():
-    houses = House.query.order_by(House.house_points.desc()).all()
-    recent_transactions = PointTransaction.query.order_by(
-        PointTransaction.timestamp.desc()
-    ).limit(10).all()
-    
+    houses = standings_engine.ranked()
+    recent_transactions = (
+        TRANSACTION.query(db.session)
+        .join(House, House.id == PointTransaction.house_id)
+        .outerjoin(Admin, Admin.id == PointTransaction.admin_id)
+        .order_by(PointTransaction.timestamp.desc())
+        .limit(10)
+        .all()
+    )
+
+    return json_body(encode({
+        "houses": HOUSE.dump_many(houses),
+        "recent_transactions": TRANSACTION.many(recent_transactions)
+    }))
+
+ANALYTICS_TTL_SECONDS = 30
+
+@app.route('/api/admin/analytics', methods=['GET'])
+@login_required
+@admin_required
+def admin_analytics():
+    period = request.args.get('period', 'week')
+    if period not in PERIODS:
+        return jsonify({"error": f"Period must be one of: {', '.join(PERIODS)}"}), 400
+
+    try:
+        since = datetime.fromisoformat(request.args['since']) if request.args.get('since') else None
+        until = datetime.fromisoformat(request.args['until']) if request.args.get('until') else None
+    except ValueError:
+        return jsonify({"error": "since and until must be ISO dates"}), 400
+
+    def load():
+        return encode(ledger_analytics(db.session, period, since, until))
+
+    body = cache.get(
+        f"analytics:{period}:{since}:{until}",
+        load,
+        topics=("houses", "ledger"),
+        ttl=ANALYTICS_TTL_SECONDS
+    )
+    return json_body(body)
+
+def points_conflict(e):
+    db.session.rollback()
     return jsonify({
-        "houses": [
-            {
-                "id": h.id,
-                "name": h.name,
-                "points": h.house_points,
-                "description": h.description,
-                "logo_url": h.logo_url or f"https://via.placeholder.com/500?text={h.name}" 
-            }
-            for h in houses
-        ],
-        "recent_transactions": [
-            {
-                "id": t.id,
-                "house": {
-                    "id": t.house.id,
-                    "name": t.house.name
-                },
-                "points_change": t.points_change,
-                "reason": t.reason,
-                "timestamp": t.timestamp.isoformat(),
-                "admin": {
-                    "id": t.admin.id,
-                    "name": t.admin.name
-                }
-            }
-            for t in recent_transactions
-        ]
-    })
+        "error": str(e),
+        "points": e.points,
+        "version": e.version,
+        "attempts": e.attempts
+    }), 400 if isinstance(e, BelowFloor) else 409
 
 @app.route('/api/admin/points/add', methods=['POST'])
 @login_required
 @admin_required
+@idempotent
 def admin_add_points():
     data = request.get_json()
     house_id = data.get('house_id')
@@ -318,32 +761,49 @@ def admin_add_points():
 
     if points <= 0:
         return jsonify({"error": "Points must be a positive integer"}), 400
-    
-    house = House.query.get_or_404(house_id)
-    house.house_points += points
+
+    # Optional: the house version the admin saw; a newer one gets 409
+    version = data.get('version')
+    if version is not None and not isinstance(version, int):
+        return jsonify({"error": "version must be an integer"}), 400
+
+    try:
+        change = change_points(house_id, points, expected_version=version)
+    except LookupError:
+        return jsonify({"error": "House not found"}), 404
+    except PointsConflict as e:
+        return points_conflict(e)
 
     transaction = PointTransaction(
-        house_id=house.id,
+        house_id=change.house_id,
         points_change=points,
         reason=reason,
         admin_id=current_user.id
     )
     db.session.add(transaction)
+    version = next_version()
     db.session.commit()
+    standings_engine.apply({change.house_id: points}, version)
+    live_points_notifier.publish(version)
+    broadcast_points([change.house_id])
+    publish_change("ledger")
     
     return jsonify({
         "success": True,
-        "message": f"Successfully added {points} points to {house.name}",
+        "message": f"Successfully added {points} points to {change.name}",
         "house": {
-            "id": house.id,
-            "name": house.name,
-            "points": house.house_points
-        }
+            "id": change.house_id,
+            "name": change.name,
+            "points": change.points,
+            "version": change.version
+        },
+        "attempts": change.attempts
     })
 
 @app.route('/api/admin/points/deduct', methods=['POST'])
 @login_required
 @admin_required
+@idempotent
 def admin_deduct_points():
     data = request.get_json()
     house_id = data.get('house_id')
@@ -361,31 +821,49 @@ def admin_deduct_points():
 
     if points <= 0:
         return jsonify({"error": "Points must be a positive integer"}), 400
-    
-    house = House.query.get_or_404(house_id)
-    house.house_points -= points
+
+    # Optional: the house version the admin saw; a newer one gets 409
+    version = data.get('version')
+    if version is not None and not isinstance(version, int):
+        return jsonify({"error": "version must be an integer"}), 400
+
+    # The floor is checked by the UPDATE itself, so racing deductions can't both pass it
+    try:
+        change = change_points(house_id, -points, expected_version=version)
+    except LookupError:
+        return jsonify({"error": "House not found"}), 404
+    except PointsConflict as e:
+        return points_conflict(e)
 
     transaction = PointTransaction(
-        house_id=house.id,
+        house_id=change.house_id,
         points_change=-points,  
         reason=reason,
         admin_id=current_user.id
     )
     db.session.add(transaction)
+    version = next_version()
     db.session.commit()
+    standings_engine.apply({change.house_id: -points}, version)
+    live_points_notifier.publish(version)
+    broadcast_points([change.house_id])
+    publish_change("ledger")
     
     return jsonify({
         "success": True,
-        "message": f"Successfully deducted {points} points from {house.name}",
+        "message": f"Successfully deducted {points} points from {change.name}",
         "house": {
-            "id": house.id,
-            "name": house.name,
-            "points": house.house_points
-        }
+            "id": change.house_id,
+            "name": change.name,
+            "points": change.points,
+            "version": change.version
+        },
+        "attempts": change.attempts
     })
 @app.route('/api/admin/house/<int:house_id>/logo', methods=['POST'])
 @login_required
 @admin_required
+@idempotent
 def update_house_logo(house_id):
     house = House.query.get_or_404(house_id)
     
@@ -415,6 +893,7 @@ def update_house_logo(house_id):
         
         house.logo_url = upload_result['secure_url']
         db.session.commit()
+        publish_change("houses")
         
         return jsonify({
             "success": True,
@@ -429,8 +908,272 @@ def update_house_logo(house_id):
 def get_house_logo(house_id):
     house = House.query.get_or_404(house_id)
     return jsonify({
-        "url": house.logo_url or f"https://via.placeholder.com/500?text={house.name}"
+        "url": house_logo_url(house)
+    })
+
+@app.route('/api/houses/<int:house_id>/logo/<token>')
+def house_logo_image(house_id, token):
+    house = House.query.get_or_404(house_id)
+    current = logo_token(house.name, house.logo_url)
+
+    # Old versions point at the current one; only the current URL is immutable
+    if token != current:
+        return redirect(house_logo_url(house))
+
+    if house.logo_url:
+        try:
+            body, mimetype = logo_store.get(house.id, current, house.logo_url)
+        except Exception as e:
+            print(f"Failed to cache logo for {house.name}: {e}")
+            return redirect(house.logo_url)
+    else:
+        body, mimetype = placeholder_svg(house.name), 'image/svg+xml'
+
+    response = app.response_class(body, mimetype=mimetype)
+    response.headers['Cache-Control'] = IMMUTABLE
+    response.headers['ETag'] = f'"{current}"'
+    return response
+@app.route('/api/admin/events', methods=['GET'])
+@login_required
+@admin_required
+def admin_events():
+    event_list = Event.query.order_by(Event.created_at.desc()).all()
+    submissions = {}
+    rows = (
+        db.session.query(ScoreSubmission, House.name)
+        .join(House)
+        .filter(ScoreSubmission.event_id.in_([e.id for e in event_list]))
+        .order_by(ScoreSubmission.placement)
+        .all()
+    ) if event_list else []
+    for sub, house_name in rows:
+        submissions.setdefault(sub.event_id, []).append({
+            "id": sub.id,
+            "house": {"id": sub.house_id, "name": house_name},
+            "placement": sub.placement,
+            "note": sub.note,
+            "status": sub.status,
+            "points": sub.points_awarded
+        })
+
+    return jsonify([
+        {
+            "id": e.id,
+            "name": e.name,
+            "description": e.description,
+            "status": e.status,
+            "placement_points": [int(p) for p in e.placement_points.split(',') if p.strip()],
+            "submissions": submissions.get(e.id, [])
+        }
+        for e in event_list
+    ])
+
+@app.route('/api/admin/events/create', methods=['POST'])
+@login_required
+@admin_required
+@idempotent
+def admin_create_event():
+    data = request.get_json()
+    name = data.get('name', '').strip()
+    description = data.get('description', '').strip()
+    placement_points = data.get('placement_points')
+
+    if not name:
+        return jsonify({"error": "Event name is required"}), 400
+
+    if placement_points is not None:
+        try:
+            placement_points = [int(p) for p in placement_points]
+        except (TypeError, ValueError):
+            return jsonify({"error": "Placement points must be a list of numbers"}), 400
+        if not placement_points or any(p < 0 for p in placement_points):
+            return jsonify({"error": "Placement points must be non-negative"}), 400
+
+    event = Event(name=name, description=description or None)
+    if placement_points:
+        event.placement_points = ','.join(str(p) for p in placement_points)
+    db.session.add(event)
+    db.session.commit()
+    publish_change("events")
+
+    return jsonify({
+        "success": True,
+        "message": f"Event {event.name} created",
+        "event": {"id": event.id, "name": event.name, "status": event.status}
+    })
+
+@app.route('/api/admin/events/approve', methods=['POST'])
+@login_required
+@admin_required
+@idempotent
+def admin_approve_events():
+    data = request.get_json()
+    event_ids = data.get('event_ids')
+
+    if not isinstance(event_ids, list) or not event_ids:
+        return jsonify({"error": "event_ids must be a non-empty list"}), 400
+    if not all(isinstance(i, int) and not isinstance(i, bool) for i in event_ids):
+        return jsonify({"error": "event_ids must be a list of numbers"}), 400
+
+    event_list = Event.query.filter(
+        Event.id.in_(event_ids), Event.status == 'open'
+    ).all()
+    if not event_list:
+        return jsonify({"error": "No open events to approve"}), 404
+    events_by_id = {e.id: e for e in event_list}
+
+    # Claim the events before awarding anything: a concurrent approval of the
+    # same events waits on these rows, then matches fewer of them and backs off
+    claimed = Event.query.filter(
+        Event.id.in_(events_by_id), Event.status == 'open'
+    ).update({
+        Event.status: 'approved',
+        Event.approved_at: datetime.utcnow(),
+        Event.approved_by: current_user.id
+    }, synchronize_session=False)
+    if claimed != len(event_list):
+        db.session.rollback()
+        return jsonify({"error": "Some of these events were just approved by someone else; reload and try again"}), 409
+
+    submissions = ScoreSubmission.query.filter(
+        ScoreSubmission.event_id.in_(events_by_id),
+        ScoreSubmission.status == 'pending'
+    ).all()
+
+    # Everything below lands in one transaction: ledger rows, house totals, statuses
+    awards = score_submissions(scoring_engine.rules(), event_list, submissions)
+    awarded = []
+    deltas = {}
+    for sub, award in zip(submissions, awards):
+        event = events_by_id[sub.event_id]
+        points = award.points
+        sub.status = 'approved'
+        sub.points_awarded = points
+        if points:
+            reason = f"{event.name}: place {sub.placement}"
+            if award.rules:
+                reason += f" ({', '.join(award.rules)})"
+            transaction = PointTransaction(
+                house_id=sub.house_id,
+                points_change=points,
+                reason=reason[:255],
+                admin_id=current_user.id
+            )
+            db.session.add(transaction)
+            awarded.append((sub, transaction))
+            deltas[sub.house_id] = deltas.get(sub.house_id, 0) + points
+
+    db.session.flush()
+    for sub, transaction in awarded:
+        sub.transaction_id = transaction.id
+
+    # Same path as manual awards, so a negative bonus still respects the floor;
+    # houses in id order so concurrent approvals lock them in the same order
+    for house_id in sorted(deltas):
+        try:
+            change_points(house_id, deltas[house_id])
+        except LookupError:
+            db.session.rollback()
+            return jsonify({"error": f"House {house_id} not found"}), 404
+        except PointsConflict as e:
+            return points_conflict(e)
+
+    version = next_version() if awarded else None
+    db.session.commit()
+    if awarded:
+        standings_engine.apply(deltas, version)
+        live_points_notifier.publish(version)
+        broadcast_points(deltas)
+    publish_change("ledger", "events")
+
+    return jsonify({
+        "success": True,
+        "message": f"Approved {len(event_list)} event(s), {len(awarded)} award(s)",
+        "approved_event_ids": sorted(events_by_id),
+        "points_by_house": {str(h): d for h, d in deltas.items()}
+    })
+
+@app.route('/api/admin/scoring/rules', methods=['GET'])
+@login_required
+@admin_required
+def admin_scoring_rules():
+    rules = ScoringRule.query.order_by(ScoringRule.priority.desc(), ScoringRule.id.desc()).all()
+    return jsonify([rule_json(r) for r in rules])
+
+@app.route('/api/admin/scoring/rules/create', methods=['POST'])
+@login_required
+@admin_required
+@idempotent
+def admin_create_scoring_rule():
+    try:
+        rule = build_rule(request.get_json() or {})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    db.session.add(rule)
+    db.session.commit()
+    publish_change("scoring-rules")
+
+    return jsonify({
+        "success": True,
+        "message": f"Scoring rule {rule.name} created",
+        "rule": rule_json(rule)
+    })
+
+@app.route('/api/admin/scoring/rules/<int:rule_id>/delete', methods=['DELETE'])
+@login_required
+@admin_required
+def admin_delete_scoring_rule(rule_id):
+    rule = ScoringRule.query.get_or_404(rule_id)
+    db.session.delete(rule)
+    db.session.commit()
+    publish_change("scoring-rules")
+
+    return jsonify({"success": True, "message": f"Scoring rule {rule.name} deleted"})
+
+@app.route('/api/admin/scoring/preview', methods=['POST'])
+@login_required
+@admin_required
+def admin_scoring_preview():
+    """What approving would award, and where the houses would end up. Writes nothing."""
+    data = request.get_json() or {}
+    try:
+        at = datetime.fromisoformat(data['at']) if data.get('at') else None
+    except (TypeError, ValueError):
+        return jsonify({"error": "at must be an ISO date"}), 400
+    rule_set = scoring_engine.rules()
+
+    if data.get('results') is not None:
+        # Hypothetical results, e.g. typed in before captains submit
+        try:
+            results = [
+                Result(int(r['event_id']), int(r['house_id']), int(r['placement']))
+                for r in data['results']
+            ]
+        except (KeyError, TypeError, ValueError):
+            return jsonify({"error": "results must be a list of {event_id, house_id, placement}"}), 400
+        event_ids = {r.event_id for r in results}
+        tables = {
+            e.id: parse_table(e.placement_points)
+            for e in Event.query.filter(Event.id.in_(event_ids)).all()
+        } if event_ids else {}
+        awards = rule_set.score_many(results, tables, at)
+    else:
+        event_ids = data.get('event_ids')
+        if not isinstance(event_ids, list) or not event_ids:
+            return jsonify({"error": "Send event_ids or results"}), 400
+        event_list = Event.query.filter(Event.id.in_(event_ids), Event.status == 'open').all()
+        submissions = ScoreSubmission.query.filter(
+            ScoreSubmission.event_id.in_([e.id for e in event_list]),
+            ScoreSubmission.status == 'pending'
+        ).all() if event_list else []
+        awards = score_submissions(rule_set, event_list, submissions, at)
+
+    return jsonify({
+        "awards": [award_json(a) for a in awards],
+        "standings": standings_impact(standings_engine.ranked(), awards)
     })
+
 # =====================
 # CAPTAIN ROUTES
 # =====================
@@ -440,42 +1183,52 @@ def get_house_logo(house_id):
 @captain_required
 def captain_dashboard():
     house = House.query.get(current_user.house_id)
-    members = Member.query.filter_by(house_id=current_user.house_id).all()
+    members = MEMBER.query(db.session).filter(Member.house_id == current_user.house_id).all()
 
-    my_announcements = Announcement.query.filter_by(
-        captain_id=current_user.id
+    my_announcements = ANNOUNCEMENT_OWN.query(db.session).filter(
+        Announcement.captain_id == current_user.id
     ).order_by(Announcement.created_at.desc()).all()
-    
-    return jsonify({
+
+    return json_body(encode({
         "house": {
             "id": house.id,
             "name": house.name,
             "points": house.house_points,
             "description": house.description
         },
-        "members": [
-            {
-                "id": m.id,
-                "name": m.name,
-                "role": m.role
-            }
-            for m in members
-        ],
-        "my_announcements": [
-            {
-                "id": a.id,
-                "title": a.title,
-                "content": a.content,
-                "image_url": a.image_url,  
-                "created_at": a.created_at.isoformat()
-            }
-            for a in my_announcements
-        ]
-    })
+        "members": MEMBER.many(members),
+        "my_announcements": ANNOUNCEMENT_OWN.many(my_announcements)
+    }))
+
+@app.route('/api/captain/sync', methods=['GET'])
+@login_required
+@captain_required
+def captain_sync():
+    now = datetime.utcnow()
+    house = standings_engine.get(current_user.house_id)
+    fingerprint = house_fingerprint(house)
+    token = request.args.get('token')
+    previous = decode_token(token, house.id, current_user.id, now) if token else None
+    since, seen_fingerprint = previous or (None, None)
+
+    body = changes_since(house.id, current_user.id, since)
+    body["full"] = since is None
+    if fingerprint != seen_fingerprint:
+        body["house"] = {
+            "id": house.id,
+            "name": house.name,
+            "points": house.points,
+            "description": house.description
+        }
+    body["sync_token"] = encode_token(now - SYNC_OVERLAP, house.id, current_user.id, fingerprint)
+
+    maybe_prune_tombstones()
+    return json_body(encode(body))
 
 @app.route('/api/captain/announcements/create', methods=['POST'])
 @login_required
 @captain_required
+@idempotent
 def captain_create_announcement():
     if request.content_type and 'multipart/form-data' in request.content_type:
         title = request.form.get('title', '').strip()
@@ -495,6 +1248,7 @@ def captain_create_announcement():
         return jsonify({"error": "Title must be less than 200 characters"}), 400
     
     image_url = None
+    image_public_id = None
     
     if image_file and image_file.filename:
         allowed_extensions = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
@@ -522,6 +1276,7 @@ def captain_create_announcement():
             )
             
             image_url = upload_result['secure_url']
+            image_public_id = upload_result.get('public_id')
             
         except Exception as e:
             return jsonify({"error": f"Failed to upload image: {str(e)}"}), 500
@@ -530,24 +1285,25 @@ def captain_create_announcement():
         title=title,
         content=content,
         image_url=image_url,  
+        image_public_id=image_public_id,
         house_id=current_user.house_id,
         captain_id=current_user.id,
+        captain_name=current_user.name,
         created_at=datetime.utcnow()
     )
 
     db.session.add(announcement)
     db.session.commit()
+    publish_change("announcements")
+    live_hub.publish([GLOBAL, house_topic(announcement.house_id)], {
+        "type": "announcement",
+        "announcement": ANNOUNCEMENT_FEED.dump(announcement)
+    })
 
     return jsonify({
         "success": True,
         "message": "Announcement created successfully",
-        "announcement": {
-            "id": announcement.id,
-            "title": announcement.title,
-            "content": announcement.content,
-            "image_url": announcement.image_url,  
-            "created_at": announcement.created_at.isoformat()
-        }
+        "announcement": ANNOUNCEMENT_OWN.dump(announcement)
     })
 
 @app.route('/api/captain/announcements/<int:announcement_id>/delete', methods=['DELETE'])
@@ -559,22 +1315,114 @@ def captain_delete_announcement(announcement_id):
     if announcement.captain_id != current_user.id:
         return jsonify({"error": "You can only delete your own announcements"}), 403
     
+    # The image is destroyed by the job worker once this commits
     if announcement.image_url:
-        try:
-            public_id_match = announcement.image_url.split('/announcements/')
-            if len(public_id_match) > 1:
-                public_id = 'announcements/' + public_id_match[1].split('.')[0]
-                cloudinary.uploader.destroy(public_id)
-        except Exception as e:
-            print(f"Failed to delete image from Cloudinary: {e}")
+        enqueue_deletion(
+            announcement.image_public_id or public_id_from_url(announcement.image_url)
+        )
     
     db.session.delete(announcement)
     db.session.commit()
+    publish_change("announcements")
+    live_hub.publish([GLOBAL, house_topic(current_user.house_id)], {
+        "type": "announcement_deleted",
+        "id": announcement_id
+    })
     
     return jsonify({
         "success": True,
         "message": "Announcement deleted successfully"
     })
+@app.route('/api/captain/events/<int:event_id>/submit', methods=['POST'])
+@login_required
+@captain_required
+@idempotent
+def captain_submit_score(event_id):
+    event = Event.query.get_or_404(event_id)
+    data = request.get_json()
+    note = (data.get('note') or '').strip()
+
+    if event.status != 'open':
+        return jsonify({"error": "This event is no longer accepting results"}), 400
+
+    try:
+        placement = int(data.get('placement'))
+    except (TypeError, ValueError):
+        return jsonify({"error": "Placement must be a valid number"}), 400
+
+    if placement <= 0:
+        return jsonify({"error": "Placement must be a positive integer"}), 400
+
+    submission = ScoreSubmission.query.filter_by(
+        event_id=event.id, house_id=current_user.house_id
+    ).first()
+    if submission is None:
+        submission = ScoreSubmission(event_id=event.id, house_id=current_user.house_id)
+        db.session.add(submission)
+    submission.placement = placement
+    submission.note = note[:255] or None
+    submission.captain_id = current_user.id
+    submission.submitted_at = datetime.utcnow()
+    db.session.commit()
+
+    return jsonify({
+        "success": True,
+        "message": f"Result submitted for {event.name}",
+        "submission": {
+            "id": submission.id,
+            "event_id": event.id,
+            "placement": submission.placement,
+            "status": submission.status
+        }
+    })
+
+# =====================
+# HEALTH / WARM-UP
+# =====================
+
+# gunicorn.conf.py runs this on every worker before it takes traffic
+warmup = WarmUp(app)
+# Connections to open per pool; 0 = the pool's size
+WARMUP_CONNECTIONS = int(os.environ.get('WARMUP_CONNECTIONS', 0))
+
+@warmup.step("pool")
+def warm_pool(app, tenant):
+    engine = db.get_engine()
+    # Schema tenants share the main engine; open each pool once
+    if engine not in warm_pool.opened:
+        open_pool(engine, WARMUP_CONNECTIONS or None)
+        warm_pool.opened.add(engine)
+
+warm_pool.opened = set()
+
+@warmup.step("standings")
+def warm_standings(app, tenant):
+    standings_engine.for_tenant(tenant).snapshot()
+    live_points_feed.for_tenant(tenant).current()
+    if not has_trigram(db.session):
+        member_index.for_tenant(tenant).snapshot()
+    db.session.remove()
+
+@warmup.step("snapshots")
+def warm_snapshots(app, tenant):
+    warm_paths(app, tenant)
+
+@app.route('/healthz')
+def healthz():
+    return jsonify({"status": "ok"})
+
+@app.route('/readyz')
+def readyz():
+    if not warmup.ready:
+        # Servers without the gunicorn hook warm up on the first probe
+        warmup.run_in_background()
+        return jsonify(warmup.status()), 503
+    return jsonify(warmup.status())
+
+@app.route('/metrics')
+def metrics():
+    return app.response_class(warmup.metrics(), mimetype='text/plain; version=0.0.4')
+
 # =====================
 # ERROR HANDLERS
 # =====================
@@ -0,0 +1,19 @@
+-- Add the per-house feed columns and index, then copy the names onto existing announcements
+-- New rows get them automatically (see fill_announcement_names in models.py)
+
+ALTER TABLE announcements ADD COLUMN house_name VARCHAR(150);
+ALTER TABLE announcements ADD COLUMN captain_name VARCHAR(150);
+
+CREATE INDEX ix_announcements_house_created
+    ON announcements (house_id, created_at DESC, id DESC);
+
+UPDATE announcements
+SET house_name = (SELECT name FROM houses WHERE houses.id = announcements.house_id)
+WHERE house_name IS NULL;
+
+UPDATE announcements
+SET captain_name = (SELECT name FROM captains WHERE captains.id = announcements.captain_id)
+WHERE captain_name IS NULL AND captain_id IS NOT NULL;
+
+-- Verify
+SELECT COUNT(*) AS missing_names FROM announcements WHERE house_name IS NULL;
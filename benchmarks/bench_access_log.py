@@ -0,0 +1,111 @@
+"""
+Benchmark the access logging cost paid on the request thread.
+
+Compares the old after_request print (stdout flushed per line, as under
+gunicorn with PYTHONUNBUFFERED) and a synchronous JSON log handler with
+access_log.py, which only queues a tuple for the writer thread.
+
+Every write to the log sink is delayed by --sink-latency-us to stand in
+for a busy disk or a log collector reading the worker's stdout pipe;
+pass 0 to measure against a plain local file.
+
+    python benchmarks/bench_access_log.py [--requests 20000] [--sink-latency-us 200]
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class SlowFile:
+    """File whose every write waits `latency` seconds before landing."""
+
+    def __init__(self, path, mode, latency):
+        self.file = open(path, mode)
+        self.latency = latency
+
+    def write(self, data):
+        if self.latency:
+            time.sleep(self.latency)
+        return self.file.write(data)
+
+    def flush(self):
+        self.file.flush()
+
+
+def timed(label, fn, requests):
+    started = time.perf_counter()
+    for _ in range(requests):
+        fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<30} {elapsed / requests * 1e6:8.1f} us/request")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--sink-latency-us", type=float, default=200)
+    args = parser.parse_args()
+    latency = args.sink_latency_us / 1e6
+
+    directory = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+    os.environ["ACCESS_LOG_FILE"] = ""
+    os.environ.setdefault("CACHE_BUS", "memory")
+
+    from flask import g, request
+    from app import app
+    from access_log import AccessLog, RotatingWriter
+
+    stdout = SlowFile(os.path.join(directory, "stdout.log"), "w", latency)
+
+    def print_line(response):
+        print(f"Response: {request.method} {request.path} - Status: {response.status_code}", file=stdout, flush=True)
+
+    logger = logging.getLogger("bench.access")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(logging.StreamHandler(SlowFile(os.path.join(directory, "sync.log"), "w", latency)))
+
+    def sync_json(response):
+        logger.info(json.dumps({
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "latency_ms": round((time.perf_counter() - g.access_started) * 1000, 2),
+            "sql": g.sql_count,
+            "bytes": response.calculate_content_length(),
+            "ip": request.remote_addr,
+        }))
+
+    class SlowWriter(RotatingWriter):
+        def write(self, data):
+            if latency:
+                time.sleep(latency)
+            super().write(data)
+
+    # Budget high enough that nothing is sampled away
+    access_log = AccessLog(SlowWriter(os.path.join(directory, "access.log")), get_budget=10 ** 9)
+
+    with app.test_request_context("/api/houses"):
+        response = app.response_class(b"[]", mimetype="application/json")
+        access_log._start()
+
+        old = timed("print per request (old)", lambda: print_line(response), args.requests)
+        sync = timed("sync JSON log handler", lambda: sync_json(response), args.requests)
+        queued = timed("access_log.py (queued)", lambda: access_log._finish(response), args.requests)
+
+        started = time.perf_counter()
+        access_log.flush()
+        print(f"Writer drained the backlog {time.perf_counter() - started:.2f} s later, off the request thread")
+        print(f"Speed-up vs print: {old / queued:.1f}x, vs sync handler: {sync / queued:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
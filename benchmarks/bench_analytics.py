@@ -0,0 +1,103 @@
+"""
+Benchmark /api/admin/analytics aggregation over a synthetic ledger.
+
+Compares the SQL GROUP BY path in analytics.py with pulling every ledger
+row into Python and aggregating there.
+
+    python benchmarks/bench_analytics.py [--rows 1000000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def build_ledger(db, rows):
+    from models import Admin, House, PointTransaction
+
+    db.session.add_all([House(name=f"House {i}", house_points=0) for i in range(6)])
+    db.session.add_all([Admin(name=f"Admin {i}", username=f"admin{i}", password_hash="x") for i in range(5)])
+    db.session.commit()
+
+    rng = random.Random(42)
+    reasons = [f"Reason {i}" for i in range(200)]
+    start = datetime(2024, 1, 1)
+    insert = PointTransaction.__table__.insert()
+    batch = []
+    for _ in range(rows):
+        batch.append({
+            "points_change": rng.choice((1, 2, 5, 10, 20, -5, -10)),
+            "reason": rng.choice(reasons),
+            "timestamp": start + timedelta(minutes=rng.randrange(2 * 365 * 24 * 60)),
+            "house_id": rng.randint(1, 6),
+            "admin_id": rng.randint(1, 5),
+        })
+        if len(batch) == 50000:
+            db.session.execute(insert, batch)
+            batch = []
+    if batch:
+        db.session.execute(insert, batch)
+    db.session.commit()
+
+
+def python_aggregation(db):
+    from models import PointTransaction
+
+    totals = {"house": {}, "admin": {}, "reason": {}, "week": {}}
+    rows = db.session.query(
+        PointTransaction.house_id,
+        PointTransaction.admin_id,
+        PointTransaction.reason,
+        PointTransaction.timestamp,
+        PointTransaction.points_change,
+    ).all()
+    for house_id, admin_id, reason, timestamp, change in rows:
+        year, week_number, _ = timestamp.isocalendar()
+        week = f"{year}-W{week_number:02d}"
+        for group, key in (("house", house_id), ("admin", admin_id), ("reason", reason), ("week", week)):
+            totals[group][key] = totals[group].get(key, 0) + change
+    return totals
+
+
+def timed(label, fn, repeat=3):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<28} {best * 1000:10.1f} ms")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "ledger.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    os.environ.setdefault("CACHE_BUS", "memory")
+
+    from app import app
+    from models import db
+    from analytics import ledger_analytics
+
+    with app.app_context():
+        db.create_all()
+        started = time.perf_counter()
+        build_ledger(db, args.rows)
+        print(f"Built {args.rows:,} ledger rows in {time.perf_counter() - started:.1f} s")
+
+        sql = timed("SQL GROUP BY (analytics.py)", lambda: ledger_analytics(db.session, "week"))
+        py = timed("Rows into Python", lambda: python_aggregation(db), repeat=1)
+        print(f"Speed-up: {py / sql:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark /api/members/search over a synthetic roster.
+
+Times the in-memory prefix index (SQLite and Postgres without pg_trgm)
+on typeahead-style queries, one keystroke at a time, and compares it with
+a LIKE scan. Point DATABASE_URL at Postgres with pg_trgm to time the
+trigram path as well.
+
+    python benchmarks/bench_member_search.py [--members 50000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FIRST = ["Ahmad", "Aisha", "Ali", "Amina", "Bilal", "Fatima", "Hamza", "Hasan", "Husain", "Ibrahim",
+         "Khadija", "Maryam", "Muhammad", "Nur", "Omar", "Ruqayya", "Salman", "Yasir", "Yusuf", "Zainab"]
+LAST = ["Abdullah", "Al-Amin", "Hakim", "Haddad", "Ismail", "Karim", "Mansur", "Nasser", "Rahman",
+        "Rashid", "Saleh", "Siddiq", "Sulaiman", "Tahir", "Uthman", "Wahid", "Yahya", "Zaki"]
+QUERIES = ["a", "ha", "has", "hasan", "hasan r", "hasan rah", "z", "zai", "zainab ha", "al", "al-am", "yus"]
+
+
+def build_roster(db, members):
+    from models import House, Member
+
+    db.session.add_all([House(name=f"House {i}", house_points=0) for i in range(6)])
+    db.session.commit()
+
+    rng = random.Random(42)
+    db.session.execute(Member.__table__.insert(), [
+        {
+            "name": f"{rng.choice(FIRST)} {rng.choice(LAST)} {rng.randrange(1000)}",
+            "role": "Member",
+            "house_id": rng.randint(1, 6),
+        }
+        for _ in range(members)
+    ])
+    db.session.commit()
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return samples[len(samples) // 2], samples[int(len(samples) * 0.99)]
+
+
+def timed(label, fn, repeat=20):
+    samples = []
+    for _ in range(repeat):
+        for q in QUERIES:
+            started = time.perf_counter()
+            fn(q)
+            samples.append((time.perf_counter() - started) * 1000)
+    p50, p99 = percentiles(samples)
+    print(f"{label:<26} p50 {p50:7.2f} ms   p99 {p99:7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--members", type=int, default=50_000)
+    args = parser.parse_args()
+
+    if not os.environ.get("DATABASE_URL", "").startswith("postgres"):
+        path = os.path.join(tempfile.mkdtemp(), "members.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    os.environ.setdefault("CACHE_BUS", "memory")
+    os.environ.setdefault("ACCESS_LOG_FILE", "")
+
+    from app import app
+    from models import db, Member
+    from member_search import MemberIndex, has_trigram, trigram_search
+
+    with app.app_context():
+        db.create_all()
+        build_roster(db, args.members)
+        print(f"Built {args.members:,} members")
+
+        index = MemberIndex()
+        started = time.perf_counter()
+        index.snapshot()
+        print(f"Index built in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+        timed("in-memory prefix index", lambda q: index.search(q, limit=20))
+        timed("LIKE scan", lambda q: Member.query.filter(
+            Member.name.ilike(f"%{q}%")
+        ).order_by(Member.name).limit(20).all(), repeat=3)
+        if has_trigram(db.session):
+            timed("pg_trgm", lambda q: trigram_search(db.session, q, limit=20))
+
+
+if __name__ == "__main__":
+    main()
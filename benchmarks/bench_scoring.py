@@ -0,0 +1,85 @@
+"""
+Benchmark scoring.py on a synthetic sports day.
+
+Compiles a rule set (event tables, bonuses, a "double points" window)
+and times scoring a day's results plus the standings preview, the work
+behind POST /api/admin/scoring/preview once its two queries are done.
+
+    python benchmarks/bench_scoring.py [--events 80] [--rules 60]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+HOUSES = 6
+
+
+def build_rules(events, count):
+    from models import ScoringRule
+
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    rules = [ScoringRule(
+        id=1, name="Double points week", kind="multiplier", factor=2.0, priority=0,
+        starts_at=now - timedelta(days=1), ends_at=now + timedelta(days=6)
+    )]
+    for i in range(2, count + 1):
+        kind = rng.choice(["placement", "bonus", "bonus"])
+        rules.append(ScoringRule(
+            id=i, name=f"Rule {i}", kind=kind, priority=rng.randrange(3),
+            event_id=rng.randint(1, events) if rng.random() < 0.8 else None,
+            house_id=rng.randint(1, HOUSES) if kind == "bonus" and rng.random() < 0.5 else None,
+            placement_points="100,60,40,20,10,5" if kind == "placement" else None,
+            points=rng.randint(-5, 10) if kind == "bonus" else None,
+        ))
+    return rules
+
+
+def timed(label, fn, repeat=200):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    p50, p99 = samples[len(samples) // 2], samples[int(len(samples) * 0.99)]
+    print(f"{label:<34} p50 {p50:7.3f} ms   p99 {p99:7.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=80)
+    parser.add_argument("--rules", type=int, default=60)
+    args = parser.parse_args()
+
+    from scoring import Result, RuleSet, standings_impact
+    from standings import HouseStanding
+
+    rules = build_rules(args.events, args.rules)
+    tables = {e: (50, 30, 20, 10, 5, 0) for e in range(1, args.events + 1)}
+    rng = random.Random(7)
+    results = []
+    for e in tables:
+        places = list(range(1, HOUSES + 1))
+        rng.shuffle(places)
+        results += [Result(e, h, p) for h, p in zip(range(1, HOUSES + 1), places)]
+    ranked = tuple(
+        HouseStanding(h, f"House {h}", None, None, 1000 - 10 * h, h) for h in range(1, HOUSES + 1)
+    )
+    print(f"{len(results):,} results, {len(rules)} rules")
+
+    timed("compile rules", lambda: RuleSet(rules))
+    rule_set = RuleSet(rules)
+    timed("score a sports day", lambda: rule_set.score_many(results, tables))
+    awards = rule_set.score_many(results, tables)
+    timed("standings impact", lambda: standings_impact(ranked, awards))
+    timed("score 100x the day", lambda: rule_set.score_many(results * 100, tables), repeat=10)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark the /api/announcements payload over a synthetic table.
+
+Compares the old path (full ORM objects, lazy-loaded house and captain,
+dicts built per row, jsonify) with serializers.py (only the serialized
+columns in one joined query, compiled row functions, compact encoding).
+
+    python benchmarks/bench_serializers.py [--rows 10000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def build_announcements(db, rows):
+    from models import Announcement, Captain, House
+
+    db.session.add_all([House(name=f"House {i}", house_points=0) for i in range(6)])
+    db.session.flush()
+    db.session.add_all([
+        Captain(name=f"Captain {i}", username=f"captain{i}", password_hash="x", house_id=i % 6 + 1)
+        for i in range(12)
+    ])
+    db.session.commit()
+
+    rng = random.Random(42)
+    start = datetime(2024, 1, 1)
+    insert = Announcement.__table__.insert()
+    batch = []
+    for i in range(rows):
+        captain_id = rng.randint(1, 12)
+        house_id = (captain_id - 1) % 6 + 1
+        batch.append({
+            "title": f"Announcement {i}",
+            "content": "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 4,
+            "image_url": None if i % 3 else f"https://res.cloudinary.com/demo/image/upload/a{i}.jpg",
+            "created_at": start + timedelta(minutes=i),
+            "house_id": house_id,
+            "house_name": f"House {house_id - 1}",
+            "captain_id": captain_id,
+            "captain_name": f"Captain {captain_id - 1}",
+        })
+    db.session.execute(insert, batch)
+    db.session.commit()
+
+
+def orm_payload(app, db):
+    from flask import jsonify
+    from models import Announcement
+
+    anns = Announcement.query.order_by(Announcement.created_at.desc()).all()
+    body = jsonify([
+        {
+            "id": a.id,
+            "title": a.title,
+            "content": a.content,
+            "image_url": a.image_url,
+            "created_at": a.created_at.isoformat(),
+            "house": {"id": a.house.id, "name": a.house.name},
+            "captain": {
+                "id": a.captain.id,
+                "username": a.captain.username,
+                "name": a.captain.name
+            }
+        }
+        for a in anns
+    ]).get_data()
+    db.session.expunge_all()
+    return body
+
+
+def serializer_payload(db):
+    from models import Announcement, Captain, House
+    from serializers import ANNOUNCEMENT, encode
+
+    rows = (
+        ANNOUNCEMENT.query(db.session)
+        .join(House, House.id == Announcement.house_id)
+        .join(Captain, Captain.id == Announcement.captain_id)
+        .order_by(Announcement.created_at.desc())
+        .all()
+    )
+    return encode(ANNOUNCEMENT.many(rows))
+
+
+def timed(label, fn, repeat=5):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<28} {best * 1000:10.1f} ms  {len(body) / 1024:8.0f} KiB")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "announcements.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    os.environ.setdefault("CACHE_BUS", "memory")
+
+    from app import app
+    from models import db
+
+    with app.test_request_context():
+        db.create_all()
+        build_announcements(db, args.rows)
+        print(f"Built {args.rows:,} announcements")
+
+        orm = timed("ORM objects + jsonify", lambda: orm_payload(app, db))
+        fast = timed("serializers.py", lambda: serializer_payload(db))
+        print(f"Speed-up: {orm / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
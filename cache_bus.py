@@ -0,0 +1,191 @@
+"""
+Cross-worker cache invalidation.
+
+Write routes publish a topic ("houses", "announcements", ...) after they
+commit; every worker subscribed to that topic drops the cache entries that
+depend on it. The publishing worker invalidates its own caches
+synchronously, the others hear about it through the backend:
+
+* MemoryBus   - in-process only (tests, single worker)
+* FileBus     - one file per topic under a shared directory, polled for
+                mtime changes; a local fallback that needs no database
+* PostgresBus - LISTEN/NOTIFY on the app's database
+
+`NamespacedBus` prefixes every topic, so tenants can share one backend.
+"""
+import os
+import threading
+import time
+import uuid
+
+from pg_notify import PgChannelListener
+from throttle import SingleFlight
+
+
+class MemoryBus:
+    def __init__(self):
+        self._handlers = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, topic, handler):
+        with self._lock:
+            self._handlers.setdefault(topic, []).append(handler)
+
+    def publish(self, topic):
+        self._dispatch(topic)
+
+    def _dispatch(self, topic):
+        with self._lock:
+            handlers = list(self._handlers.get(topic, ()))
+        for handler in handlers:
+            try:
+                handler(topic)
+            except Exception as e:
+                print(f"cache bus handler for {topic} failed: {e}")
+
+
+class FileBus(MemoryBus):
+    def __init__(self, directory, interval=0.05):
+        super().__init__()
+        self.directory = directory
+        self.interval = interval
+        self._seen = {}
+        self._thread = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, topic):
+        return os.path.join(self.directory, f"{topic}.stamp")
+
+    def _stamp(self, topic):
+        try:
+            return os.stat(self._path(topic)).st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
+    def subscribe(self, topic, handler):
+        super().subscribe(topic, handler)
+        self._seen.setdefault(topic, self._stamp(topic))
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name="cache-bus-file", daemon=True
+            )
+            self._thread.start()
+
+    def publish(self, topic):
+        path = self._path(topic)
+        with open(path, "a"):
+            os.utime(path, ns=(time.time_ns(), time.time_ns()))
+        self._seen[topic] = self._stamp(topic)
+        self._dispatch(topic)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            for topic, seen in list(self._seen.items()):
+                stamp = self._stamp(topic)
+                if stamp != seen:
+                    self._seen[topic] = stamp
+                    self._dispatch(topic)
+
+
+class PostgresBus(MemoryBus):
+    channel = "cache_invalidate"
+
+    def __init__(self, dsn, listener=None):
+        super().__init__()
+        # Our own NOTIFYs come back to us; the origin tells them apart
+        self.origin = uuid.uuid4().hex
+        self.listener = listener or PgChannelListener(dsn)
+        self.listener.subscribe(self.channel, self._receive)
+
+    def publish(self, topic):
+        self._dispatch(topic)
+        self.listener.notify(self.channel, f"{self.origin}:{topic}")
+
+    def _receive(self, payload):
+        origin, _, topic = payload.partition(":")
+        if origin != self.origin:
+            self._dispatch(topic)
+
+
+class NamespacedBus:
+    def __init__(self, bus, prefix):
+        self.bus = bus
+        self.prefix = prefix
+
+    def subscribe(self, topic, handler):
+        # Handlers see the un-prefixed topic, as with a bus of their own
+        self.bus.subscribe(self.prefix + topic, lambda _: handler(topic))
+
+    def publish(self, topic):
+        self.bus.publish(self.prefix + topic)
+
+
+class TopicCache:
+    """
+    Per-process cache whose entries are tagged with the topics they depend
+    on. Entries also expire after `ttl` seconds as a safety net for writes
+    that bypass the routes (seed scripts, manual SQL). Concurrent misses on
+    the same key share a single load.
+
+    Passing `version` ties an entry to that version of its source (e.g. the
+    standings version); asking with a different one reloads it.
+    """
+
+    def __init__(self, bus, ttl=60):
+        self.bus = bus
+        self.ttl = ttl
+        self._entries = {}
+        self._keys_by_topic = {}
+        self._generation = {}
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+
+    def get(self, key, loader, topics, ttl=None, version=None):
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic() and entry[2] == version:
+            return entry[1]
+        return self._flight.do(
+            (key, version), lambda: self._load(key, loader, topics, ttl, version)
+        )
+
+    def _load(self, key, loader, topics, ttl, version):
+        with self._lock:
+            for topic in topics:
+                if topic not in self._keys_by_topic:
+                    self._keys_by_topic[topic] = set()
+                    self.bus.subscribe(topic, self.invalidate)
+            generations = [self._generation.get(t, 0) for t in topics]
+        value = loader()
+        with self._lock:
+            # Skip storing if a topic was invalidated while we were loading
+            if generations == [self._generation.get(t, 0) for t in topics]:
+                expires = time.monotonic() + (ttl or self.ttl)
+                self._entries[key] = (expires, value, version)
+                for topic in topics:
+                    self._keys_by_topic[topic].add(key)
+        return value
+
+    def invalidate(self, topic):
+        with self._lock:
+            self._generation[topic] = self._generation.get(topic, 0) + 1
+            for key in self._keys_by_topic.get(topic, ()):
+                self._entries.pop(key, None)
+            self._keys_by_topic.get(topic, set()).clear()
+
+    def clear(self):
+        with self._lock:
+            for topic in list(self._generation) + list(self._keys_by_topic):
+                self._generation[topic] = self._generation.get(topic, 0) + 1
+            self._entries.clear()
+
+
+def make_bus(kind, database_url=None):
+    if kind is None:
+        is_postgres = bool(database_url) and database_url.startswith("postgresql")
+        kind = "postgres" if is_postgres else "file"
+    if kind == "postgres":
+        return PostgresBus(database_url)
+    if kind == "file":
+        return FileBus(os.environ.get("CACHE_BUS_DIR", "/tmp/houses-web-cache-bus"))
+    return MemoryBus()
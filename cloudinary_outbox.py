@@ -0,0 +1,155 @@
+"""
+Cloudinary deletions off the request path.
+
+Routes call `enqueue_deletion(public_id)` inside their own transaction, so
+the outbox row commits (or rolls back) together with the change that
+orphaned the image, along with a "cloudinary.drain" job (see jobs.py).
+The job runs on the jobs worker (`python jobs.py work`, the Procfile's
+`worker`) and drains the outbox in batches with the Admin API's bulk
+`delete_resources` (up to 100 ids per call); failures are retried with
+exponential backoff, and the job queues itself again for the earliest one.
+
+Run `python cloudinary_outbox.py` for a standalone drain loop instead.
+"""
+import re
+import time
+from datetime import datetime, timedelta
+
+from jobs import enqueue, job
+from models import db, CloudinaryDeletion
+from tenants import TENANTS, tenant_context
+
+BATCH_SIZE = 100
+MAX_ATTEMPTS = 8
+BASE_BACKOFF_SECONDS = 30
+OUTBOX_JOB_KEY = "outbox"
+
+
+def public_id_from_url(url):
+    """Recover the public_id from a delivery URL, for rows uploaded before we stored it."""
+    match = re.search(r"/upload/(?:[^/]+/)*?(?:v\d+/)?([^/].*?)(?:\.[A-Za-z0-9]+)?$", url or "")
+    return match.group(1) if match else None
+
+
+def enqueue_deletion(public_id):
+    if public_id:
+        db.session.add(CloudinaryDeletion(public_id=public_id))
+        enqueue("cloudinary.drain", key=OUTBOX_JOB_KEY)
+
+
+class CloudinaryClient:
+    def delete_resources(self, public_ids):
+        import cloudinary.api
+
+        result = cloudinary.api.delete_resources(public_ids, resource_type="image")
+        return result.get("deleted", {})
+
+
+class FakeCloudinary:
+    """Local stand-in for tests: records deletions, can be told to fail."""
+
+    def __init__(self, fail_ids=(), fail_all=False):
+        self.deleted = []
+        self.calls = 0
+        self.fail_ids = set(fail_ids)
+        self.fail_all = fail_all
+
+    def delete_resources(self, public_ids):
+        self.calls += 1
+        if self.fail_all:
+            raise RuntimeError("Cloudinary unavailable")
+        outcome = {}
+        for public_id in public_ids:
+            if public_id in self.fail_ids:
+                outcome[public_id] = "rate_limited"
+            else:
+                self.deleted.append(public_id)
+                outcome[public_id] = "deleted"
+        return outcome
+
+
+def drain_once(client, batch_size=BATCH_SIZE, now=None):
+    """Process one batch of due deletions. Returns how many rows were taken."""
+    now = now or datetime.utcnow()
+    rows = (
+        CloudinaryDeletion.query
+        .filter(CloudinaryDeletion.next_attempt_at <= now)
+        .filter(CloudinaryDeletion.attempts < MAX_ATTEMPTS)
+        .order_by(CloudinaryDeletion.next_attempt_at)
+        .limit(batch_size)
+        .all()
+    )
+    if not rows:
+        return 0
+
+    try:
+        outcome = client.delete_resources([r.public_id for r in rows])
+        error = None
+    except Exception as e:
+        outcome, error = {}, str(e)
+
+    for row in rows:
+        status = outcome.get(row.public_id)
+        if status in ("deleted", "not_found"):
+            db.session.delete(row)
+            continue
+        row.attempts += 1
+        row.last_error = error or f"Cloudinary returned {status!r}"
+        row.next_attempt_at = now + timedelta(
+            seconds=BASE_BACKOFF_SECONDS * 2 ** (row.attempts - 1)
+        )
+        if row.attempts >= MAX_ATTEMPTS:
+            print(f"Giving up on Cloudinary asset {row.public_id}: {row.last_error}")
+
+    db.session.commit()
+    return len(rows)
+
+
+def drain(client, batch_size=BATCH_SIZE):
+    total = 0
+    while True:
+        taken = drain_once(client, batch_size)
+        total += taken
+        if taken < batch_size:
+            return total
+
+
+# What the drain job talks to; tests swap in FakeCloudinary
+default_client = CloudinaryClient()
+
+
+@job("cloudinary.drain", max_attempts=3)
+def drain_job():
+    drain(default_client)
+    # Failed deletions wait out their backoff; come back for them then
+    next_at = (
+        db.session.query(db.func.min(CloudinaryDeletion.next_attempt_at))
+        .filter(CloudinaryDeletion.attempts < MAX_ATTEMPTS)
+        .scalar()
+    )
+    if next_at is not None:
+        delay = max((next_at - datetime.utcnow()).total_seconds(), 0)
+        enqueue("cloudinary.drain", delay=delay, key=OUTBOX_JOB_KEY)
+
+
+def main():
+    from app import app
+
+    client = CloudinaryClient()
+    print("🧹 Cloudinary outbox worker started")
+    while True:
+        done = 0
+        for tenant in TENANTS.values():
+            with tenant_context(app, tenant):
+                done += drain(client)
+        if done:
+            print(f"Processed {done} Cloudinary deletions")
+        time.sleep(30)
+
+
+if __name__ == "__main__":
+    # As in jobs.py: the app imports this module under its own name, so
+    # run that copy rather than a second __main__ one
+    import cloudinary_outbox
+
+    cloudinary_outbox.main()
@@ -0,0 +1,17 @@
+-- Column and table behind the Cloudinary deletion outbox (see cloudinary_outbox.py)
+-- Announcements uploaded before this keep a NULL public_id; their URL is parsed instead
+
+ALTER TABLE announcements ADD COLUMN image_public_id VARCHAR(255);
+
+CREATE TABLE IF NOT EXISTS cloudinary_deletions (
+    id SERIAL PRIMARY KEY,
+    public_id VARCHAR(255) NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    next_attempt_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS ix_cloudinary_deletions_next_attempt_at ON cloudinary_deletions (next_attempt_at);
+
+-- Verify
+SELECT COUNT(*) AS images_without_public_id FROM announcements WHERE image_url IS NOT NULL AND image_public_id IS NULL;
@@ -0,0 +1,21 @@
+"""
+gunicorn settings; picked up automatically by `gunicorn app:app`.
+
+Each worker warms up (pool connections, standings, cached public
+payloads; see warmup.py) before it accepts its first request.
+Set WARMUP=0 to skip it.
+"""
+import os
+
+# A long-poll holds a thread while it waits, at most LONG_POLL_MAX_WAITERS
+# of them at once; keep that below this. /ws sockets and uncapped long-polls
+# belong on ws_server.py (gunicorn_ws.conf.py)
+threads = int(os.environ.get("GUNICORN_THREADS", 1))
+
+
+def post_worker_init(worker):
+    if os.environ.get("WARMUP", "1") == "0":
+        return
+    from app import warmup
+
+    warmup.run()
@@ -0,0 +1,21 @@
+"""
+gunicorn settings for the WebSocket service (ws_server.py):
+
+    gunicorn ws_server:app -c gunicorn_ws.conf.py
+
+gevent workers: an open socket is a greenlet, not a thread, so each
+worker holds up to WS_CONNECTIONS of them.
+"""
+import os
+
+worker_class = "gevent"
+workers = int(os.environ.get("WEB_CONCURRENCY", 1))
+worker_connections = int(os.environ.get("WS_CONNECTIONS", 5000))
+
+
+def post_fork(server, worker):
+    # Without this a psycopg2 call (the broker's LISTEN, a login lookup)
+    # blocks every socket on the worker instead of yielding
+    from psycogreen.gevent import patch_psycopg
+
+    patch_psycopg()
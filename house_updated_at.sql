@@ -0,0 +1,9 @@
+-- houses.updated_at, behind Last-Modified on the public routes (see http_cache.py)
+-- Existing rows start from now (UTC, like the app's timestamps); every write to a house sets it afterwards
+
+ALTER TABLE houses ADD COLUMN updated_at TIMESTAMP;
+UPDATE houses SET updated_at = timezone('utc', now()) WHERE updated_at IS NULL;
+ALTER TABLE houses ALTER COLUMN updated_at SET NOT NULL;
+
+-- Verify
+SELECT id, name, updated_at FROM houses ORDER BY id;
@@ -0,0 +1,8 @@
+-- Optimistic concurrency for points changes (see points.py)
+-- Every points change bumps houses.version; totals start from 0 if unset
+
+ALTER TABLE houses ADD COLUMN version INTEGER NOT NULL DEFAULT 0;
+UPDATE houses SET house_points = 0 WHERE house_points IS NULL;
+
+-- Verify
+SELECT id, name, house_points, version FROM houses ORDER BY id;
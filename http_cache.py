@@ -0,0 +1,129 @@
+"""
+HTTP caching headers for the public GET routes, so that a reverse proxy
+or CDN in front of the app can answer most public traffic.
+
+Each route has a `CachePolicy`:
+
+* max_age  - seconds a response is fresh
+* swr      - seconds a proxy may keep serving it after that while it
+             refetches in the background (stale-while-revalidate)
+* topics   - the cache bus topics its payload depends on
+
+Last-Modified is the newest write timestamp in the tables behind the
+route's topics (max updated_at, ledger timestamp, ...), read from the
+database, so every worker gives the same answer and writes made outside
+the app count too. Each worker keeps the stamps until the cache bus
+publishes one of the topics, or for `ttl` seconds. HTTP dates have whole
+seconds and a slow transaction can commit an older timestamp after a newer
+one, so while the latest write is under SETTLE_SECONDS old there is no
+Last-Modified at all (clients refetch rather than risk a stale 304).
+Routes without topics (advisors, achievements) get Cache-Control only.
+If-Modified-Since (and If-None-Match, where the route sets an ETag) is
+answered with 304.
+
+Override a policy with HTTP_CACHE_<ENDPOINT>="max_age,swr", e.g.
+HTTP_CACHE_LIVE_SCORES="1,5"; HTTP_CACHE=0 turns the headers off.
+"""
+import calendar
+import math
+import os
+import threading
+import time
+from collections import namedtuple
+
+from flask import request
+
+from tenants import TENANT_HEADER, TENANTS
+
+CachePolicy = namedtuple("CachePolicy", "max_age swr topics")
+SETTLE_SECONDS = 2
+
+
+def policy_from_env(endpoint, policy):
+    raw = os.environ.get(f"HTTP_CACHE_{endpoint.upper()}")
+    if not raw:
+        return policy
+    max_age, _, swr = raw.partition(",")
+    return policy._replace(max_age=int(max_age), swr=int(swr or 0))
+
+
+class ChangeClock:
+    """
+    When each topic last changed, from `load_stamps()` -> {topic: naive UTC
+    datetime or None}, reloaded after the bus publishes a topic.
+    """
+
+    def __init__(self, load_stamps, bus, topics, ttl=60):
+        self.load_stamps = load_stamps
+        self.ttl = ttl
+        self._stamps = None
+        self._expires = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+        for topic in topics:
+            bus.subscribe(topic, self.invalidate)
+
+    def invalidate(self, *_):
+        with self._lock:
+            self._generation += 1
+            self._stamps = None
+
+    def _current(self):
+        with self._lock:
+            if self._stamps is not None and time.monotonic() < self._expires:
+                return self._stamps
+            generation = self._generation
+        stamps = self.load_stamps()
+        with self._lock:
+            # Not kept if a topic was published while we were reading
+            if generation == self._generation:
+                self._stamps = stamps
+                self._expires = time.monotonic() + self.ttl
+        return stamps
+
+    def last_modified(self, topics):
+        """Seconds since the epoch, or None while the latest change is settling."""
+        stamps = self._current()
+        latest = max((stamps[t] for t in topics if stamps.get(t)), default=None)
+        if latest is None:
+            return None
+        seconds = math.ceil(calendar.timegm(latest.timetuple()) + latest.microsecond / 1e6)
+        if seconds > time.time() - SETTLE_SECONDS:
+            return None
+        return seconds
+
+
+class HttpCache:
+    def __init__(self, clocks, policies):
+        self.clocks = clocks
+        self.enabled = os.environ.get("HTTP_CACHE", "1") != "0"
+        self.policies = {name: policy_from_env(name, p) for name, p in policies.items()}
+
+    def topics(self):
+        return sorted({t for p in self.policies.values() for t in p.topics})
+
+    def init_app(self, app):
+        if self.enabled:
+            app.after_request(self.apply)
+
+    def apply(self, response):
+        policy = self.policies.get(request.endpoint)
+        if policy is None or request.method not in ("GET", "HEAD") or response.status_code != 200:
+            return response
+        # A response that sets a cookie is someone's, never a shared one
+        if "Set-Cookie" in response.headers:
+            return response
+
+        # Routes that set their own (e.g. immutable logo images) keep it
+        if "Cache-Control" not in response.headers:
+            value = f"public, max-age={policy.max_age}"
+            if policy.swr:
+                value += f", stale-while-revalidate={policy.swr}"
+            response.headers["Cache-Control"] = value
+        if len(TENANTS) > 1:
+            response.vary.add(TENANT_HEADER)
+        if policy.topics:
+            last_modified = self.clocks.for_tenant().last_modified(policy.topics)
+            if last_modified is not None:
+                response.last_modified = last_modified
+        return response.make_conditional(request)
@@ -0,0 +1,122 @@
+"""
+Idempotency-Key support for write routes.
+
+A client that retries a POST with the same Idempotency-Key header gets the
+first attempt's stored response back instead of the work being redone
+(no second point award, no second Cloudinary upload). Keys are scoped to
+the logged-in user and expire after KEY_TTL.
+
+The key is claimed (row with no response yet) before the route runs, so a
+retry that races the original gets 409 instead of running in parallel.
+Server errors release the claim so the client can simply retry. A claim
+only lasts CLAIM_TTL: if the worker died before storing the response, the
+key is free again once that passes instead of answering 409 for a day.
+"""
+import hashlib
+import os
+import random
+from datetime import datetime, timedelta
+from functools import wraps
+
+from flask import jsonify, make_response, request
+from flask_login import current_user
+from sqlalchemy.exc import IntegrityError
+
+from models import db, IdempotencyKey
+
+KEY_TTL = timedelta(hours=24)
+# Longer than any write route takes, Cloudinary uploads included
+CLAIM_TTL = timedelta(seconds=int(os.environ.get('IDEMPOTENCY_CLAIM_SECONDS', 120)))
+MAX_KEY_LENGTH = 255
+PURGE_CHANCE = 0.01
+
+
+def request_fingerprint():
+    digest = hashlib.sha256()
+    digest.update(request.method.encode())
+    digest.update(request.path.encode())
+    if request.files or request.form:
+        for name, value in sorted(request.form.items(multi=True)):
+            digest.update(f"{name}={value}".encode())
+        for name, upload in sorted(request.files.items(multi=True)):
+            digest.update(f"{name}:{upload.filename}".encode())
+            digest.update(upload.read())
+            upload.seek(0)
+    else:
+        digest.update(request.get_data())
+    return digest.hexdigest()
+
+
+def _error(message, status):
+    response = jsonify({"error": message})
+    response.status_code = status
+    return response
+
+
+def idempotent(f):
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if not key:
+            return f(*args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return _error("Idempotency-Key is too long", 400)
+
+        scope = f"{type(current_user).__name__.lower()}:{current_user.id}"
+        fingerprint = request_fingerprint()
+        now = datetime.utcnow()
+
+        record = IdempotencyKey.query.filter_by(scope=scope, key=key).first()
+        if record is not None and record.expires_at <= now:
+            db.session.delete(record)
+            db.session.commit()
+            record = None
+
+        if record is not None:
+            if record.request_hash != fingerprint:
+                return _error("Idempotency-Key was already used for a different request", 422)
+            if record.status_code is None:
+                return _error("A request with this Idempotency-Key is still in progress", 409)
+            response = make_response(record.response_body, record.status_code)
+            response.mimetype = 'application/json'
+            response.headers['Idempotent-Replayed'] = 'true'
+            return response
+
+        if random.random() < PURGE_CHANCE:
+            IdempotencyKey.query.filter(IdempotencyKey.expires_at <= now).delete(
+                synchronize_session=False
+            )
+        record = IdempotencyKey(
+            scope=scope,
+            key=key,
+            request_hash=fingerprint,
+            expires_at=now + CLAIM_TTL
+        )
+        db.session.add(record)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return _error("A request with this Idempotency-Key is still in progress", 409)
+        record_id = record.id
+
+        try:
+            response = make_response(f(*args, **kwargs))
+        except Exception:
+            db.session.rollback()
+            IdempotencyKey.query.filter_by(id=record_id).delete()
+            db.session.commit()
+            raise
+
+        db.session.rollback()
+        if response.status_code >= 500:
+            IdempotencyKey.query.filter_by(id=record_id).delete()
+        else:
+            IdempotencyKey.query.filter_by(id=record_id).update({
+                IdempotencyKey.status_code: response.status_code,
+                IdempotencyKey.response_body: response.get_data(as_text=True),
+                IdempotencyKey.expires_at: datetime.utcnow() + KEY_TTL
+            })
+        db.session.commit()
+        return response
+    return decorated
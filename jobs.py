@@ -0,0 +1,359 @@
+"""
+Durable background jobs, stored in the `jobs` table of the app's database.
+
+Handlers are registered by name; routes enqueue work inside their own
+transaction, so a job exists exactly when the change that needs it
+committed:
+
+    @job("exports.ledger", max_attempts=3, concurrency=1)
+    def export_ledger(season_id):
+        ...
+
+    enqueue("exports.ledger", season_id=season.id)
+    db.session.commit()
+
+`python jobs.py work` (the `worker` process in the Procfile) claims due
+jobs and runs them on a thread pool.
+
+* Claiming: on Postgres due rows are selected FOR UPDATE SKIP LOCKED, so
+  workers never wait on each other's rows. SQLite has no row locks; there
+  the claim takes the database write lock first, which makes its select
+  and update one atomic step.
+* Retries: a failed job is retried up to `max_attempts` times with
+  exponential backoff and jitter, then marked failed and kept for
+  `python jobs.py retry`. A job left running by a worker that died is
+  requeued after JOB_TIMEOUT_SECONDS.
+* Concurrency: a worker runs at most `--concurrency` jobs at once, and a
+  handler registered with `concurrency=N` runs at most N at once across
+  all workers (counted under an advisory lock on Postgres).
+
+Every tenant's database has its own queue; the worker polls them all.
+"""
+import argparse
+import json
+import os
+import random
+import signal
+import socket
+import threading
+import time
+import traceback
+import zlib
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from models import db, Job
+from tenants import TENANTS, tenant_context
+
+BASE_BACKOFF_SECONDS = 10
+MAX_BACKOFF_SECONDS = 3600
+JOB_TIMEOUT = timedelta(seconds=int(os.environ.get("JOB_TIMEOUT_SECONDS", 600)))
+# Finished jobs are kept this long, failed ones until retried or deleted
+JOB_RETENTION = timedelta(days=7)
+MAINTENANCE_INTERVAL_SECONDS = 60
+
+Handler = namedtuple("Handler", "name fn max_attempts backoff concurrency")
+HANDLERS = {}
+
+
+def job(name, max_attempts=5, backoff=BASE_BACKOFF_SECONDS, concurrency=None):
+    """Register `fn(**payload)` as the handler for jobs called `name`."""
+
+    def register(fn):
+        HANDLERS[name] = Handler(name, fn, max_attempts, backoff, concurrency)
+        return fn
+    return register
+
+
+def enqueue(name, delay=0, key=None, **payload):
+    """
+    Add a job to the current session; it runs once the caller commits.
+    With a `key`, a job already queued under the same name and key is
+    reused (and brought forward if this one is due sooner).
+    """
+    handler = HANDLERS.get(name)
+    if handler is None:
+        raise ValueError(f"Unknown job {name!r}")
+    run_at = datetime.utcnow() + timedelta(seconds=delay)
+    if key is not None:
+        queued = Job.query.filter_by(name=name, key=key, status="queued").first()
+        if queued is not None:
+            queued.run_at = min(queued.run_at, run_at)
+            return queued
+    row = Job(
+        name=name,
+        key=key,
+        payload=json.dumps(payload),
+        max_attempts=handler.max_attempts,
+        run_at=run_at
+    )
+    db.session.add(row)
+    return row
+
+
+def backoff_seconds(handler, attempts):
+    base = handler.backoff if handler else BASE_BACKOFF_SECONDS
+    delay = min(base * 2 ** (attempts - 1), MAX_BACKOFF_SECONDS)
+    # Jitter keeps jobs that failed together from retrying together
+    return delay * random.uniform(0.8, 1.2)
+
+
+# =====================
+# Claiming
+# =====================
+
+def _is_postgres():
+    return db.session.connection().dialect.name == "postgresql"
+
+
+def _lock_claims(name=None):
+    """Serialize the claim that follows, on its own transaction."""
+    if _is_postgres():
+        if name is not None:
+            db.session.execute(
+                db.text("SELECT pg_advisory_xact_lock(:key)"),
+                {"key": zlib.crc32(f"jobs:{name}".encode())}
+            )
+    else:
+        # Any write takes SQLite's database lock, held until commit
+        db.session.execute(db.text("UPDATE jobs SET id = id WHERE 1 = 0"))
+
+
+def _take(query, limit, worker_id, now):
+    if limit <= 0:
+        return []
+    ids = [
+        row.id for row in
+        query.with_entities(Job.id)
+        .order_by(Job.run_at, Job.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .all()
+    ]
+    if ids:
+        Job.query.filter(Job.id.in_(ids)).update({
+            Job.status: "running",
+            Job.locked_by: worker_id,
+            Job.locked_at: now,
+            Job.attempts: Job.attempts + 1,
+        }, synchronize_session=False)
+    return ids
+
+
+def claim(worker_id, slots, now=None):
+    """Mark up to `slots` due jobs as running for `worker_id`; returns their ids."""
+    now = now or datetime.utcnow()
+    due = Job.query.filter(Job.status == "queued", Job.run_at <= now)
+    limited = {h.name: h.concurrency for h in HANDLERS.values() if h.concurrency}
+    claimed = []
+
+    # Limited handlers first, so a flood of other jobs can't starve them
+    for name, concurrency in limited.items():
+        if len(claimed) >= slots:
+            break
+        _lock_claims(name)
+        running = Job.query.filter_by(name=name, status="running").count()
+        free = min(slots - len(claimed), concurrency - running)
+        claimed += _take(due.filter(Job.name == name), free, worker_id, now)
+        db.session.commit()
+
+    if len(claimed) < slots:
+        _lock_claims()
+        rest = due.filter(Job.name.notin_(list(limited))) if limited else due
+        claimed += _take(rest, slots - len(claimed), worker_id, now)
+        db.session.commit()
+    return claimed
+
+
+# =====================
+# Running
+# =====================
+
+def _finish(job_id, worker_id, **values):
+    # Only the claiming worker may finish a job; a requeued one is someone else's now
+    return Job.query.filter_by(id=job_id, status="running", locked_by=worker_id).update(
+        values, synchronize_session=False
+    )
+
+
+def run_job(job_id, worker_id, now=None):
+    """Run one claimed job. Returns its new status."""
+    row = Job.query.get(job_id)
+    handler = HANDLERS.get(row.name)
+    payload = json.loads(row.payload)
+    try:
+        if handler is None:
+            raise LookupError(f"No handler registered for {row.name!r}")
+        handler.fn(**payload)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        row = Job.query.get(job_id)
+        now = now or datetime.utcnow()
+        error = f"{type(e).__name__}: {e}"
+        values = {"last_error": traceback.format_exc()[-4000:], "locked_by": None}
+        if row.attempts >= row.max_attempts:
+            status = "failed"
+            values.update(status=status, finished_at=now)
+            print(f"❌ Job {row.id} {row.name} failed for good: {error}")
+        else:
+            status = "queued"
+            values.update(status=status, run_at=now + timedelta(seconds=backoff_seconds(handler, row.attempts)))
+            print(f"⚠️ Job {row.id} {row.name} failed (attempt {row.attempts}), will retry: {error}")
+        _finish(job_id, worker_id, **values)
+    else:
+        status = "done"
+        _finish(job_id, worker_id, status=status, finished_at=now or datetime.utcnow(), last_error=None)
+    db.session.commit()
+    return status
+
+
+def requeue_stale(now=None):
+    """Give jobs whose worker vanished back to the queue (or fail them)."""
+    now = now or datetime.utcnow()
+    stale = Job.query.filter(Job.status == "running", Job.locked_at < now - JOB_TIMEOUT)
+    failed = stale.filter(Job.attempts >= Job.max_attempts).update({
+        Job.status: "failed",
+        Job.finished_at: now,
+        Job.last_error: "Worker stopped while running the job",
+    }, synchronize_session=False)
+    requeued = stale.filter(Job.attempts < Job.max_attempts).update({
+        Job.status: "queued",
+        Job.run_at: now,
+        Job.locked_by: None,
+    }, synchronize_session=False)
+    return requeued + failed
+
+
+def prune(now=None):
+    cutoff = (now or datetime.utcnow()) - JOB_RETENTION
+    return Job.query.filter(Job.status == "done", Job.finished_at < cutoff).delete(synchronize_session=False)
+
+
+class Worker:
+    """Polls every tenant's queue and runs jobs on up to `concurrency` threads."""
+
+    def __init__(self, app, concurrency=4, poll_interval=1.0, worker_id=None):
+        self.app = app
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self._pool = ThreadPoolExecutor(concurrency, thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._active = 0
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._maintained_at = {}
+
+    def stop(self, *_):
+        self._stopping.set()
+        self._wake.set()
+
+    def _maintain(self, tenant):
+        if time.monotonic() - self._maintained_at.get(tenant.slug, -MAINTENANCE_INTERVAL_SECONDS) < MAINTENANCE_INTERVAL_SECONDS:
+            return
+        self._maintained_at[tenant.slug] = time.monotonic()
+        if requeue_stale():
+            print(f"♻️ Requeued stale jobs for {tenant.slug}")
+        prune()
+        db.session.commit()
+
+    def poll(self):
+        """Claim and start whatever fits in the free slots. Returns how many started."""
+        started = 0
+        for tenant in TENANTS.values():
+            with self._lock:
+                free = self.concurrency - self._active
+            if free <= 0:
+                break
+            with tenant_context(self.app, tenant):
+                self._maintain(tenant)
+                ids = claim(self.id, free)
+            with self._lock:
+                self._active += len(ids)
+            for job_id in ids:
+                self._pool.submit(self._execute, tenant, job_id)
+            started += len(ids)
+        return started
+
+    def _execute(self, tenant, job_id):
+        try:
+            with tenant_context(self.app, tenant):
+                run_job(job_id, self.id)
+        except Exception as e:
+            print(f"Job {job_id} could not be run: {e}")
+        finally:
+            with self._lock:
+                self._active -= 1
+            self._wake.set()
+
+    def run(self):
+        print(f"👷 Job worker {self.id} started ({self.concurrency} slots)")
+        while not self._stopping.is_set():
+            try:
+                started = self.poll()
+            except Exception as e:
+                print(f"Job poll failed: {e}")
+                started = 0
+            if not started:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+        # Jobs already running finish; nothing new is claimed
+        self._pool.shutdown(wait=True)
+        print(f"👋 Job worker {self.id} stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Background jobs")
+    sub = parser.add_subparsers(dest="command", required=True)
+    work = sub.add_parser("work", help="run jobs until SIGTERM")
+    work.add_argument("--concurrency", type=int, default=int(os.environ.get("JOB_CONCURRENCY", 4)))
+    work.add_argument("--poll", type=float, default=float(os.environ.get("JOB_POLL_SECONDS", 1.0)))
+    sub.add_parser("status", help="job counts by name and status")
+    retry = sub.add_parser("retry", help="queue failed jobs again")
+    retry.add_argument("ids", nargs="*", type=int, help="job ids (default: every failed job)")
+    args = parser.parse_args()
+
+    # Importing the app registers every handler
+    from app import app
+
+    if args.command == "work":
+        worker = Worker(app, args.concurrency, args.poll)
+        signal.signal(signal.SIGTERM, worker.stop)
+        signal.signal(signal.SIGINT, worker.stop)
+        worker.run()
+        return
+
+    for tenant in TENANTS.values():
+        with tenant_context(app, tenant):
+            if args.command == "status":
+                rows = (
+                    db.session.query(Job.name, Job.status, db.func.count(Job.id))
+                    .group_by(Job.name, Job.status)
+                    .order_by(Job.name, Job.status)
+                    .all()
+                )
+                print(f"{tenant.slug}:")
+                for name, status, count in rows:
+                    print(f"  {name:<30} {status:<8} {count}")
+            else:
+                failed = Job.query.filter_by(status="failed")
+                if args.ids:
+                    failed = failed.filter(Job.id.in_(args.ids))
+                count = failed.update({
+                    Job.status: "queued",
+                    Job.attempts: 0,
+                    Job.run_at: datetime.utcnow(),
+                    Job.finished_at: None,
+                }, synchronize_session=False)
+                db.session.commit()
+                print(f"🔁 Queued {count} failed job(s) again for {tenant.slug}")
+
+
+if __name__ == "__main__":
+    # Handlers register in the `jobs` module the app imports, not in this
+    # __main__ copy of it; run the worker from that module so it sees them
+    import jobs
+
+    jobs.main()
@@ -0,0 +1,145 @@
+"""
+Change notification for the live standings.
+
+The point-award routes (and a season reset) publish the standings version
+their transaction took from `standings.next_version()` once it has
+committed. Versions come from the single standings_clock row, so they
+follow commit order (see standings.py). Long-poll requests wait on the
+notifier until the version moves past the one the client already has.
+
+Notifiers:
+* InProcessNotifier - a threading.Condition, enough for a single worker
+* PostgresNotifier  - same interface, fanned out to every gunicorn worker
+                      through LISTEN/NOTIFY
+"""
+import threading
+import time
+import uuid
+
+from pg_notify import PgChannelListener
+
+
+class InProcessNotifier:
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._subscribers = []
+        self.version = 0
+
+    def subscribe(self, callback):
+        """Call `callback(version)` for every version delivered to this worker."""
+        self._subscribers.append(callback)
+
+    def publish(self, version):
+        self._deliver(version)
+
+    def _deliver(self, version):
+        with self._cond:
+            if version > self.version:
+                self.version = version
+            self._cond.notify_all()
+        for callback in self._subscribers:
+            callback(version)
+
+    def wait(self, seen, timeout):
+        """Block until the version is past `seen` or `timeout` seconds pass."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self.version <= seen:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return self.version
+
+
+class PostgresNotifier(InProcessNotifier):
+    def __init__(self, dsn, listener=None, channel="live_points"):
+        super().__init__()
+        self.channel = channel
+        # Our own NOTIFYs come back to us; the origin tells them apart
+        self.origin = uuid.uuid4().hex
+        self.listener = listener or PgChannelListener(dsn)
+        self.listener.subscribe(self.channel, self._receive)
+
+    def publish(self, version):
+        # Wake local waiters straight away, the other workers via NOTIFY
+        self._deliver(version)
+        self.listener.notify(self.channel, f"{self.origin}:{version}")
+
+    def _receive(self, payload):
+        origin, _, version = payload.rpartition(":")
+        if origin != self.origin:
+            self._deliver(int(version))
+
+
+class StandingsFeed:
+    """
+    Caches the encoded standings body per version so that a change is
+    queried and serialized once, however many long-polls it wakes up.
+
+    `loader` returns (version, body_bytes). `max_age` bounds staleness
+    when another worker wrote and the notifier cannot tell us about it.
+    `slots` (a semaphore) caps how many requests may wait at once; the
+    rest are answered straight away as if their wait had timed out.
+    """
+
+    def __init__(self, notifier, loader, max_age=2.0, slots=None):
+        self.notifier = notifier
+        self.loader = loader
+        self.max_age = max_age
+        self.slots = slots
+        self._lock = threading.Lock()
+        # (version, body, loaded_at), swapped as a whole so readers never
+        # see a body from one version with the number of another
+        self._state = None
+
+    def _fresh(self, state):
+        return (
+            state is not None
+            and state[0] >= self.notifier.version
+            and time.monotonic() - state[2] < self.max_age
+        )
+
+    def current(self):
+        state = self._state
+        if self._fresh(state):
+            return state[0], state[1]
+        with self._lock:
+            # Another thread may have refreshed while we waited for the lock
+            state = self._state
+            if not self._fresh(state):
+                version, body = self.loader()
+                state = self._state = (version, body, time.monotonic())
+                if version > self.notifier.version:
+                    self.notifier._deliver(version)
+            return state[0], state[1]
+
+    def invalidate(self, *_):
+        with self._lock:
+            self._state = None
+
+    def wait(self, seen, timeout):
+        """Return (version, body) once past `seen`, or (version, None) on timeout."""
+        version, body = self.current()
+        if version > seen:
+            return version, body
+        if self.slots is not None and not self.slots.acquire(blocking=False):
+            return version, None
+        try:
+            if self.notifier.wait(seen, timeout) > seen:
+                return self.current()
+        finally:
+            if self.slots is not None:
+                self.slots.release()
+        return version, None
+
+
+def make_notifier(kind, database_url=None, channel="live_points", listener=None):
+    if kind is None:
+        is_postgres = bool(database_url) and database_url.startswith("postgresql")
+        kind = "postgres" if is_postgres else "memory"
+    if kind == "postgres":
+        if not database_url or not database_url.startswith("postgresql"):
+            raise RuntimeError("LIVE_POINTS_NOTIFIER=postgres needs a Postgres DATABASE_URL")
+        return PostgresNotifier(database_url, listener, channel)
+    return InProcessNotifier()
@@ -0,0 +1,91 @@
+"""
+House logos served from our own origin.
+
+Logo URLs carry a content token derived from the stored Cloudinary URL
+(which changes on every upload) so they can be cached forever:
+
+    /api/houses/<id>/logo/<token>
+
+Houses without an upload get a generated SVG placeholder instead of a
+round-trip to an external placeholder service. Cloudinary logos are
+fetched once per version and kept on local disk.
+"""
+import hashlib
+import os
+from xml.sax.saxutils import escape
+
+from snapshots import write_atomic
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+PALETTE = ["#2E7D32", "#1565C0", "#6A1B9A", "#C62828", "#EF6C00", "#00838F", "#4E342E", "#37474F"]
+EXTENSIONS = {
+    "image/png": "png",
+    "image/jpeg": "jpg",
+    "image/gif": "gif",
+    "image/webp": "webp",
+    "image/svg+xml": "svg",
+}
+
+
+def logo_token(name, logo_url):
+    source = logo_url or f"placeholder:{name}"
+    return hashlib.sha1(source.encode()).hexdigest()[:12]
+
+
+def logo_path(house_id, name, logo_url):
+    return f"/api/houses/{house_id}/logo/{logo_token(name, logo_url)}"
+
+
+def house_logo_url(house):
+    # BASE_URL makes the URL absolute for the separately hosted frontend
+    base_url = os.environ.get("BASE_URL", "").rstrip("/")
+    return base_url + logo_path(house.id, house.name, house.logo_url)
+
+
+def placeholder_svg(name):
+    digest = hashlib.sha1(name.encode()).digest()
+    color = PALETTE[digest[0] % len(PALETTE)]
+    words = [w for w in name.replace("-", " ").split() if w]
+    initials = escape("".join(w[0] for w in words[-2:]).upper() or "?")
+    return (
+        '<svg xmlns="http://www.w3.org/2000/svg" width="500" height="500" viewBox="0 0 500 500">'
+        f'<rect width="500" height="500" fill="{color}"/>'
+        '<text x="50%" y="50%" dy=".35em" text-anchor="middle" '
+        'font-family="Helvetica, Arial, sans-serif" font-size="180" fill="#fff">'
+        f'{initials}</text>'
+        f'<title>{escape(name)}</title>'
+        '</svg>'
+    ).encode()
+
+
+class LogoStore:
+    def __init__(self, directory, timeout=10):
+        self.directory = directory
+        self.timeout = timeout
+
+    def _find(self, stem):
+        for ext in EXTENSIONS.values():
+            path = os.path.join(self.directory, f"{stem}.{ext}")
+            if os.path.exists(path):
+                return path, ext
+        return None, None
+
+    def get(self, house_id, token, source_url):
+        """Return (bytes, mimetype) for a Cloudinary logo, fetching it on first use."""
+        stem = f"{house_id}-{token}"
+        path, ext = self._find(stem)
+        if path is None:
+            import requests
+
+            response = requests.get(source_url, timeout=self.timeout)
+            response.raise_for_status()
+            mimetype = response.headers.get("Content-Type", "").split(";")[0].strip()
+            ext = EXTENSIONS.get(mimetype)
+            if ext is None:
+                raise ValueError(f"Unexpected logo content type {mimetype!r}")
+            path = os.path.join(self.directory, f"{stem}.{ext}")
+            write_atomic(path, response.content)
+
+        mimetype = next(m for m, e in EXTENSIONS.items() if e == ext)
+        with open(path, "rb") as f:
+            return f.read(), mimetype
@@ -0,0 +1,245 @@
+"""
+Member search for the typeahead.
+
+On Postgres with pg_trgm installed, search runs in the database against a
+trigram GIN index on lower(name) (create it with `python member_search.py
+index`). Everywhere else each worker keeps a prefix index in memory.
+
+Results are ranked by how the query matches: whole-name prefix first,
+then a prefix of the first word, then any word. Ties go to the shorter
+name. Members are numbered in that tie-break order, and the index keeps
+sorted token lists with those numbers alongside: whole names, first
+words, and every word of every name. A prefix lookup is two bisects
+giving a slice of member numbers; multi-word queries intersect slices,
+and the best matches are the smallest numbers left.
+
+The in-memory index is dropped whenever a transaction that touched
+members commits (see `watch_members`) or the "members"/"houses" cache
+topics fire, and it is rebuilt on the next search.
+"""
+import argparse
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from collections import namedtuple
+from heapq import nsmallest
+from itertools import islice
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models import db, House, Member
+
+MemberEntry = namedtuple("MemberEntry", "id name role house_id house_name words key")
+
+TRGM_INDEX = "ix_members_name_trgm"
+
+
+SEPARATORS = str.maketrans("-'’_.", "     ")
+
+
+def normalize(text):
+    # Case- and accent-insensitive, with hyphens and apostrophes splitting words
+    text = text.casefold()
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(text.translate(SEPARATORS).split())
+
+
+def load_members():
+    rows = (
+        db.session.query(Member.id, Member.name, Member.role, Member.house_id, House.name)
+        .join(House, House.id == Member.house_id)
+        .all()
+    )
+    entries = []
+    for id, name, role, house_id, house_name in rows:
+        key = normalize(name)
+        entries.append(MemberEntry(id, name, role, house_id, house_name, tuple(key.split()), key))
+    return entries
+
+
+def _prefix_slice(index, prefix):
+    """Member numbers whose token starts with `prefix`."""
+    tokens, numbers = index
+    return numbers[bisect_left(tokens, prefix):bisect_left(tokens, prefix + "\uffff")]
+
+
+class MemberIndex:
+    def __init__(self, loader=load_members, max_age=600):
+        self.loader = loader
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._loaded_at = 0.0
+        # (entries, sorted (token, position) pairs), replaced as a whole
+        self._snapshot = None
+
+    def _stale(self):
+        return self._snapshot is None or time.monotonic() - self._loaded_at > self.max_age
+
+    def _build(self):
+        entries = sorted(self.loader(), key=lambda e: (len(e.name), e.name, e.id))
+        names = sorted((e.key, n) for n, e in enumerate(entries))
+        firsts = sorted((e.words[0], n) for n, e in enumerate(entries) if e.words)
+        words = sorted({(w, n) for n, e in enumerate(entries) for w in e.words})
+        self._loaded_at = time.monotonic()
+        self._snapshot = (
+            entries,
+            [e.house_name.casefold() for e in entries],
+            ([k for k, _ in names], [n for _, n in names]),
+            ([k for k, _ in firsts], [n for _, n in firsts]),
+            ([k for k, _ in words], [n for _, n in words]),
+        )
+
+    def snapshot(self):
+        if self._stale():
+            with self._lock:
+                if self._stale():
+                    self._build()
+        return self._snapshot
+
+    def search(self, q, house=None, limit=20):
+        query = normalize(q)
+        words = query.split()
+        if not words:
+            return []
+        entries, houses, names, firsts, all_words = self.snapshot()
+        house = house.casefold() if house else None
+
+        def best(numbers, count):
+            if house is None:
+                return nsmallest(count, numbers)
+            return list(islice((n for n in sorted(numbers) if houses[n] == house), count))
+
+        # Whole-name prefix
+        found = best(_prefix_slice(names, query), limit)
+        if len(found) < limit:
+            # Every query word prefixes some word of the name
+            matching = None
+            for word in set(words):
+                numbers = set(_prefix_slice(all_words, word))
+                matching = numbers if matching is None else matching & numbers
+            matching.difference_update(found)
+            # ... the first word first
+            first = matching.intersection(_prefix_slice(firsts, words[0]))
+            found += best(first, limit - len(found))
+            if len(found) < limit:
+                found += best(matching - first, limit - len(found))
+        return [entries[n] for n in found]
+
+    def invalidate(self, *_):
+        with self._lock:
+            self._snapshot = None
+
+
+# =====================
+# Postgres trigram search
+# =====================
+
+_trigram_ready = {}
+
+
+def has_trigram(session):
+    """True when pg_trgm is installed; checked once per database URL."""
+    connection = session.connection()
+    if connection.dialect.name != "postgresql":
+        return False
+    url = str(connection.engine.url)
+    if url not in _trigram_ready:
+        _trigram_ready[url] = bool(session.execute(db.text(
+            "SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"
+        )).scalar())
+    return _trigram_ready[url]
+
+
+def _like_escape(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def trigram_search(session, q, house=None, limit=20):
+    query = " ".join(q.casefold().split())
+    words = query.split()
+    if not words:
+        return []
+    name = db.func.lower(Member.name)
+    rows = (
+        session.query(
+            Member.id,
+            Member.name,
+            Member.role,
+            Member.house_id,
+            House.name.label("house_name")
+        )
+        .join(House, House.id == Member.house_id)
+        .filter(*[name.like(f"%{_like_escape(w)}%", escape="\\") for w in words])
+    )
+    if house:
+        rows = rows.filter(db.func.lower(House.name) == house.casefold())
+    return rows.order_by(
+        name.like(f"{_like_escape(query)}%", escape="\\").desc(),
+        db.func.similarity(name, query).desc(),
+        db.func.length(Member.name),
+        Member.name
+    ).limit(limit).all()
+
+
+def search_members(session, index, q, house=None, limit=20):
+    if has_trigram(session):
+        return trigram_search(session, q, house, limit)
+    return index.search(q, house, limit)
+
+
+def create_trigram_index(session):
+    session.execute(db.text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    session.execute(db.text(
+        f"CREATE INDEX IF NOT EXISTS {TRGM_INDEX} "
+        f"ON members USING gin (lower(name) gin_trgm_ops)"
+    ))
+    _trigram_ready.clear()
+
+
+# =====================
+# Change tracking
+# =====================
+
+def watch_members(callback):
+    """Call `callback()` after every commit that inserted, changed or deleted members."""
+
+    @event.listens_for(Session, "after_flush")
+    def _note_members(session, flush_context):
+        changed = session.new | session.dirty | session.deleted
+        if any(isinstance(obj, Member) for obj in changed):
+            session.info["members_changed"] = True
+
+    @event.listens_for(Session, "after_commit")
+    def _members_committed(session):
+        if session.info.pop("members_changed", False):
+            callback()
+
+    @event.listens_for(Session, "after_rollback")
+    def _members_rolled_back(session):
+        session.info.pop("members_changed", None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Member search index")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("index")
+    args = parser.parse_args()
+
+    from app import app
+
+    with app.app_context():
+        if args.command == "index":
+            if db.session.connection().dialect.name != "postgresql":
+                print("⚠️ Not on Postgres: searches use the in-memory prefix index")
+                return
+            create_trigram_index(db.session)
+            db.session.commit()
+            print(f"✅ {TRGM_INDEX} trigram index is in place")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,16 @@
-from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from datetime import datetime
-db = SQLAlchemy()
+from tenants import TenantSQLAlchemy, scoped_user_id
+db = TenantSQLAlchemy()
 
-class Admin(db.Model, UserMixin):
+
+class TenantUserMixin(UserMixin):
+    def get_id(self):
+        # Sessions and remember cookies carry the tenant (see tenants.py)
+        return scoped_user_id(self.id)
+
+
+class Admin(db.Model, TenantUserMixin):
     __tablename__ = 'admins'
 
     id = db.Column(db.Integer, primary_key=True)
@@ -26,7 +33,11 @@ class House(db.Model):
     name = db.Column(db.String(150), nullable=False)
     description = db.Column(db.Text)
     house_points = db.Column(db.Integer, default=0)
+    # Bumped by every points change; see points.py
+    version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     logo_url = db.Column(db.String(500))
+    # Any change, points included; Last-Modified for the "houses" topic (see http_cache.py)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     members = db.relationship('Member', back_populates='house')
     captains = db.relationship('Captain', back_populates='house')
@@ -39,7 +50,7 @@ class House(db.Model):
         return f'<House {self.name}>'
 
 
-class Captain(db.Model, UserMixin):
+class Captain(db.Model, TenantUserMixin):
     __tablename__ = 'captains'
 
     id = db.Column(db.Integer, primary_key=True)
@@ -66,6 +77,15 @@ class Member(db.Model):
     house_id = db.Column(db.Integer, db.ForeignKey('houses.id'), nullable=False)
     house = db.relationship('House', back_populates='members')
 
+    # Lets captain dashboards sync only what changed (see sync.py)
+    updated_at = db.Column(
+        db.DateTime,
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+        index=True
+    )
+
     def __repr__(self):
         return f'<Member {self.name}>'
 
@@ -108,6 +128,7 @@ class Announcement(db.Model):
     title = db.Column(db.String(150), nullable=False)
     content = db.Column(db.Text, nullable=False)
     image_url = db.Column(db.String(500), nullable=True)
+    image_public_id = db.Column(db.String(255), nullable=True)
     created_at = db.Column(
         db.DateTime,
         nullable=False,
@@ -116,6 +137,18 @@ class Announcement(db.Model):
     house_id = db.Column(db.Integer, db.ForeignKey('houses.id'), nullable=False)
     captain_id = db.Column(db.Integer, db.ForeignKey('captains.id'), nullable=True)
 
+    # Copied at write time so per-house feeds can be read without joins
+    house_name = db.Column(db.String(150))
+    captain_name = db.Column(db.String(150))
+
+    updated_at = db.Column(
+        db.DateTime,
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+        index=True
+    )
+
     house = db.relationship('House', back_populates='announcements')
     captain = db.relationship('Captain', back_populates='announcements')
 
@@ -123,8 +156,32 @@ class Announcement(db.Model):
         return f'<Announcement {self.title}>'
 
 
+# Covers the per-house feed: filter on house, newest first, id as tie-breaker
+db.Index(
+    'ix_announcements_house_created',
+    Announcement.house_id,
+    Announcement.created_at.desc(),
+    Announcement.id.desc()
+)
+
+
+@db.event.listens_for(Announcement, 'before_insert')
+def fill_announcement_names(mapper, connection, target):
+    # Seed scripts create announcements too, so fill the copies here rather than in the route
+    if target.house_name is None:
+        target.house_name = connection.execute(
+            db.select(House.name).where(House.id == target.house_id)
+        ).scalar()
+    if target.captain_name is None and target.captain_id is not None:
+        target.captain_name = connection.execute(
+            db.select(Captain.name).where(Captain.id == target.captain_id)
+        ).scalar()
+
+
 class PointTransaction(db.Model):
     __tablename__ = 'point_transactions'
+    # Ids must never be reused once a season is archived (see seasons.py)
+    __table_args__ = {'sqlite_autoincrement': True}
 
     id = db.Column(db.Integer, primary_key=True)
     points_change = db.Column(db.Integer, nullable=False)
@@ -133,7 +190,8 @@ class PointTransaction(db.Model):
     timestamp = db.Column(
         db.DateTime,
         nullable=False,
-        default=datetime.utcnow
+        default=datetime.utcnow,
+        index=True
     )
 
     house_id = db.Column(db.Integer, db.ForeignKey('houses.id'), nullable=False)
@@ -143,3 +201,249 @@ class PointTransaction(db.Model):
     admin = db.relationship('Admin', back_populates='point_transactions')
     def __repr__(self):
         return f'<PointTransaction {self.points_change}>'
+
+
+class Event(db.Model):
+    __tablename__ = 'events'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(150), nullable=False)
+    description = db.Column(db.Text)
+    # Points per finishing place, comma separated: "50,30,20" = 1st 50, 2nd 30, 3rd 20
+    placement_points = db.Column(db.String(255), nullable=False, default='50,30,20,10,5,0')
+    status = db.Column(db.String(20), nullable=False, default='open')
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    approved_at = db.Column(db.DateTime)
+    approved_by = db.Column(db.Integer, db.ForeignKey('admins.id'), nullable=True)
+
+    submissions = db.relationship('ScoreSubmission', back_populates='event')
+
+    def points_for(self, placement):
+        table = [int(p) for p in self.placement_points.split(',') if p.strip()]
+        return table[placement - 1] if 0 < placement <= len(table) else 0
+
+    def __repr__(self):
+        return f'<Event {self.name}>'
+
+
+class ScoreSubmission(db.Model):
+    __tablename__ = 'score_submissions'
+    __table_args__ = (
+        db.UniqueConstraint('event_id', 'house_id', name='uq_submission_event_house'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    placement = db.Column(db.Integer, nullable=False)
+    note = db.Column(db.String(255))
+    status = db.Column(db.String(20), nullable=False, default='pending')
+    points_awarded = db.Column(db.Integer)
+    submitted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    event_id = db.Column(db.Integer, db.ForeignKey('events.id'), nullable=False)
+    house_id = db.Column(db.Integer, db.ForeignKey('houses.id'), nullable=False)
+    captain_id = db.Column(db.Integer, db.ForeignKey('captains.id'), nullable=True)
+    # No foreign key: the ledger row may since have moved to the season archive
+    transaction_id = db.Column(db.Integer, nullable=True)
+
+    event = db.relationship('Event', back_populates='submissions')
+    house = db.relationship('House')
+
+    def __repr__(self):
+        return f'<ScoreSubmission event={self.event_id} house={self.house_id}>'
+
+
+# How event results turn into points; compiled and applied by scoring.py
+class ScoringRule(db.Model):
+    __tablename__ = 'scoring_rules'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(150), nullable=False)
+    # "placement" (points table), "bonus" (flat points) or "multiplier"
+    kind = db.Column(db.String(20), nullable=False)
+    placement_points = db.Column(db.String(255))
+    points = db.Column(db.Integer)
+    factor = db.Column(db.Float)
+    # Optional scope: one event, one house, a time window
+    event_id = db.Column(db.Integer, db.ForeignKey('events.id'), nullable=True)
+    house_id = db.Column(db.Integer, db.ForeignKey('houses.id'), nullable=True)
+    starts_at = db.Column(db.DateTime)
+    ends_at = db.Column(db.DateTime)
+    priority = db.Column(db.Integer, nullable=False, default=0)
+    active = db.Column(db.Boolean, nullable=False, default=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ScoringRule {self.name}>'
+
+
+# Outbox of Cloudinary assets waiting to be destroyed by the background worker
+class CloudinaryDeletion(db.Model):
+    __tablename__ = 'cloudinary_deletions'
+
+    id = db.Column(db.Integer, primary_key=True)
+    public_id = db.Column(db.String(255), nullable=False)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    next_attempt_at = db.Column(
+        db.DateTime,
+        nullable=False,
+        default=datetime.utcnow,
+        index=True
+    )
+
+    def __repr__(self):
+        return f'<CloudinaryDeletion {self.public_id}>'
+
+
+# Durable background jobs, claimed and run by `python jobs.py work`
+class Job(db.Model):
+    __tablename__ = 'jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.Text, nullable=False, default='{}')
+    # At most one queued job per (name, key); see jobs.enqueue
+    key = db.Column(db.String(255))
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = db.Column(db.String(100))
+    locked_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_jobs_status_run_at', 'status', 'run_at'),
+        db.Index('ix_jobs_name_key', 'name', 'key'),
+    )
+
+    def __repr__(self):
+        return f'<Job {self.id} {self.name} {self.status}>'
+
+
+class Season(db.Model):
+    __tablename__ = 'seasons'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(150), unique=True, nullable=False)
+    closed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_transaction_id = db.Column(db.Integer)
+
+    standings = db.relationship(
+        'SeasonStanding',
+        back_populates='season',
+        order_by='SeasonStanding.rank'
+    )
+
+    def __repr__(self):
+        return f'<Season {self.name}>'
+
+
+class SeasonStanding(db.Model):
+    __tablename__ = 'season_standings'
+
+    id = db.Column(db.Integer, primary_key=True)
+    season_id = db.Column(db.Integer, db.ForeignKey('seasons.id'), nullable=False)
+    house_id = db.Column(db.Integer, db.ForeignKey('houses.id'), nullable=False)
+    house_name = db.Column(db.String(150), nullable=False)
+    points = db.Column(db.Integer, nullable=False)
+    rank = db.Column(db.Integer, nullable=False)
+
+    season = db.relationship('Season', back_populates='standings')
+
+    def __repr__(self):
+        return f'<SeasonStanding {self.house_name} #{self.rank}>'
+
+
+# One row: the standings version, taken by every points change (see standings.py)
+class StandingsClock(db.Model):
+    __tablename__ = 'standings_clock'
+
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False)
+
+
+# Closed seasons' ledger rows, same ids as when they were live
+class PointTransactionArchive(db.Model):
+    __tablename__ = 'point_transactions_archive'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    points_change = db.Column(db.Integer, nullable=False)
+    reason = db.Column(db.String(255), nullable=False)
+    timestamp = db.Column(db.DateTime, nullable=False, index=True)
+    house_id = db.Column(db.Integer, db.ForeignKey('houses.id'), nullable=False)
+    admin_id = db.Column(db.Integer, db.ForeignKey('admins.id'), nullable=True)
+    season_id = db.Column(db.Integer, db.ForeignKey('seasons.id'), nullable=False, index=True)
+
+    def __repr__(self):
+        return f'<PointTransactionArchive {self.points_change}>'
+
+
+class IdempotencyKey(db.Model):
+    __tablename__ = 'idempotency_keys'
+    __table_args__ = (
+        db.UniqueConstraint('scope', 'key', name='uq_idempotency_scope_key'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    scope = db.Column(db.String(64), nullable=False)
+    key = db.Column(db.String(255), nullable=False)
+    request_hash = db.Column(db.String(64), nullable=False)
+    # NULL until the original request finishes; until then expires_at is the short claim expiry
+    status_code = db.Column(db.Integer)
+    response_body = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f'<IdempotencyKey {self.scope} {self.key}>'
+
+
+# Deleted members and announcements, so syncing clients learn to drop them
+class SyncTombstone(db.Model):
+    __tablename__ = 'sync_tombstones'
+    __table_args__ = (
+        db.Index('ix_sync_tombstones_house_deleted', 'house_id', 'deleted_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)
+    object_id = db.Column(db.Integer, nullable=False)
+    house_id = db.Column(db.Integer, nullable=False)
+    captain_id = db.Column(db.Integer)
+    deleted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<SyncTombstone {self.kind} {self.object_id}>'
+
+
+def _tombstone(connection, kind, object_id, house_id, captain_id=None):
+    connection.execute(SyncTombstone.__table__.insert().values(
+        kind=kind,
+        object_id=object_id,
+        house_id=house_id,
+        captain_id=captain_id,
+        deleted_at=datetime.utcnow()
+    ))
+
+
+@db.event.listens_for(Member, 'after_delete')
+def tombstone_member(mapper, connection, target):
+    _tombstone(connection, 'member', target.id, target.house_id)
+
+
+@db.event.listens_for(Member, 'after_update')
+def tombstone_moved_member(mapper, connection, target):
+    # A member moved to another house is gone as far as the old house is concerned
+    history = db.inspect(target).attrs.house_id.history
+    for old_house_id in history.deleted or ():
+        if old_house_id is not None and old_house_id != target.house_id:
+            _tombstone(connection, 'member', target.id, old_house_id)
+
+
+@db.event.listens_for(Announcement, 'after_delete')
+def tombstone_announcement(mapper, connection, target):
+    _tombstone(connection, 'announcement', target.id, target.house_id, target.captain_id)
@@ -0,0 +1,92 @@
+"""
+Small helper around Postgres LISTEN/NOTIFY.
+
+One background thread per worker process holds a dedicated connection,
+LISTENs on the channels that have handlers and calls them with the
+notification payload. Sending goes through a second, autocommit
+connection so it never joins (or waits on) the request's transaction.
+
+psycopg2 is imported lazily so the rest of the app still runs on SQLite.
+"""
+import select
+import threading
+import time
+
+
+class PgChannelListener:
+    def __init__(self, dsn, poll_interval=5.0):
+        self.dsn = dsn
+        self.poll_interval = poll_interval
+        self._handlers = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._send_conn = None
+
+    def subscribe(self, channel, handler):
+        with self._lock:
+            self._handlers.setdefault(channel, []).append(handler)
+        self._ensure_started()
+
+    def notify(self, channel, payload):
+        # pg_notify() instead of NOTIFY so the payload is a bound parameter
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._send_conn is None or self._send_conn.closed:
+                        self._send_conn = self._connect()
+                    with self._send_conn.cursor() as cur:
+                        cur.execute("SELECT pg_notify(%s, %s)", (channel, str(payload)))
+                    return
+                except Exception as e:
+                    self._send_conn = None
+                    if attempt:
+                        print(f"pg_notify failed on {channel}: {e}")
+
+    def _connect(self):
+        import psycopg2
+        from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+        conn = psycopg2.connect(self.dsn)
+        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        return conn
+
+    def _ensure_started(self):
+        # Started lazily so gunicorn's fork happens before the thread exists
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="pg-listener", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                conn = self._connect()
+                listening = set()
+                while True:
+                    with self._lock:
+                        channels = set(self._handlers) - listening
+                    with conn.cursor() as cur:
+                        for channel in channels:
+                            cur.execute(f'LISTEN "{channel}"')
+                            listening.add(channel)
+
+                    if select.select([conn], [], [], self.poll_interval) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        note = conn.notifies.pop(0)
+                        self._dispatch(note.channel, note.payload)
+            except Exception as e:
+                print(f"pg listener error, reconnecting: {e}")
+                time.sleep(1)
+
+    def _dispatch(self, channel, payload):
+        with self._lock:
+            handlers = list(self._handlers.get(channel, ()))
+        for handler in handlers:
+            try:
+                handler(payload)
+            except Exception as e:
+                print(f"pg listener handler for {channel} failed: {e}")
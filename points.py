@@ -0,0 +1,85 @@
+"""
+Concurrency-safe changes to a house's points.
+
+Each change is one conditional UPDATE, so no worker ever writes back a
+total it read earlier:
+
+    UPDATE houses SET house_points = house_points + :delta, version = version + 1
+     WHERE id = :id
+       [AND house_points + :delta >= :floor]   -- deductions, when there is a floor
+       [AND version = :expected]               -- the caller saw this version
+
+`houses.version` goes up with every points change. A caller that showed
+an admin a total can send its version back; if another write landed in
+between, nothing is written and it gets a PointsConflict with the current
+numbers instead of overwriting them.
+
+When the UPDATE matches nothing, one read tells why (no such house, below
+the floor, version moved). If none of those holds any more, the row
+changed between the two statements and the change is tried again, at
+most MAX_ATTEMPTS times in all. The attempts it took are reported back.
+"""
+import os
+from collections import namedtuple
+
+from models import db, House
+
+MAX_ATTEMPTS = 3
+# Deductions may not take a house below this; POINTS_FLOOR="" allows any total
+_floor = os.environ.get('POINTS_FLOOR', '0')
+POINTS_FLOOR = int(_floor) if _floor else None
+
+PointsChange = namedtuple("PointsChange", "house_id name points version attempts")
+
+
+class PointsConflict(Exception):
+    def __init__(self, message, points, version, attempts):
+        super().__init__(message)
+        self.points = points
+        self.version = version
+        self.attempts = attempts
+
+
+class BelowFloor(PointsConflict):
+    pass
+
+
+def change_points(house_id, delta, floor=POINTS_FLOOR, expected_version=None, max_attempts=MAX_ATTEMPTS):
+    """
+    Add `delta` (negative to deduct) to a house in the current transaction;
+    the caller commits. Raises LookupError, BelowFloor or PointsConflict.
+    """
+    check_floor = floor is not None and delta < 0
+    for attempt in range(1, max_attempts + 1):
+        query = House.query.filter(House.id == house_id)
+        if check_floor:
+            query = query.filter(House.house_points + delta >= floor)
+        if expected_version is not None:
+            query = query.filter(House.version == expected_version)
+        updated = query.update({
+            House.house_points: House.house_points + delta,
+            House.version: House.version + 1,
+        }, synchronize_session=False)
+
+        # After our own write this reads the row we hold locked
+        row = (
+            db.session.query(House.name, House.house_points, House.version)
+            .filter(House.id == house_id)
+            .first()
+        )
+        if updated:
+            return PointsChange(house_id, row.name, row.house_points, row.version, attempt)
+        if row is None:
+            raise LookupError(f"House {house_id} not found")
+        if expected_version is not None and row.version != expected_version:
+            raise PointsConflict(
+                f"{row.name} changed since version {expected_version}", row.house_points, row.version, attempt
+            )
+        if check_floor and row.house_points + delta < floor:
+            raise BelowFloor(
+                f"{row.name} has {row.house_points} points; it can't go below {floor}",
+                row.house_points, row.version, attempt
+            )
+    raise PointsConflict(
+        f"{row.name} kept changing; try again", row.house_points, row.version, max_attempts
+    )
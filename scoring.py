@@ -0,0 +1,228 @@
+"""
+Scoring rules: how event results turn into points.
+
+Rules are rows in scoring_rules. Each worker compiles the active ones
+once into a `RuleSet` (rebuilt when an admin changes a rule, or after
+`max_age`) and scores whole batches of results against it:
+
+    points = round((base + bonuses) * multipliers)
+
+* base        - the table of the highest-priority matching "placement"
+                rule, else the event's own placement_points
+* bonuses     - every matching "bonus" rule adds its points (negative
+                points make a penalty)
+* multipliers - every matching "multiplier" rule multiplies (2 = double)
+
+A rule matches a result when its event, house and time window (each
+optional) all match. The window is checked against the time the batch
+is scored, normally the moment the events are approved, so "double
+points this week" is a multiplier of 2 with starts_at/ends_at set.
+
+A batch filters the rule list by time once and each event's rules once,
+then every result is a walk over a handful of tuples.
+"""
+import math
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from models import db, Event, House, ScoringRule
+
+KINDS = ("placement", "bonus", "multiplier")
+
+Result = namedtuple("Result", "event_id house_id placement")
+Award = namedtuple("Award", "event_id house_id placement points base bonus factor rules")
+CompiledRule = namedtuple(
+    "CompiledRule",
+    "id name kind event_id house_id starts_at ends_at table points factor"
+)
+
+
+def parse_table(text):
+    return tuple(int(p) for p in (text or "").split(",") if p.strip())
+
+
+def _place(table, placement):
+    return table[placement - 1] if 0 < placement <= len(table) else 0
+
+
+class RuleSet:
+    """Active rules, compiled for scoring. Immutable once built."""
+
+    def __init__(self, rules):
+        # Highest priority first; on a tie the newer rule wins
+        self.rules = tuple(
+            CompiledRule(
+                r.id, r.name, r.kind, r.event_id, r.house_id, r.starts_at, r.ends_at,
+                parse_table(r.placement_points), r.points or 0, r.factor
+            )
+            for r in sorted(rules, key=lambda r: (-(r.priority or 0), -(r.id or 0)))
+        )
+
+    def score_many(self, results, tables, at=None):
+        """
+        Score `results` (Result tuples) as of `at`. `tables` maps event id
+        to the event's own placement table, used when no rule gives one.
+        """
+        at = at or datetime.utcnow()
+        live = [
+            r for r in self.rules
+            if (r.starts_at is None or r.starts_at <= at) and (r.ends_at is None or at < r.ends_at)
+        ]
+        by_event = {}
+        awards = []
+        for event_id, house_id, placement in results:
+            rules = by_event.get(event_id)
+            if rules is None:
+                rules = by_event[event_id] = [r for r in live if r.event_id is None or r.event_id == event_id]
+
+            base = None
+            bonus = 0
+            factor = 1.0
+            applied = []
+            for rule in rules:
+                if rule.house_id is not None and rule.house_id != house_id:
+                    continue
+                if rule.kind == "placement":
+                    if base is not None:
+                        continue
+                    base = _place(rule.table, placement)
+                elif rule.kind == "bonus":
+                    bonus += rule.points
+                else:
+                    factor *= rule.factor
+                applied.append(rule.name)
+            if base is None:
+                base = _place(tables.get(event_id, ()), placement)
+            points = math.floor((base + bonus) * factor + 0.5)
+            awards.append(Award(event_id, house_id, placement, points, base, bonus, factor, tuple(applied)))
+        return awards
+
+
+def load_rules():
+    return ScoringRule.query.filter_by(active=True).all()
+
+
+class ScoringEngine:
+    """Keeps the compiled RuleSet; `invalidate` after rules change."""
+
+    def __init__(self, loader=load_rules, max_age=300):
+        self.loader = loader
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._rule_set = None
+        self._loaded_at = 0.0
+
+    def _stale(self):
+        return self._rule_set is None or time.monotonic() - self._loaded_at > self.max_age
+
+    def rules(self):
+        if self._stale():
+            with self._lock:
+                if self._stale():
+                    self._rule_set = RuleSet(self.loader())
+                    self._loaded_at = time.monotonic()
+        return self._rule_set
+
+    def invalidate(self, *_):
+        with self._lock:
+            self._rule_set = None
+
+
+def score_submissions(rule_set, events, submissions, at=None):
+    """Awards for ScoreSubmission-like rows of `events`, in submission order."""
+    tables = {e.id: parse_table(e.placement_points) for e in events}
+    return rule_set.score_many(
+        [Result(s.event_id, s.house_id, s.placement) for s in submissions], tables, at
+    )
+
+
+def standings_impact(ranked, awards):
+    """Current and resulting points and ranks per house, without writing anything."""
+    deltas = {}
+    for award in awards:
+        deltas[award.house_id] = deltas.get(award.house_id, 0) + award.points
+    # Same order as the standings engine: points, then id
+    after = sorted((-(h.points + deltas.get(h.id, 0)), h.id) for h in ranked)
+    new_rank = {house_id: i + 1 for i, (_, house_id) in enumerate(after)}
+    return [
+        {
+            "id": h.id,
+            "name": h.name,
+            "points": h.points,
+            "delta": deltas.get(h.id, 0),
+            "new_points": h.points + deltas.get(h.id, 0),
+            "rank": h.rank,
+            "new_rank": new_rank[h.id],
+        }
+        for h in sorted(ranked, key=lambda h: new_rank[h.id])
+    ]
+
+
+def build_rule(data):
+    """A ScoringRule from admin JSON; raises ValueError with a message for the client."""
+    name = (data.get('name') or '').strip()
+    kind = data.get('kind')
+    if not name:
+        raise ValueError("Rule name is required")
+    if kind not in KINDS:
+        raise ValueError(f"kind must be one of: {', '.join(KINDS)}")
+
+    rule = ScoringRule(name=name[:150], kind=kind)
+    try:
+        if kind == "placement":
+            table = [int(p) for p in data.get('placement_points') or []]
+            if not table or any(p < 0 for p in table):
+                raise ValueError("placement_points must be a non-empty list of non-negative numbers")
+            rule.placement_points = ','.join(str(p) for p in table)
+        elif kind == "bonus":
+            rule.points = int(data['points'])
+        else:
+            rule.factor = float(data['factor'])
+            if not 0 <= rule.factor <= 100:
+                raise ValueError("factor must be between 0 and 100")
+        for field, model in (('event_id', Event), ('house_id', House)):
+            if data.get(field) is not None:
+                setattr(rule, field, int(data[field]))
+                # A bad id would only surface as a foreign key error at commit
+                if db.session.query(model.id).filter_by(id=getattr(rule, field)).first() is None:
+                    raise ValueError(f"{field} {getattr(rule, field)} does not exist")
+        for field in ('starts_at', 'ends_at'):
+            if data.get(field):
+                setattr(rule, field, datetime.fromisoformat(data[field]))
+        rule.priority = int(data.get('priority') or 0)
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Invalid rule: {e}")
+    if rule.starts_at and rule.ends_at and rule.ends_at <= rule.starts_at:
+        raise ValueError("ends_at must be after starts_at")
+    return rule
+
+
+def rule_json(rule):
+    return {
+        "id": rule.id,
+        "name": rule.name,
+        "kind": rule.kind,
+        "placement_points": list(parse_table(rule.placement_points)) if rule.placement_points else None,
+        "points": rule.points,
+        "factor": rule.factor,
+        "event_id": rule.event_id,
+        "house_id": rule.house_id,
+        "starts_at": rule.starts_at.isoformat() if rule.starts_at else None,
+        "ends_at": rule.ends_at.isoformat() if rule.ends_at else None,
+        "priority": rule.priority,
+    }
+
+
+def award_json(award):
+    return {
+        "event_id": award.event_id,
+        "house_id": award.house_id,
+        "placement": award.placement,
+        "points": award.points,
+        "base": award.base,
+        "bonus": award.bonus,
+        "factor": award.factor,
+        "rules": list(award.rules),
+    }
@@ -0,0 +1,21 @@
+-- Table behind the configurable scoring rules (see scoring.py)
+-- Empty means every event keeps scoring from its own placement points
+
+CREATE TABLE IF NOT EXISTS scoring_rules (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(150) NOT NULL,
+    kind VARCHAR(20) NOT NULL,
+    placement_points VARCHAR(255),
+    points INTEGER,
+    factor DOUBLE PRECISION,
+    event_id INTEGER REFERENCES events (id),
+    house_id INTEGER REFERENCES houses (id),
+    starts_at TIMESTAMP,
+    ends_at TIMESTAMP,
+    priority INTEGER NOT NULL DEFAULT 0,
+    active BOOLEAN NOT NULL DEFAULT TRUE,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Verify
+SELECT COUNT(*) AS scoring_rules FROM scoring_rules;
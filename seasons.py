@@ -0,0 +1,153 @@
+"""
+Season close-out and ledger archival.
+
+Closing a season snapshots the final standings and moves every ledger row
+up to that point from point_transactions into point_transactions_archive
+(ids are kept), all in one transaction. The live ledger then only holds
+the current season, so anything that scans it stays fast.
+
+Resetting the points takes a new standings version (see standings.py),
+which the command publishes so that long-polls and live sockets see it.
+
+Historical reads go through `point_transactions_history`, a UNION ALL
+view over both tables (or `ledger_history()` from Python).
+
+    python seasons.py close "2025/2026" [--reset-points]
+    python seasons.py view
+"""
+import argparse
+import sys
+
+from sqlalchemy import func, literal, select, union_all
+
+from models import (
+    db,
+    House,
+    PointTransaction,
+    PointTransactionArchive,
+    Season,
+    SeasonStanding,
+)
+from standings import next_version
+
+HISTORY_VIEW = "point_transactions_history"
+LEDGER_COLUMNS = ("id", "points_change", "reason", "timestamp", "house_id", "admin_id")
+
+
+def ledger_history():
+    """Selectable over live and archived ledger rows, with season_id (NULL = current)."""
+    live = select(
+        *[getattr(PointTransaction, c) for c in LEDGER_COLUMNS],
+        literal(None, db.Integer).label("season_id")
+    )
+    archived = select(
+        *[getattr(PointTransactionArchive, c) for c in LEDGER_COLUMNS],
+        PointTransactionArchive.season_id
+    )
+    return union_all(live, archived).subquery(HISTORY_VIEW)
+
+
+def create_history_view(session):
+    columns = ", ".join(LEDGER_COLUMNS)
+    dialect = session.connection().dialect.name
+    create = "CREATE OR REPLACE VIEW" if dialect == "postgresql" else "CREATE VIEW IF NOT EXISTS"
+    session.execute(db.text(
+        f"{create} {HISTORY_VIEW} AS "
+        f"SELECT {columns}, CAST(NULL AS INTEGER) AS season_id FROM point_transactions "
+        f"UNION ALL "
+        f"SELECT {columns}, season_id FROM point_transactions_archive"
+    ))
+
+
+def _reuses_ids(session):
+    # SQLite tables created without AUTOINCREMENT hand out max(id) + 1, so
+    # emptying the ledger would recycle ids that already live in the archive
+    if session.connection().dialect.name != "sqlite":
+        return False
+    sql = session.execute(db.text(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'point_transactions'"
+    )).scalar() or ""
+    return "AUTOINCREMENT" not in sql.upper()
+
+
+def close_season(session, name, reset_points=False):
+    """Returns (season, rows archived, standings version or None if points were kept)."""
+    if Season.query.filter_by(name=name).first():
+        raise ValueError(f"Season {name!r} is already closed")
+
+    last_id = session.query(func.max(PointTransaction.id)).scalar()
+    cutoff = last_id
+    if cutoff is not None and _reuses_ids(session):
+        cutoff -= 1
+
+    season = Season(name=name, last_transaction_id=last_id)
+    session.add(season)
+    session.flush()
+
+    houses = House.query.all()
+    ordered = sorted(houses, key=lambda h: (-(h.house_points or 0), h.id))
+    for rank, house in enumerate(ordered, start=1):
+        session.add(SeasonStanding(
+            season_id=season.id,
+            house_id=house.id,
+            house_name=house.name,
+            points=house.house_points or 0,
+            rank=rank
+        ))
+
+    moved = 0
+    if cutoff is not None:
+        columns = ", ".join(LEDGER_COLUMNS)
+        moved = session.execute(db.text(
+            f"INSERT INTO point_transactions_archive ({columns}, season_id) "
+            f"SELECT {columns}, :season_id FROM point_transactions WHERE id <= :cutoff"
+        ), {"season_id": season.id, "cutoff": cutoff}).rowcount
+        session.execute(
+            db.text("DELETE FROM point_transactions WHERE id <= :cutoff"),
+            {"cutoff": cutoff}
+        )
+
+    version = None
+    if reset_points:
+        House.query.update({House.house_points: 0, House.version: House.version + 1}, synchronize_session=False)
+        version = next_version()
+
+    create_history_view(session)
+    session.commit()
+    return season, moved, version
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Close a season and archive its ledger")
+    sub = parser.add_subparsers(dest="command", required=True)
+    close = sub.add_parser("close")
+    close.add_argument("name")
+    close.add_argument("--reset-points", action="store_true")
+    sub.add_parser("view")
+    args = parser.parse_args()
+
+    from app import app, broadcast_points, live_points_notifier, publish_change
+
+    with app.app_context():
+        if args.command == "view":
+            create_history_view(db.session)
+            db.session.commit()
+            print(f"✅ {HISTORY_VIEW} view is in place")
+            return
+
+        try:
+            season, moved, version = close_season(db.session, args.name, args.reset_points)
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        publish_change("houses", "ledger", "seasons")
+        if version is not None:
+            live_points_notifier.publish(version)
+            broadcast_points([s.house_id for s in season.standings])
+        print(f"✅ Closed season {season.name}: archived {moved} transactions")
+        for standing in season.standings:
+            print(f"   #{standing.rank} {standing.house_name}: {standing.points}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Central response serializers.
+
+Each serializer is a list of output keys ("house.name" nests) mapped to
+model columns. It is compiled once at import into a plain function, so
+dumping a row is a single dict literal with no per-field dispatch.
+
+    rows = ANNOUNCEMENT.query(db.session).order_by(...).all()   # only these columns
+    body = encode(ANNOUNCEMENT.many(rows))                        # straight to bytes
+
+`dump()` works on anything exposing the same attribute names (ORM
+objects, the standings engine's tuples) when no query is involved.
+"""
+import json
+
+from sqlalchemy import func
+
+from logos import house_logo_url
+from models import Admin, Announcement, Captain, House, Member, PointTransaction
+
+
+def isoformat(value):
+    return value.isoformat() if value is not None else None
+
+
+class Field:
+    """
+    `column` is what gets selected; `attr` is the attribute `dump()` reads.
+    Fields without a column only work with `dump()`; with no `attr` either,
+    `convert` gets the whole object.
+    """
+
+    def __init__(self, key, column, convert=None, attr=None):
+        self.key = key
+        self.column = column
+        self.convert = convert
+        self.attr = attr or (column.key if column is not None else None)
+
+
+class Serializer:
+    def __init__(self, *fields):
+        self.fields = fields
+        self.columns = [f.column for f in fields if f.column is not None]
+        self.dump = self._compile(lambda i, f: f"r.{f.attr}" if f.attr else "r")
+        if len(self.columns) == len(fields):
+            self.row = self._compile(lambda i, f: f"r[{i}]")
+
+    def _compile(self, access):
+        namespace = {}
+        tree = {}
+        for i, field in enumerate(self.fields):
+            expr = access(i, field)
+            if field.convert is not None:
+                name = f"convert_{i}"
+                namespace[name] = field.convert
+                expr = f"{name}({expr})"
+            *parents, leaf = field.key.split(".")
+            node = tree
+            for parent in parents:
+                node = node.setdefault(parent, {})
+            node[leaf] = expr
+
+        def literal(node):
+            return "{" + ", ".join(
+                f"{k!r}: {literal(v) if isinstance(v, dict) else v}"
+                for k, v in node.items()
+            ) + "}"
+
+        exec(f"def serialize(r):\n    return {literal(tree)}\n", namespace)
+        return namespace["serialize"]
+
+    def query(self, session):
+        return session.query(*self.columns)
+
+    def many(self, rows):
+        return list(map(self.row, rows))
+
+    def dump_many(self, objects):
+        return list(map(self.dump, objects))
+
+
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), check_circular=False)
+
+
+def encode(payload):
+    return _encoder.encode(payload).encode("utf-8")
+
+
+# =====================
+# Serializers per model
+# =====================
+
+HOUSE = Serializer(
+    Field("id", House.id),
+    Field("name", House.name),
+    Field("points", House.house_points, attr="points"),
+    Field("description", House.description),
+    Field("logo_url", None, house_logo_url),
+)
+
+STANDING = Serializer(
+    Field("rank", None, attr="rank"),
+    Field("name", House.name),
+    Field("points", House.house_points, attr="points"),
+    Field("description", House.description),
+    Field("logo_url", None, house_logo_url),
+)
+
+HOUSE_SUMMARY = Serializer(
+    Field("id", House.id),
+    Field("name", House.name),
+    Field("description", House.description),
+)
+
+MEMBER = Serializer(
+    Field("id", Member.id),
+    Field("name", Member.name),
+    Field("role", Member.role),
+)
+
+ANNOUNCEMENT = Serializer(
+    Field("id", Announcement.id),
+    Field("title", Announcement.title),
+    Field("content", Announcement.content),
+    Field("image_url", Announcement.image_url),
+    Field("created_at", Announcement.created_at, isoformat),
+    Field("house.id", Announcement.house_id),
+    Field("house.name", House.name.label("house_name")),
+    Field("captain.id", Announcement.captain_id),
+    Field("captain.username", Captain.username),
+    Field("captain.name", func.coalesce(Captain.name, Announcement.captain_name).label("captain_name")),
+)
+
+ANNOUNCEMENT_FEED = Serializer(
+    Field("id", Announcement.id),
+    Field("title", Announcement.title),
+    Field("content", Announcement.content),
+    Field("image_url", Announcement.image_url),
+    Field("created_at", Announcement.created_at, isoformat),
+    Field("house_name", Announcement.house_name),
+    Field("captain_name", Announcement.captain_name),
+)
+
+ANNOUNCEMENT_OWN = Serializer(
+    Field("id", Announcement.id),
+    Field("title", Announcement.title),
+    Field("content", Announcement.content),
+    Field("image_url", Announcement.image_url),
+    Field("created_at", Announcement.created_at, isoformat),
+)
+
+TRANSACTION = Serializer(
+    Field("id", PointTransaction.id),
+    Field("house.id", PointTransaction.house_id),
+    Field("house.name", House.name.label("house_name")),
+    Field("points_change", PointTransaction.points_change),
+    Field("reason", PointTransaction.reason),
+    Field("timestamp", PointTransaction.timestamp, isoformat),
+    Field("admin.id", PointTransaction.admin_id),
+    Field("admin.name", Admin.name.label("admin_name")),
+)
+
+MEMBER_RESULT = Serializer(
+    Field("id", Member.id),
+    Field("name", Member.name),
+    Field("role", Member.role),
+    Field("house.id", Member.house_id),
+    Field("house.name", House.name.label("house_name")),
+)
+
+MEMBER_SYNC = Serializer(
+    Field("id", Member.id),
+    Field("name", Member.name),
+    Field("role", Member.role),
+    Field("updated_at", Member.updated_at, isoformat),
+)
+
+ANNOUNCEMENT_SYNC = Serializer(
+    Field("id", Announcement.id),
+    Field("title", Announcement.title),
+    Field("content", Announcement.content),
+    Field("image_url", Announcement.image_url),
+    Field("created_at", Announcement.created_at, isoformat),
+    Field("updated_at", Announcement.updated_at, isoformat),
+)
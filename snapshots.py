@@ -0,0 +1,142 @@
+"""
+Static snapshots of the public site.
+
+After a write, the public JSON payloads and pages are rendered to
+SNAPSHOT_DIR so nginx or a CDN can serve them without touching Flask or
+the database. Rebuilds are debounced (a burst of point awards gives one
+rebuild) and every file is written to a temp file and renamed into place,
+so readers never see a half-written page.
+
+Run `python snapshots.py [output_dir]` to rebuild everything by hand.
+"""
+import os
+import sys
+import tempfile
+import threading
+
+from flask import render_template
+
+# URL path -> file written under the snapshot directory
+JSON_SNAPSHOTS = {
+    "/api/houses": "api/houses.json",
+    "/api/live-points": "api/live-points.json",
+    "/api/members": "api/members.json",
+    "/api/announcements": "api/announcements.json",
+}
+
+
+def write_atomic(path, data):
+    """Write bytes to `path` via temp file + rename. Returns False if unchanged."""
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return True
+
+
+class SnapshotPublisher:
+    def __init__(self, app, output_dir, delay=1.0):
+        self.app = app
+        self.output_dir = output_dir
+        self.delay = delay
+        self._timer = None
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+
+    def schedule(self):
+        """Rebuild `delay` seconds after the last call."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self._run)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _run(self):
+        try:
+            self.rebuild()
+        except Exception as e:
+            print(f"Snapshot rebuild failed: {e}")
+
+    def rebuild(self):
+        with self._build_lock:
+            written = 0
+            for path, data in self.render():
+                if write_atomic(os.path.join(self.output_dir, path), data):
+                    written += 1
+            return written
+
+    def render(self):
+        from models import House, Member, Announcement
+
+        # JSON goes through the real routes so snapshots match the API byte for byte
+        client = self.app.test_client()
+        for url, path in JSON_SNAPSHOTS.items():
+            response = client.get(url)
+            if response.status_code == 200:
+                yield path, response.get_data()
+
+        with self.app.test_request_context("/"):
+            houses = House.query.order_by(House.name).all()
+            standings = sorted(houses, key=lambda h: h.house_points or 0, reverse=True)
+            members_by_house = {}
+            for m in Member.query.order_by(Member.name).all():
+                members_by_house.setdefault(m.house_id, []).append(m)
+            anns = Announcement.query.order_by(Announcement.created_at.desc()).all()
+
+            yield "index.html", render_template("homepage.html").encode()
+            yield "live-scores.html", render_template(
+                "live_scores.html",
+                houses=[
+                    {"rank": i + 1, "name": h.name, "house_points": h.house_points}
+                    for i, h in enumerate(standings)
+                ]
+            ).encode()
+            yield "members.html", render_template(
+                "members.html",
+                all_houses=houses,
+                selected_house=None,
+                houses_with_members=[
+                    {"house": h, "members": members_by_house.get(h.id, [])}
+                    for h in houses
+                ]
+            ).encode()
+            yield "announcements.html", render_template(
+                "announcements.html",
+                announcements=[
+                    {
+                        "title": a.title,
+                        "content": a.content,
+                        "created_at": a.created_at,
+                        "house": a.house,
+                        "author": a.captain,
+                    }
+                    for a in anns
+                ]
+            ).encode()
+
+
+if __name__ == "__main__":
+    from app import app
+
+    output_dir = sys.argv[1] if len(sys.argv) > 1 else os.environ.get("SNAPSHOT_DIR", "snapshots")
+    publisher = SnapshotPublisher(app, output_dir)
+    with app.app_context():
+        written = publisher.rebuild()
+    print(f"✅ Snapshots rebuilt in {output_dir} ({written} files changed)")
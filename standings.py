@@ -0,0 +1,146 @@
+"""
+In-memory house standings.
+
+There are only a handful of houses, so each worker keeps them sorted by
+points and serves every standings read from memory. The point-award
+routes still write `houses.house_points` in their own transaction, and
+take the next standings version there with `next_version()`. After
+commit they hand the engine the deltas together with that version:
+
+* it continues our version exactly -> apply in place (bisect, O(log n))
+* anything else (a concurrent write, another worker) -> drop and reload
+
+Versions come from a single counter row that each transaction updates and
+keeps locked until it commits, so they are handed out in commit order:
+whoever loaded version N has every change up to N. (Ledger ids can't be
+used for this; a transaction may commit id 102 before another commits 101.)
+
+Other workers learn about new versions through the live points notifier
+and reload lazily on their next read. `max_age` bounds staleness if a
+notification is missed.
+"""
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import namedtuple
+
+from sqlalchemy import func
+
+from models import db, House, PointTransaction, PointTransactionArchive, StandingsClock
+
+HouseStanding = namedtuple("HouseStanding", "id name description logo_url points rank")
+CLOCK_ID = 1
+
+
+def _latest_ledger_id():
+    # Databases from before the clock start it at the latest ledger id, which
+    # lives in the archive right after a season is closed
+    return func.coalesce(
+        db.session.query(func.max(PointTransaction.id)).scalar_subquery(),
+        db.session.query(func.max(PointTransactionArchive.id)).scalar_subquery(),
+        0
+    )
+
+
+def next_version():
+    """
+    Take the next standings version in the current transaction. The clock row
+    stays locked until commit, so concurrent writers get versions in commit order.
+    """
+    updated = StandingsClock.query.filter_by(id=CLOCK_ID).update(
+        {StandingsClock.version: StandingsClock.version + 1}, synchronize_session=False
+    )
+    if not updated:
+        version = db.session.query(_latest_ledger_id()).scalar() + 1
+        db.session.add(StandingsClock(id=CLOCK_ID, version=version))
+        db.session.flush()
+        return version
+    return db.session.query(StandingsClock.version).filter_by(id=CLOCK_ID).scalar()
+
+
+def load_standings():
+    # One statement for both the houses and their version
+    version = func.coalesce(
+        db.session.query(StandingsClock.version).filter_by(id=CLOCK_ID).scalar_subquery(),
+        _latest_ledger_id()
+    )
+    rows = db.session.query(House, version).all()
+    houses = [
+        HouseStanding(h.id, h.name, h.description, h.logo_url, h.house_points or 0, None)
+        for h, _ in rows
+    ]
+    return (rows[0][1] if rows else None) or 0, houses
+
+
+class StandingsEngine:
+    def __init__(self, loader=load_standings, max_age=60):
+        self.loader = loader
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._houses = {}
+        self._order = []
+        self._loaded_at = 0.0
+        self.version = None
+        # (version, ranked tuple), replaced as a whole on every change
+        self._snapshot = None
+
+    def _stale(self):
+        return self._snapshot is None or time.monotonic() - self._loaded_at > self.max_age
+
+    def _reload(self):
+        version, houses = self.loader()
+        self._houses = {h.id: h for h in houses}
+        self._order = sorted((-h.points, h.id) for h in houses)
+        self.version = version
+        self._loaded_at = time.monotonic()
+        self._publish()
+
+    def _publish(self):
+        ranked = tuple(
+            self._houses[house_id]._replace(rank=i + 1)
+            for i, (_, house_id) in enumerate(self._order)
+        )
+        self._snapshot = (self.version, ranked)
+
+    def snapshot(self):
+        """Return (version, houses in rank order), loading if needed."""
+        if self._stale():
+            with self._lock:
+                if self._stale():
+                    self._reload()
+        return self._snapshot
+
+    def ranked(self):
+        return self.snapshot()[1]
+
+    def get(self, house_id):
+        for house in self.ranked():
+            if house.id == house_id:
+                return house
+        return None
+
+    def apply(self, deltas, version):
+        """Apply committed {house_id: delta} changes made under `version` (see next_version)."""
+        with self._lock:
+            if self._snapshot is None:
+                return
+            if version != self.version + 1 or not set(deltas) <= set(self._houses):
+                self._snapshot = None
+                return
+            for house_id, delta in deltas.items():
+                house = self._houses[house_id]
+                del self._order[bisect_left(self._order, (-house.points, house.id))]
+                house = self._houses[house_id] = house._replace(points=house.points + delta)
+                insort(self._order, (-house.points, house.id))
+            self.version = version
+            self._publish()
+
+    def observe(self, version):
+        """Notifier callback: a version exists that we may not have applied."""
+        with self._lock:
+            if self.version is None or version > self.version:
+                self._snapshot = None
+
+    def invalidate(self, *_):
+        with self._lock:
+            self._snapshot = None
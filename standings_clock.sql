@@ -0,0 +1,18 @@
+-- Standings versions in commit order (see standings.py)
+-- One row; every points change takes the next version while it holds the row.
+-- Starts from the latest ledger id so workers' cached versions stay behind it.
+
+CREATE TABLE IF NOT EXISTS standings_clock (
+    id INTEGER PRIMARY KEY,
+    version BIGINT NOT NULL
+);
+
+INSERT INTO standings_clock (id, version)
+SELECT 1, GREATEST(
+    COALESCE((SELECT MAX(id) FROM point_transactions), 0),
+    COALESCE((SELECT MAX(id) FROM point_transactions_archive), 0)
+)
+WHERE NOT EXISTS (SELECT 1 FROM standings_clock WHERE id = 1);
+
+-- Verify
+SELECT * FROM standings_clock;
@@ -0,0 +1,113 @@
+"""
+Incremental sync for captain dashboards.
+
+The client keeps the last `sync_token` it was given and sends it back;
+the response only carries members and announcements created, updated or
+deleted since then (deletions come from sync_tombstones), plus the house
+when its points changed. Without a token, or with one that is too old,
+foreign or unreadable, the response is a full sync and says so.
+
+Tokens hold the server time the previous sync started at, minus
+SYNC_OVERLAP, so a row committed by a slower transaction, or stamped by
+a worker with a slightly different clock, is sent again rather than
+missed. Clients apply upserts by id, which makes repeats harmless, and
+deletions after them.
+
+Drafts written offline are sent with POST /api/captain/announcements/create
+and an Idempotency-Key once the connection is back, so a retried upload
+never posts twice.
+"""
+import base64
+import hashlib
+import json
+import time
+from datetime import datetime, timedelta
+
+from models import db, Announcement, Member, SyncTombstone
+from serializers import ANNOUNCEMENT_SYNC, MEMBER_SYNC
+from tenants import current_tenant
+
+TOKEN_VERSION = 1
+SYNC_OVERLAP = timedelta(seconds=5)
+# Tombstones are kept this long; older tokens get a full sync instead
+TOMBSTONE_RETENTION = timedelta(days=30)
+PRUNE_INTERVAL_SECONDS = 3600
+
+
+def house_fingerprint(house):
+    raw = f"{house.name}\0{house.description}\0{house.points}"
+    return hashlib.sha1(raw.encode()).hexdigest()[:12]
+
+
+def encode_token(since, house_id, captain_id, fingerprint):
+    raw = json.dumps({
+        "v": TOKEN_VERSION,
+        "t": since.isoformat(),
+        "h": house_id,
+        "c": captain_id,
+        "f": fingerprint,
+    }, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_token(token, house_id, captain_id, now):
+    """Returns (since, house fingerprint), or None when a full sync is needed."""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(token.encode()))
+        since = datetime.fromisoformat(data["t"])
+    except (ValueError, KeyError, TypeError):
+        return None
+    if data.get("v") != TOKEN_VERSION or data.get("h") != house_id or data.get("c") != captain_id:
+        return None
+    if since < now - TOMBSTONE_RETENTION or since > now:
+        return None
+    return since, data.get("f")
+
+
+def changes_since(house_id, captain_id, since):
+    """
+    Members of the house and the captain's own announcements changed after
+    `since` (None = everything), as serialized upserts and deleted ids.
+    """
+    members = MEMBER_SYNC.query(db.session).filter(Member.house_id == house_id)
+    announcements = ANNOUNCEMENT_SYNC.query(db.session).filter(Announcement.captain_id == captain_id)
+    deleted = {"member": set(), "announcement": set()}
+    if since is not None:
+        members = members.filter(Member.updated_at > since)
+        announcements = announcements.filter(Announcement.updated_at > since)
+        tombstones = (
+            db.session.query(SyncTombstone.kind, SyncTombstone.object_id, SyncTombstone.captain_id)
+            .filter(SyncTombstone.house_id == house_id, SyncTombstone.deleted_at > since)
+        )
+        for kind, object_id, owner_id in tombstones:
+            if kind == "member" or owner_id == captain_id:
+                deleted[kind].add(object_id)
+
+    members = MEMBER_SYNC.many(members.order_by(Member.id))
+    announcements = ANNOUNCEMENT_SYNC.many(announcements.order_by(Announcement.created_at.desc()))
+    # A live row wins over a tombstone for a reused id
+    deleted["member"] -= {m["id"] for m in members}
+    deleted["announcement"] -= {a["id"] for a in announcements}
+    return {
+        "members": {"upserted": members, "deleted": sorted(deleted["member"])},
+        "announcements": {"upserted": announcements, "deleted": sorted(deleted["announcement"])},
+    }
+
+
+def prune_tombstones(now=None):
+    cutoff = (now or datetime.utcnow()) - TOMBSTONE_RETENTION
+    return SyncTombstone.query.filter(SyncTombstone.deleted_at < cutoff).delete(synchronize_session=False)
+
+
+_pruned_at = {}
+
+
+def maybe_prune_tombstones():
+    """Prune at most once an hour per worker and tenant; returns whether it ran."""
+    slug = current_tenant().slug
+    if time.monotonic() - _pruned_at.get(slug, -PRUNE_INTERVAL_SECONDS) < PRUNE_INTERVAL_SECONDS:
+        return False
+    _pruned_at[slug] = time.monotonic()
+    prune_tombstones()
+    db.session.commit()
+    return True
@@ -0,0 +1,25 @@
+-- Columns and table behind GET /api/captain/sync (see sync.py)
+-- Existing rows get a starting updated_at; new writes set it automatically
+
+ALTER TABLE members ADD COLUMN updated_at TIMESTAMP;
+UPDATE members SET updated_at = CURRENT_TIMESTAMP WHERE updated_at IS NULL;
+ALTER TABLE members ALTER COLUMN updated_at SET NOT NULL;
+CREATE INDEX ix_members_updated_at ON members (updated_at);
+
+ALTER TABLE announcements ADD COLUMN updated_at TIMESTAMP;
+UPDATE announcements SET updated_at = created_at WHERE updated_at IS NULL;
+ALTER TABLE announcements ALTER COLUMN updated_at SET NOT NULL;
+CREATE INDEX ix_announcements_updated_at ON announcements (updated_at);
+
+CREATE TABLE IF NOT EXISTS sync_tombstones (
+    id SERIAL PRIMARY KEY,
+    kind VARCHAR(20) NOT NULL,
+    object_id INTEGER NOT NULL,
+    house_id INTEGER NOT NULL,
+    captain_id INTEGER,
+    deleted_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS ix_sync_tombstones_house_deleted ON sync_tombstones (house_id, deleted_at);
+
+-- Verify
+SELECT COUNT(*) AS members_missing_updated_at FROM members WHERE updated_at IS NULL;
@@ -0,0 +1,264 @@
+"""
+Multi-tenant mode: one deployment serving several schools.
+
+Tenants are configured with TENANTS (JSON) or TENANTS_FILE (path to the
+same JSON); without either the app runs single-tenant exactly as before.
+
+    {
+      "default":  {"hosts": ["houses-web.onrender.com"]},
+      "school-a": {"hosts": ["a.example.org"], "schema": "school_a"},
+      "school-b": {"hosts": ["b.example.org"], "database_url": "postgresql://.../school_b"}
+    }
+
+Each request picks its tenant from the X-Tenant header, then from the
+Host, then falls back to "default" if one is configured.
+
+* `schema` tenants share the main database and its connection pool; each
+  transaction runs with `SET LOCAL search_path` to the tenant's schema
+* `database_url` tenants get a small pool of their own, created on first
+  use (at most TENANT_MAX_ENGINES are kept, least recently used first out)
+
+Every tenant other than "default" needs one or the other.
+
+Per-tenant in-memory state (caches, standings, search indexes) lives in
+`TenantLocal` objects, which build one instance per tenant on first use.
+Cache bus topics and notifier channels are namespaced by tenant.
+
+Outside a request the tenant comes from the TENANT environment variable
+(`TENANT=school-a python seasons.py close ...`) or `tenant_context()`.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+
+from flask import g, has_app_context, jsonify, request
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+DEFAULT_TENANT = "default"
+TENANT_HEADER = "X-Tenant"
+SLUG = re.compile(r"^[a-z0-9][a-z0-9_-]*$")
+
+
+class Tenant(namedtuple("Tenant", "slug hosts database_url schema")):
+    @property
+    def prefix(self):
+        # The default tenant keeps the un-prefixed names single-tenant mode used
+        return "" if self.slug == DEFAULT_TENANT else f"{self.slug}:"
+
+    def channel(self, name):
+        return name if self.slug == DEFAULT_TENANT else f"{name}_{self.slug}"
+
+
+def load_tenants(raw=None):
+    if raw is None:
+        raw = os.environ.get("TENANTS")
+        path = os.environ.get("TENANTS_FILE")
+        if not raw and path:
+            with open(path) as f:
+                raw = f.read()
+    if not raw:
+        return {DEFAULT_TENANT: Tenant(DEFAULT_TENANT, (), None, None)}
+
+    tenants = {}
+    for slug, options in json.loads(raw).items():
+        if not SLUG.match(slug):
+            raise ValueError(f"Invalid tenant name {slug!r}")
+        schema = options.get("schema")
+        if schema and not SLUG.match(schema):
+            raise ValueError(f"Invalid schema name {schema!r} for tenant {slug}")
+        if slug != DEFAULT_TENANT and not (schema or options.get("database_url")):
+            raise ValueError(f"Tenant {slug} needs a schema or a database_url")
+        tenants[slug] = Tenant(
+            slug,
+            tuple(h.lower() for h in options.get("hosts", ())),
+            options.get("database_url"),
+            schema
+        )
+    return tenants
+
+
+TENANTS = load_tenants()
+_by_host = {host: tenant for tenant in TENANTS.values() for host in tenant.hosts}
+
+
+def resolve_tenant(header, host):
+    if header:
+        return TENANTS.get(header.strip().lower())
+    host = (host or "").split(":")[0].lower()
+    return _by_host.get(host) or TENANTS.get(DEFAULT_TENANT)
+
+
+def current_tenant():
+    if has_app_context() and "tenant" in g:
+        return g.tenant
+    slug = os.environ.get("TENANT", DEFAULT_TENANT)
+    if slug not in TENANTS:
+        raise RuntimeError(f"Unknown tenant {slug!r}")
+    return TENANTS[slug]
+
+
+@contextmanager
+def tenant_context(app, tenant):
+    """App context bound to `tenant`, for background threads and scripts."""
+    with app.app_context():
+        g.tenant = tenant
+        yield tenant
+
+
+def scoped_user_id(user_id):
+    """Login id that only loads under the tenant it was issued for."""
+    return current_tenant().prefix + str(user_id)
+
+
+def unscoped_user_id(value):
+    prefix = current_tenant().prefix
+    if not value.startswith(prefix) or not value[len(prefix):].isdigit():
+        return None
+    return int(value[len(prefix):])
+
+
+def init_app(app, exempt=()):
+    """
+    Resolve the tenant before anything else in the request touches the database.
+    Endpoints in `exempt` (health checks) answer whatever the host.
+    """
+
+    @app.before_request
+    def _select_tenant():
+        if request.endpoint in exempt:
+            return None
+        tenant = resolve_tenant(request.headers.get(TENANT_HEADER), request.host)
+        if tenant is None:
+            return jsonify({"error": "Unknown school"}), 404
+        g.tenant = tenant
+
+
+# =====================
+# Connection routing
+# =====================
+
+TENANT_POOL_SIZE = int(os.environ.get("TENANT_POOL_SIZE", 2))
+TENANT_MAX_OVERFLOW = int(os.environ.get("TENANT_MAX_OVERFLOW", 3))
+TENANT_MAX_ENGINES = int(os.environ.get("TENANT_MAX_ENGINES", 20))
+
+
+class TenantSQLAlchemy(SQLAlchemy):
+    """Flask-SQLAlchemy whose default engine is the current tenant's."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._tenant_engines = OrderedDict()
+        self._tenant_lock = threading.Lock()
+
+    def get_engine(self, app=None, bind=None):
+        if bind is None and has_app_context():
+            url = current_tenant().database_url
+            if url:
+                return self._tenant_engine(self.get_app(app), url)
+        return super().get_engine(app, bind)
+
+    def _tenant_engine(self, app, url):
+        with self._tenant_lock:
+            engine = self._tenant_engines.get(url)
+            if engine is not None:
+                self._tenant_engines.move_to_end(url)
+                return engine
+            options = dict(app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+            if not url.startswith("sqlite"):
+                options.setdefault("pool_size", TENANT_POOL_SIZE)
+                options.setdefault("max_overflow", TENANT_MAX_OVERFLOW)
+                options.setdefault("pool_pre_ping", True)
+            engine = self._tenant_engines[url] = create_engine(url, **options)
+            while len(self._tenant_engines) > TENANT_MAX_ENGINES:
+                # Checked-out connections finish normally; idle ones are closed
+                _, evicted = self._tenant_engines.popitem(last=False)
+                evicted.dispose()
+            return engine
+
+
+@event.listens_for(Session, "after_begin")
+def _set_search_path(session, transaction, connection):
+    if not has_app_context() or connection.dialect.name != "postgresql":
+        return
+    schema = current_tenant().schema
+    if schema:
+        # SET LOCAL ends with the transaction, so pooled connections stay clean
+        connection.exec_driver_sql(f'SET LOCAL search_path TO "{schema}", public')
+
+
+def create_tenant_schema(db, tenant):
+    """Create a schema tenant's schema and tables on the main database."""
+    engine = db.get_engine()
+    with engine.begin() as connection:
+        connection.exec_driver_sql(f'CREATE SCHEMA IF NOT EXISTS "{tenant.schema}"')
+        connection.exec_driver_sql(f'SET LOCAL search_path TO "{tenant.schema}", public')
+        db.Model.metadata.create_all(connection)
+
+
+# =====================
+# Per-tenant state
+# =====================
+
+class TenantLocal:
+    """
+    One `factory(tenant)` instance per tenant, built on first use.
+    Attribute access goes to the current tenant's instance.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._instances = {}
+        self._lock = threading.Lock()
+
+    def for_tenant(self, tenant=None):
+        tenant = tenant or current_tenant()
+        instance = self._instances.get(tenant.slug)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(tenant.slug)
+                if instance is None:
+                    instance = self._instances[tenant.slug] = self._factory(tenant)
+        return instance
+
+    def __getattr__(self, name):
+        return getattr(self.for_tenant(), name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tenant setup")
+    sub = parser.add_subparsers(dest="command", required=True)
+    init = sub.add_parser("init", help="create a tenant's schema and tables")
+    init.add_argument("slug")
+    sub.add_parser("list")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for tenant in TENANTS.values():
+            where = tenant.schema and f"schema {tenant.schema}" or tenant.database_url or "main database"
+            print(f"{tenant.slug}: {', '.join(tenant.hosts) or '-'} -> {where}")
+        return
+
+    from app import app
+    from models import db
+
+    tenant = TENANTS.get(args.slug)
+    if tenant is None:
+        print(f"❌ Unknown tenant {args.slug!r}")
+        sys.exit(1)
+    with tenant_context(app, tenant):
+        if tenant.schema:
+            create_tenant_schema(db, tenant)
+        else:
+            db.create_all()
+    print(f"✅ Tables for {tenant.slug} are in place")
+
+
+if __name__ == "__main__":
+    main()
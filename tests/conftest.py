@@ -0,0 +1,267 @@
+"""
+Shared fixtures: the app on an in-memory SQLite database, rebuilt with the
+synthetic dataset for every test, and `measure` for per-route budgets.
+"""
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+# Before app.py is imported: in-memory database, no background machinery
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ["CACHE_BUS"] = "memory"
+os.environ["ACCESS_LOG_FILE"] = ""
+os.environ["PUBLIC_RATE_BURST"] = "100000"
+for name in ("DATABASE_URI", "TENANTS", "TENANTS_FILE", "TENANT", "SNAPSHOT_DIR", "LIVE_POINTS_NOTIFIER"):
+    os.environ.pop(name, None)
+
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.engine import Engine  # noqa: E402
+from werkzeug.security import generate_password_hash  # noqa: E402
+
+import app as web  # noqa: E402
+import sync  # noqa: E402
+from models import (  # noqa: E402
+    db, Achievement, Admin, Advisor, Announcement, Captain, Event, House,
+    Member, PointTransaction, ScoreSubmission, Season, SeasonStanding
+)
+
+# =====================
+# Synthetic dataset
+# =====================
+
+HOUSES = 6
+MEMBERS_PER_HOUSE = 40
+ANNOUNCEMENTS_PER_HOUSE = 30
+ADVISORS_PER_HOUSE = 2
+ACHIEVEMENTS_PER_HOUSE = 5
+TRANSACTIONS = 300
+APPROVED_EVENTS = 4
+OPEN_EVENTS = 4
+SEASONS = 3
+
+PASSWORD = "secret"
+# Cheap hash: the tests log in a lot
+PASSWORD_HASH = generate_password_hash(PASSWORD, method="pbkdf2:sha256:1000")
+ADMIN_ID = 1
+# Admin and captain ids must not overlap: load_user tries admins first
+CAPTAIN_ID_BASE = 100
+NOW = datetime(2026, 3, 1, 12, 0, 0)
+
+
+def seed():
+    def insert(model, rows):
+        db.session.execute(model.__table__.insert(), rows)
+
+    insert(House, [
+        {"id": h, "name": f"House {h}", "description": f"About house {h}", "house_points": 100 * h, "updated_at": NOW}
+        for h in range(1, HOUSES + 1)
+    ])
+    insert(Admin, [{"id": ADMIN_ID, "name": "Admin", "username": "admin", "password_hash": PASSWORD_HASH}])
+    insert(Captain, [
+        {
+            "id": CAPTAIN_ID_BASE + h,
+            "name": f"Captain {h}",
+            "username": f"captain{h}",
+            "password_hash": PASSWORD_HASH,
+            "house_id": h,
+        }
+        for h in range(1, HOUSES + 1)
+    ])
+    insert(Member, [
+        {
+            "name": f"Member {h}-{i} {'Hasan' if i % 3 else 'Zainab'}",
+            "role": "Leader" if i == 0 else "Member",
+            "house_id": h,
+            "updated_at": NOW,
+        }
+        for h in range(1, HOUSES + 1) for i in range(MEMBERS_PER_HOUSE)
+    ])
+    insert(Advisor, [
+        {
+            "name": f"Advisor {h}-{i}",
+            "role": "Teacher",
+            "bio": "Bio",
+            "username": f"advisor{h}-{i}",
+            "password_hash": PASSWORD_HASH,
+            "house_id": h,
+        }
+        for h in range(1, HOUSES + 1) for i in range(ADVISORS_PER_HOUSE)
+    ])
+    insert(Achievement, [
+        {"name": f"Trophy {h}-{i}", "description": "Won something", "house_id": h}
+        for h in range(1, HOUSES + 1) for i in range(ACHIEVEMENTS_PER_HOUSE)
+    ])
+    insert(Announcement, [
+        {
+            "title": f"News {h}-{i}",
+            "content": "Lorem ipsum " * 5,
+            "house_id": h,
+            "captain_id": CAPTAIN_ID_BASE + h,
+            "house_name": f"House {h}",
+            "captain_name": f"Captain {h}",
+            "created_at": NOW - timedelta(hours=i * HOUSES + h),
+            "updated_at": NOW,
+        }
+        for h in range(1, HOUSES + 1) for i in range(ANNOUNCEMENTS_PER_HOUSE)
+    ])
+    insert(PointTransaction, [
+        {
+            "points_change": 10 if i % 4 else -5,
+            "reason": f"Reason {i % 7}",
+            "timestamp": NOW - timedelta(hours=i),
+            "house_id": i % HOUSES + 1,
+            "admin_id": ADMIN_ID,
+        }
+        for i in range(TRANSACTIONS)
+    ])
+    insert(Event, [
+        {
+            "id": e,
+            "name": f"Event {e}",
+            "description": "Sports day",
+            "status": "approved" if e <= APPROVED_EVENTS else "open",
+            "created_at": NOW - timedelta(days=e),
+        }
+        for e in range(1, APPROVED_EVENTS + OPEN_EVENTS + 1)
+    ])
+    insert(ScoreSubmission, [
+        {
+            "event_id": e,
+            "house_id": h,
+            "captain_id": CAPTAIN_ID_BASE + h,
+            "placement": h,
+            "status": "approved" if e <= APPROVED_EVENTS else "pending",
+            "points_awarded": 10 if e <= APPROVED_EVENTS else None,
+            "submitted_at": NOW,
+        }
+        for e in range(1, APPROVED_EVENTS + OPEN_EVENTS + 1) for h in range(1, HOUSES + 1)
+    ])
+    insert(Season, [
+        {"id": s, "name": f"Season {s}", "closed_at": NOW - timedelta(days=100 * s)}
+        for s in range(1, SEASONS + 1)
+    ])
+    insert(SeasonStanding, [
+        {"season_id": s, "house_id": h, "house_name": f"House {h}", "points": 1000 - h, "rank": h}
+        for s in range(1, SEASONS + 1) for h in range(1, HOUSES + 1)
+    ])
+    db.session.commit()
+
+
+# =====================
+# Query and row counting
+# =====================
+
+class Counters:
+    statements = 0
+    rows = 0
+
+
+class CountingCursor(sqlite3.Cursor):
+    def fetchone(self):
+        row = super().fetchone()
+        if row is not None:
+            Counters.rows += 1
+        return row
+
+    def fetchmany(self, size=None):
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        Counters.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        Counters.rows += len(rows)
+        return rows
+
+
+class CountingConnection(sqlite3.Connection):
+    def cursor(self, factory=CountingCursor):
+        return super().cursor(factory)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    Counters.statements += 1
+
+
+web.app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+    "connect_args": {"factory": CountingConnection, "check_same_thread": False}
+}
+web.app.config["TESTING"] = True
+
+
+class Measurement:
+    def __init__(self, response, statements, rows):
+        self.response = response
+        self.statements = statements
+        self.rows = rows
+        self.bytes = len(response.get_data())
+
+    def __repr__(self):
+        return f"<{self.statements} statements, {self.rows} rows, {self.bytes} bytes>"
+
+
+@pytest.fixture
+def measure():
+    """`measure(client.get, url, ...)` -> Measurement of the SQL, rows and bytes it took."""
+
+    def run(call, *args, **kwargs):
+        statements, rows = Counters.statements, Counters.rows
+        response = call(*args, **kwargs)
+        return Measurement(response, Counters.statements - statements, Counters.rows - rows)
+
+    return run
+
+
+# =====================
+# App fixtures
+# =====================
+
+def reset_state():
+    """Forget everything the workers keep in memory between requests."""
+    web.cache.for_tenant().clear()
+    web.standings_engine.for_tenant().invalidate()
+    web.live_points_feed.for_tenant().invalidate()
+    # Each test's database starts its standings versions afresh
+    web.live_points_notifier.for_tenant().version = 0
+    web.member_index.for_tenant().invalidate()
+    web.scoring_engine.for_tenant().invalidate()
+    web.http_cache.clocks.for_tenant().invalidate()
+    web.public_limiter._buckets.clear()
+    sync._pruned_at.clear()
+
+
+@pytest.fixture
+def app():
+    with web.app.app_context():
+        db.drop_all()
+        db.create_all()
+        seed()
+        db.session.remove()
+    reset_state()
+    yield web.app
+    with web.app.app_context():
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def login(client, username):
+    response = client.post("/api/login", json={"username": username, "password": PASSWORD})
+    assert response.status_code == 200, response.get_json()
+    return client
+
+
+@pytest.fixture
+def admin_client(app):
+    return login(app.test_client(), "admin")
+
+
+@pytest.fixture
+def captain_client(app):
+    return login(app.test_client(), "captain1")
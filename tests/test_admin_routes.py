@@ -0,0 +1,143 @@
+import io
+from datetime import datetime, timedelta
+
+from conftest import APPROVED_EVENTS, HOUSES, OPEN_EVENTS
+from models import db, House, IdempotencyKey, PointTransaction
+
+
+def points_of(client, name):
+    return next(s["points"] for s in client.get("/api/live-points").get_json() if s["name"] == name)
+
+
+def test_admin_routes_need_admin(client, captain_client):
+    assert client.get("/api/admin/dashboard").status_code == 401
+    assert captain_client.get("/api/admin/dashboard").status_code == 403
+    assert captain_client.post("/api/admin/points/add", json={}).status_code == 403
+
+
+def test_dashboard(admin_client):
+    body = admin_client.get("/api/admin/dashboard").get_json()
+    assert len(body["houses"]) == HOUSES
+    assert len(body["recent_transactions"]) == 10
+    assert body["recent_transactions"][0]["admin"]["name"] == "Admin"
+
+
+def test_analytics(admin_client):
+    body = admin_client.get("/api/admin/analytics?period=month").get_json()
+    assert body
+    assert admin_client.get("/api/admin/analytics?period=year").status_code == 400
+    assert admin_client.get("/api/admin/analytics?since=yesterday").status_code == 400
+
+
+def test_add_points(admin_client, app):
+    before = points_of(admin_client, "House 2")
+    response = admin_client.post("/api/admin/points/add", json={"house_id": 2, "points": 15, "reason": "Quiz"})
+    assert response.get_json()["house"]["points"] == before + 15
+    assert points_of(admin_client, "House 2") == before + 15
+    with app.app_context():
+        assert PointTransaction.query.order_by(PointTransaction.id.desc()).first().reason == "Quiz"
+
+
+def test_deduct_points(admin_client):
+    before = points_of(admin_client, "House 3")
+    response = admin_client.post("/api/admin/points/deduct", json={"house_id": 3, "points": "5", "reason": "Late"})
+    assert response.get_json()["house"]["points"] == before - 5
+    assert points_of(admin_client, "House 3") == before - 5
+
+
+def test_points_validation(admin_client):
+    for body in ({}, {"house_id": 1, "points": "x", "reason": "r"}, {"house_id": 1, "points": -3, "reason": "r"}):
+        assert admin_client.post("/api/admin/points/add", json=body).status_code == 400
+    assert admin_client.post(
+        "/api/admin/points/deduct", json={"house_id": 999, "points": 1, "reason": "r"}
+    ).status_code == 404
+
+
+def test_points_idempotency_key(admin_client, app):
+    headers = {"Idempotency-Key": "award-1"}
+    body = {"house_id": 1, "points": 7, "reason": "Once"}
+    first = admin_client.post("/api/admin/points/add", json=body, headers=headers)
+    replay = admin_client.post("/api/admin/points/add", json=body, headers=headers)
+    assert replay.headers["Idempotent-Replayed"] == "true"
+    assert replay.get_json() == first.get_json()
+    with app.app_context():
+        assert PointTransaction.query.filter_by(reason="Once").count() == 1
+
+
+def test_abandoned_idempotency_claim_expires(admin_client, app):
+    headers = {"Idempotency-Key": "award-2"}
+    body = {"house_id": 1, "points": 7, "reason": "Crashed"}
+    first = admin_client.post("/api/admin/points/add", json=body, headers=headers)
+    with app.app_context():
+        # As if the worker had died between claiming the key and storing the response
+        record = IdempotencyKey.query.filter_by(key="award-2").one()
+        assert record.expires_at - record.created_at > timedelta(hours=23)
+        record.status_code = record.response_body = None
+        record.expires_at = datetime.utcnow() + timedelta(seconds=60)
+        db.session.commit()
+
+    assert admin_client.post("/api/admin/points/add", json=body, headers=headers).status_code == 409
+
+    with app.app_context():
+        record = IdempotencyKey.query.filter_by(key="award-2").one()
+        record.expires_at = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+    retry = admin_client.post("/api/admin/points/add", json=body, headers=headers)
+    assert retry.status_code == 200 and "Idempotent-Replayed" not in retry.headers
+    assert retry.get_json()["house"]["points"] == first.get_json()["house"]["points"] + 7
+
+
+def test_logo_upload_validation(admin_client):
+    assert admin_client.post("/api/admin/house/1/logo", data={}).status_code == 400
+    response = admin_client.post(
+        "/api/admin/house/1/logo",
+        data={"logo": (io.BytesIO(b"MZ"), "logo.exe")},
+        content_type="multipart/form-data"
+    )
+    assert response.status_code == 400
+
+
+def test_admin_events(admin_client):
+    events = admin_client.get("/api/admin/events").get_json()
+    assert len(events) == APPROVED_EVENTS + OPEN_EVENTS
+    assert all(len(e["submissions"]) == HOUSES for e in events)
+    assert events[0]["placement_points"] == [50, 30, 20, 10, 5, 0]
+
+
+def test_create_event(admin_client, client):
+    response = admin_client.post("/api/admin/events/create", json={"name": "Relay", "placement_points": [9, 3]})
+    assert response.get_json()["event"]["status"] == "open"
+    assert any(e["name"] == "Relay" for e in client.get("/api/events").get_json())
+    assert admin_client.post("/api/admin/events/create", json={"name": ""}).status_code == 400
+    assert admin_client.post(
+        "/api/admin/events/create", json={"name": "Bad", "placement_points": [-1]}
+    ).status_code == 400
+
+
+def test_approve_events(admin_client, app):
+    with app.app_context():
+        before = {h.id: h.house_points for h in House.query}
+    event_id = APPROVED_EVENTS + 1
+    body = admin_client.post("/api/admin/events/approve", json={"event_ids": [event_id]}).get_json()
+    assert body["approved_event_ids"] == [event_id]
+    # Placement h earns the h-th entry of the default table 50,30,20,10,5,0
+    awards = {str(h): p for h, p in zip(range(1, HOUSES + 1), [50, 30, 20, 10, 5]) if p}
+    assert body["points_by_house"] == awards
+    with app.app_context():
+        after = {h.id: h.house_points for h in House.query}
+    assert all(after[int(h)] == before[int(h)] + p for h, p in awards.items())
+
+    again = admin_client.post("/api/admin/events/approve", json={"event_ids": [event_id]})
+    assert again.status_code == 404
+    assert admin_client.post("/api/admin/events/approve", json={"event_ids": []}).status_code == 400
+    for bad in ([{"a": 1}], ["1"], [True]):
+        assert admin_client.post("/api/admin/events/approve", json={"event_ids": bad}).status_code == 400
+
+
+def test_awards_refresh_cached_payloads(admin_client, client):
+    def house_1():
+        return next(h for h in client.get("/api/houses").get_json() if h["id"] == 1)
+
+    before = house_1()["points"]
+    admin_client.post("/api/admin/points/add", json={"house_id": 1, "points": 1, "reason": "Nudge"})
+    assert house_1()["points"] == before + 1
@@ -0,0 +1,15 @@
+from datetime import date, datetime, timedelta
+
+from analytics import period_bucket
+from models import db
+
+
+def test_sqlite_weeks_are_iso_weeks(app):
+    days = [date(2020, 12, 28) + timedelta(days=i) for i in range(0, 3 * 365, 3)]
+    days += [date(2026, 1, 1), date(2027, 1, 3), date(2021, 1, 3), date(2024, 12, 30)]
+    with app.app_context():
+        for day in days:
+            moment = datetime.combine(day, datetime.min.time()) + timedelta(hours=23)
+            key = db.session.query(period_bucket(db.literal(moment), "week", "sqlite")).scalar()
+            year, week, _ = day.isocalendar()
+            assert key == f"{year}-W{week:02d}", day
@@ -0,0 +1,26 @@
+from conftest import CAPTAIN_ID_BASE, PASSWORD
+
+
+def test_login_admin(client):
+    body = client.post("/api/login", json={"username": "admin", "password": PASSWORD}).get_json()
+    assert body["success"] and body["role"] == "admin"
+    assert client.get("/api/me").get_json()["role"] == "admin"
+
+
+def test_login_captain(client):
+    body = client.post("/api/login", json={"username": "captain2", "password": PASSWORD}).get_json()
+    assert body["role"] == "captain"
+    me = client.get("/api/me").get_json()
+    assert me["id"] == CAPTAIN_ID_BASE + 2
+    assert me["house_id"] == 2
+
+
+def test_login_rejects_wrong_password(client):
+    response = client.post("/api/login", json={"username": "admin", "password": "nope"})
+    assert response.status_code == 401
+    assert client.get("/api/me").status_code == 401
+
+
+def test_logout(captain_client):
+    assert captain_client.post("/api/logout").get_json()["success"]
+    assert captain_client.get("/api/me").status_code == 401
@@ -0,0 +1,195 @@
+"""
+Performance budgets per route, against the synthetic dataset with cold caches.
+
+Each budget is (max SQL statements, max rows fetched, max response bytes).
+An N+1 query shows up as extra statements, a list that lost its limit as
+extra rows and bytes. When a change legitimately needs more, raise the
+budget in the same commit so the reviewer sees it.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+import app as web
+from conftest import (
+    ACHIEVEMENTS_PER_HOUSE, ADVISORS_PER_HOUSE, ANNOUNCEMENTS_PER_HOUSE,
+    APPROVED_EVENTS, CAPTAIN_ID_BASE, HOUSES, MEMBERS_PER_HOUSE, OPEN_EVENTS,
+    SEASONS, reset_state
+)
+from models import (
+    db, Achievement, Advisor, Announcement, Event, Member, ScoreSubmission,
+    Season, SeasonStanding
+)
+
+EVENTS = APPROVED_EVENTS + OPEN_EVENTS
+MEMBERS = HOUSES * MEMBERS_PER_HOUSE
+ANNOUNCEMENTS = HOUSES * ANNOUNCEMENTS_PER_HOUSE
+
+
+def stamped(statements, rows, size):
+    """Routes with Last-Modified also read the write timestamps (once per worker per change)."""
+    return statements + 1, rows + 1, size
+
+
+PUBLIC_BUDGETS = {
+    "/api/houses": stamped(1, HOUSES, 1_000),
+    "/api/live-points": stamped(1, HOUSES, 1_000),
+    "/api/live-points/wait?timeout=0": (1, HOUSES, 1_000),
+    "/api/members": stamped(2, HOUSES + MEMBERS, 16_000),
+    "/api/members?house=House 2": stamped(2, 1 + MEMBERS_PER_HOUSE, 3_000),
+    # Builds the in-memory index once; the response is capped by limit
+    "/api/members/search?q=ha": stamped(1, MEMBERS, 2_500),
+    "/api/announcements": stamped(1, ANNOUNCEMENTS, 55_000),
+    "/api/houses/1/profile": (4, HOUSES + 1 + ADVISORS_PER_HOUSE + ACHIEVEMENTS_PER_HOUSE, 1_000),
+    "/api/achievements": (1, HOUSES * ACHIEVEMENTS_PER_HOUSE, 3_500),
+    "/api/achievements?house_id=1": (1, ACHIEVEMENTS_PER_HOUSE, 600),
+    # First page of 20 plus the look-ahead row, whatever the house has
+    "/api/houses/1/announcements": stamped(2, 1 + web.FEED_PAGE_SIZE + 1, 5_000),
+    "/api/houses/1/announcements?limit=1000": stamped(2, 1 + web.FEED_MAX_PAGE_SIZE + 1, 25_000),
+    "/api/events": stamped(2, EVENTS + APPROVED_EVENTS * HOUSES, 3_000),
+    "/api/seasons": stamped(2, SEASONS * (1 + HOUSES), 1_500),
+    "/api/houses/1/logo": stamped(1, 1, 200),
+    "/healthz": (0, 0, 100),
+    "/metrics": (0, 0, 1_000),
+}
+
+# Logging in is not counted; loading the user on each request is
+ADMIN_BUDGETS = {
+    "/api/me": (1, 1, 200),
+    "/api/admin/dashboard": (3, 1 + HOUSES + 10, 2_500),
+    "/api/admin/analytics": (5, 40, 2_500),
+    "/api/admin/events": (3, 1 + EVENTS + EVENTS * HOUSES, 7_000),
+}
+
+CAPTAIN_BUDGETS = {
+    "/api/me": (2, 1, 200),
+    "/api/captain/dashboard": (5, 2 + MEMBERS_PER_HOUSE + ANNOUNCEMENTS_PER_HOUSE, 8_000),
+    "/api/captain/sync": (6, HOUSES + 1 + MEMBERS_PER_HOUSE + ANNOUNCEMENTS_PER_HOUSE, 10_000),
+}
+
+
+def assert_within(measured, budget):
+    statements, rows, size = budget
+    assert measured.response.status_code < 400, measured.response.get_data(as_text=True)[:200]
+    assert measured.statements <= statements, f"{measured.statements} SQL statements, budget {statements}"
+    assert measured.rows <= rows, f"{measured.rows} rows fetched, budget {rows}"
+    assert measured.bytes <= size, f"{measured.bytes} bytes, budget {size}"
+
+
+@pytest.mark.parametrize("url", PUBLIC_BUDGETS)
+def test_public_budget(client, measure, url):
+    assert_within(measure(client.get, url), PUBLIC_BUDGETS[url])
+
+
+@pytest.mark.parametrize("url", ADMIN_BUDGETS)
+def test_admin_budget(admin_client, measure, url):
+    assert_within(measure(admin_client.get, url), ADMIN_BUDGETS[url])
+
+
+@pytest.mark.parametrize("url", CAPTAIN_BUDGETS)
+def test_captain_budget(captain_client, measure, url):
+    assert_within(measure(captain_client.get, url), CAPTAIN_BUDGETS[url])
+
+
+@pytest.mark.parametrize("url", [u for u, (statements, _, _) in PUBLIC_BUDGETS.items() if statements])
+def test_public_payloads_are_cached(client, measure, url):
+    if url.startswith("/api/houses/1/logo"):
+        pytest.skip("answers from the database on purpose: the token must be current")
+    client.get(url)
+    assert measure(client.get, url).statements == 0
+
+
+def test_write_budgets(admin_client, captain_client, measure):
+    # The live push reads the standings, loaded here because the engine starts cold;
+    # taking the standings version is two more (three the first time, to create it)
+    assert_within(measure(
+        admin_client.post, "/api/admin/points/add", json={"house_id": 1, "points": 3, "reason": "Quiz"}
+    ), (9, 6 + HOUSES, 200))
+    assert_within(measure(
+        admin_client.post, "/api/admin/events/create", json={"name": "Relay"}
+    ), (3, 2, 200))
+    assert_within(measure(
+        captain_client.post, "/api/captain/announcements/create", json={"title": "Hi", "content": "There"}
+    ), (5, 3, 300))
+    assert_within(measure(
+        captain_client.post, f"/api/captain/events/{EVENTS}/submit", json={"placement": 1}
+    ), (7, 5, 200))
+
+    # Per award: a ledger insert and the submission update; nothing per event
+    open_events = list(range(APPROVED_EVENTS + 1, EVENTS + 1))
+    submissions = len(open_events) * HOUSES
+    assert_within(measure(
+        admin_client.post, "/api/admin/events/approve", json={"event_ids": open_events}
+    ), (12 + 2 * submissions, 3 + 2 * submissions, 300))
+
+
+# =====================
+# Statement counts must not grow with the data
+# =====================
+
+def grow(app):
+    """Double every list the routes return."""
+    now = datetime.utcnow()
+
+    def insert(model, rows):
+        db.session.execute(model.__table__.insert(), rows)
+
+    with app.app_context():
+        insert(Member, [
+            {"name": f"Extra {h}-{i}", "role": "Member", "house_id": h}
+            for h in range(1, HOUSES + 1) for i in range(MEMBERS_PER_HOUSE)
+        ])
+        insert(Announcement, [
+            {
+                "title": f"Extra {h}-{i}", "content": "More", "house_id": h,
+                "captain_id": CAPTAIN_ID_BASE + h, "house_name": f"House {h}",
+                "captain_name": f"Captain {h}", "created_at": now - timedelta(minutes=i),
+            }
+            for h in range(1, HOUSES + 1) for i in range(ANNOUNCEMENTS_PER_HOUSE)
+        ])
+        insert(Advisor, [
+            {
+                "name": f"Extra {h}-{i}", "role": "Teacher", "username": f"extra{h}-{i}",
+                "password_hash": "-", "house_id": h,
+            }
+            for h in range(1, HOUSES + 1) for i in range(ADVISORS_PER_HOUSE)
+        ])
+        insert(Achievement, [
+            {"name": f"Extra {h}-{i}", "house_id": h}
+            for h in range(1, HOUSES + 1) for i in range(ACHIEVEMENTS_PER_HOUSE)
+        ])
+        event_ids = range(EVENTS + 1, 2 * EVENTS + 1)
+        insert(Event, [{"id": e, "name": f"Extra {e}", "status": "approved", "created_at": now} for e in event_ids])
+        insert(ScoreSubmission, [
+            {"event_id": e, "house_id": h, "placement": h, "status": "approved", "points_awarded": 1, "submitted_at": now}
+            for e in event_ids for h in range(1, HOUSES + 1)
+        ])
+        season_ids = range(SEASONS + 1, 2 * SEASONS + 1)
+        insert(Season, [{"id": s, "name": f"Extra {s}", "closed_at": now} for s in season_ids])
+        insert(SeasonStanding, [
+            {"season_id": s, "house_id": h, "house_name": f"House {h}", "points": 1, "rank": h}
+            for s in season_ids for h in range(1, HOUSES + 1)
+        ])
+        db.session.commit()
+        db.session.remove()
+    reset_state()
+
+
+def test_statements_do_not_grow_with_data(app, measure, admin_client, captain_client):
+    routes = (
+        [(app.test_client(), url) for url in PUBLIC_BUDGETS]
+        + [(admin_client, url) for url in ADMIN_BUDGETS]
+        + [(captain_client, url) for url in CAPTAIN_BUDGETS]
+    )
+
+    def statements():
+        reset_state()
+        counts = {}
+        for client, url in routes:
+            reset_state()
+            counts[url, client is captain_client] = measure(client.get, url).statements
+        return counts
+
+    before = statements()
+    grow(app)
+    assert statements() == before
@@ -0,0 +1,75 @@
+from conftest import ANNOUNCEMENTS_PER_HOUSE, APPROVED_EVENTS, CAPTAIN_ID_BASE, MEMBERS_PER_HOUSE
+from models import db, Member, ScoreSubmission
+
+
+def test_captain_routes_need_captain(client, admin_client):
+    assert client.get("/api/captain/dashboard").status_code == 401
+    assert admin_client.get("/api/captain/dashboard").status_code == 403
+
+
+def test_dashboard(captain_client):
+    body = captain_client.get("/api/captain/dashboard").get_json()
+    assert body["house"]["name"] == "House 1"
+    assert len(body["members"]) == MEMBERS_PER_HOUSE
+    assert len(body["my_announcements"]) == ANNOUNCEMENTS_PER_HOUSE
+
+
+def test_create_announcement(captain_client, client):
+    response = captain_client.post(
+        "/api/captain/announcements/create", json={"title": "Bake sale", "content": "Friday"}
+    )
+    created = response.get_json()["announcement"]
+    assert created["title"] == "Bake sale"
+    assert client.get("/api/announcements").get_json()[0]["id"] == created["id"]
+
+    assert captain_client.post(
+        "/api/captain/announcements/create", json={"title": "", "content": "x"}
+    ).status_code == 400
+    assert captain_client.post(
+        "/api/captain/announcements/create", json={"title": "x" * 201, "content": "x"}
+    ).status_code == 400
+
+
+def test_delete_announcement(captain_client, client):
+    own = captain_client.get("/api/captain/dashboard").get_json()["my_announcements"][0]["id"]
+    assert captain_client.delete(f"/api/captain/announcements/{own}/delete").get_json()["success"]
+    assert own not in {a["id"] for a in client.get("/api/announcements").get_json()}
+
+    others = [a["id"] for a in client.get("/api/announcements").get_json() if a["captain"]["id"] != CAPTAIN_ID_BASE + 1]
+    assert captain_client.delete(f"/api/captain/announcements/{others[0]}/delete").status_code == 403
+    assert captain_client.delete("/api/captain/announcements/99999/delete").status_code == 404
+
+
+def test_submit_score(captain_client, app):
+    open_event = APPROVED_EVENTS + 1
+    body = captain_client.post(f"/api/captain/events/{open_event}/submit", json={"placement": 2, "note": "Close"}).get_json()
+    assert body["submission"]["placement"] == 2
+    with app.app_context():
+        assert ScoreSubmission.query.filter_by(event_id=open_event, house_id=1).one().note == "Close"
+
+    assert captain_client.post("/api/captain/events/1/submit", json={"placement": 1}).status_code == 400
+    assert captain_client.post(f"/api/captain/events/{open_event}/submit", json={"placement": 0}).status_code == 400
+    assert captain_client.post("/api/captain/events/999/submit", json={"placement": 1}).status_code == 404
+
+
+def test_sync_is_incremental(captain_client, app):
+    full = captain_client.get("/api/captain/sync").get_json()
+    assert full["full"] is True
+    assert len(full["members"]["upserted"]) == MEMBERS_PER_HOUSE
+    assert full["house"]["id"] == 1
+
+    with app.app_context():
+        member = Member.query.filter_by(house_id=1).first()
+        member.role = "Treasurer"
+        gone = Member.query.filter_by(house_id=1).order_by(Member.id.desc()).first()
+        db.session.delete(gone)
+        db.session.commit()
+        member_id, gone_id = member.id, gone.id
+
+    delta = captain_client.get(f"/api/captain/sync?token={full['sync_token']}").get_json()
+    assert delta["full"] is False
+    assert "house" not in delta
+    assert [m["id"] for m in delta["members"]["upserted"]] == [member_id]
+    assert delta["members"]["deleted"] == [gone_id]
+
+    assert captain_client.get("/api/captain/sync?token=garbage").get_json()["full"] is True
@@ -0,0 +1,34 @@
+import app as web
+
+
+def test_healthz(client):
+    assert client.get("/healthz").get_json() == {"status": "ok"}
+
+
+def test_readyz_waits_for_warmup(client, monkeypatch):
+    monkeypatch.setattr(web.warmup, "state", "pending")
+    monkeypatch.setattr(web.warmup, "run_in_background", lambda: None)
+    response = client.get("/readyz")
+    assert response.status_code == 503
+    assert response.get_json()["status"] == "pending"
+
+
+def test_warmup_fills_caches(client, measure, monkeypatch):
+    monkeypatch.setattr(web.warmup, "state", "pending")
+    monkeypatch.setattr(web.warmup, "phases", {})
+    assert web.warmup.run()
+
+    body = client.get("/readyz").get_json()
+    assert body["status"] == "ready"
+    assert set(body["phases"]) == {"pool", "standings", "snapshots"}
+    # Every public payload is already cached
+    assert measure(client.get, "/api/members").statements == 0
+
+    metrics = client.get("/metrics").get_data(as_text=True)
+    assert 'phase="total"' in metrics
+    assert "houses_worker_ready" in metrics
+
+
+def test_health_ignores_unknown_hosts(client):
+    assert client.get("/healthz", headers={"X-Tenant": "nowhere"}).status_code == 200
+    assert client.get("/api/houses", headers={"X-Tenant": "nowhere"}).status_code == 404
@@ -0,0 +1,87 @@
+import calendar
+from datetime import datetime
+
+import http_cache
+from cache_bus import MemoryBus
+from http_cache import ChangeClock
+from logos import IMMUTABLE
+
+PUBLIC = ["/api/houses", "/api/live-points", "/api/members", "/api/announcements", "/api/houses/1/logo"]
+
+
+def test_public_routes_are_cacheable(client):
+    for url in PUBLIC:
+        response = client.get(url)
+        assert response.headers["Cache-Control"].startswith("public, max-age="), url
+        assert "stale-while-revalidate=" in response.headers["Cache-Control"], url
+        assert response.last_modified is not None, url
+        assert "Origin" in response.vary, url
+
+
+def test_private_routes_are_not(admin_client):
+    response = admin_client.get("/api/admin/dashboard")
+    assert "Cache-Control" not in response.headers
+    assert response.last_modified is None
+    assert "Origin" in response.vary
+
+
+def test_if_modified_since(client, admin_client, monkeypatch):
+    first = client.get("/api/houses")
+    since = first.headers["Last-Modified"]
+    again = client.get("/api/houses", headers={"If-Modified-Since": since})
+    assert again.status_code == 304
+    assert again.get_data() == b""
+
+    admin_client.post("/api/admin/points/add", json={"house_id": 1, "points": 1, "reason": "Quiz"})
+    changed = client.get("/api/houses", headers={"If-Modified-Since": since})
+    assert changed.status_code == 200
+    # Written just now: no Last-Modified until the change has settled
+    assert changed.last_modified is None
+
+    monkeypatch.setattr(http_cache, "SETTLE_SECONDS", -2)
+    assert client.get("/api/houses").last_modified > first.last_modified
+
+    # Announcements don't depend on the ledger
+    since = client.get("/api/announcements").headers["Last-Modified"]
+    admin_client.post("/api/admin/points/add", json={"house_id": 1, "points": 1, "reason": "Quiz"})
+    assert client.get("/api/announcements", headers={"If-Modified-Since": since}).status_code == 304
+
+
+def test_logo_image_answers_if_none_match(client):
+    url = client.get("/api/houses/1/logo").get_json()["url"]
+    path = url[url.index("/api/"):]
+    first = client.get(path)
+    assert first.headers["Cache-Control"] == IMMUTABLE
+    assert client.get(path, headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
+
+
+def test_clock_reads_write_timestamps_once_per_change():
+    bus = MemoryBus()
+    loads = []
+    stamps = {"houses": datetime(2026, 3, 1, 12, 0, 0, 500000), "ledger": None}
+
+    def load():
+        loads.append(1)
+        return dict(stamps)
+
+    clock = ChangeClock(load, bus, ["houses", "ledger"])
+    assert clock.last_modified(["houses", "ledger"]) == calendar.timegm((2026, 3, 1, 12, 0, 1))
+    assert clock.last_modified(["ledger"]) is None
+    assert len(loads) == 1
+
+    stamps["ledger"] = datetime(2026, 3, 2)
+    assert clock.last_modified(["ledger"]) is None
+    bus.publish("ledger")
+    assert clock.last_modified(["ledger"]) == calendar.timegm((2026, 3, 2, 0, 0, 0))
+    assert len(loads) == 2
+
+    # A change in the last couple of seconds gets no Last-Modified yet
+    stamps["houses"] = datetime.utcnow()
+    bus.publish("houses")
+    assert clock.last_modified(["houses"]) is None
+
+
+def test_policy_from_env(monkeypatch):
+    monkeypatch.setenv("HTTP_CACHE_LIVE_SCORES", "1,5")
+    policy = http_cache.policy_from_env("live_scores", http_cache.CachePolicy(2, 10, ("houses",)))
+    assert policy == (1, 5, ("houses",))
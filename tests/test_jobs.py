@@ -0,0 +1,196 @@
+import os
+import signal
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+import cloudinary_outbox
+import jobs
+from cloudinary_outbox import FakeCloudinary
+from conftest import CAPTAIN_ID_BASE
+from jobs import Worker, claim, enqueue, requeue_stale, run_job
+from models import db, Announcement, CloudinaryDeletion, Job
+
+calls = []
+
+
+@pytest.fixture
+def handlers(monkeypatch):
+    monkeypatch.setattr(jobs, "HANDLERS", dict(jobs.HANDLERS))
+    calls.clear()
+
+    @jobs.job("test.ok")
+    def ok(value):
+        calls.append(value)
+
+    @jobs.job("test.flaky", max_attempts=2, backoff=5)
+    def flaky():
+        raise RuntimeError("boom")
+
+    @jobs.job("test.limited", concurrency=1)
+    def limited():
+        pass
+
+
+@pytest.fixture
+def ctx(app):
+    with app.app_context():
+        yield
+
+
+def test_enqueue_commits_with_caller(ctx, handlers):
+    enqueue("test.ok", value=1)
+    db.session.rollback()
+    assert Job.query.count() == 0
+
+    enqueue("test.ok", value=1)
+    db.session.commit()
+    assert Job.query.one().status == "queued"
+    with pytest.raises(ValueError):
+        enqueue("test.unknown")
+
+
+def test_claim_and_run(ctx, handlers):
+    enqueue("test.ok", value=42)
+    enqueue("test.ok", delay=3600, value=43)
+    db.session.commit()
+
+    ids = claim("w1", slots=10)
+    assert len(ids) == 1
+    assert claim("w2", slots=10) == []
+    assert run_job(ids[0], "w1") == "done"
+    assert calls == [42]
+    assert Job.query.get(ids[0]).finished_at is not None
+
+
+def test_failures_back_off_then_fail(ctx, handlers):
+    enqueue("test.flaky")
+    db.session.commit()
+
+    now = datetime.utcnow()
+    [job_id] = claim("w1", slots=1, now=now)
+    assert run_job(job_id, "w1", now=now) == "queued"
+    row = Job.query.get(job_id)
+    assert timedelta(seconds=4) <= row.run_at - now <= timedelta(seconds=6)
+    assert "boom" in row.last_error
+
+    assert claim("w1", slots=1, now=now) == []
+    later = now + timedelta(seconds=10)
+    [job_id] = claim("w1", slots=1, now=later)
+    assert run_job(job_id, "w1", now=later) == "failed"
+    assert Job.query.get(job_id).attempts == 2
+
+
+def test_concurrency_limit(ctx, handlers):
+    for _ in range(3):
+        enqueue("test.limited")
+        enqueue("test.ok", value=0)
+    db.session.commit()
+
+    first = claim("w1", slots=10)
+    assert Job.query.filter(Job.id.in_(first), Job.name == "test.limited").count() == 1
+    assert len(first) == 4
+    # The limited slot is taken until that job finishes
+    assert claim("w2", slots=10) == []
+    limited_id = Job.query.filter(Job.id.in_(first), Job.name == "test.limited").one().id
+    run_job(limited_id, "w1")
+    assert len(claim("w2", slots=10)) == 1
+
+
+def test_key_keeps_one_queued_job(ctx, handlers):
+    first = enqueue("test.ok", delay=600, key="k", value=1)
+    db.session.commit()
+    second = enqueue("test.ok", key="k", value=1)
+    db.session.commit()
+    assert first.id == second.id
+    assert Job.query.count() == 1
+    assert Job.query.one().run_at <= datetime.utcnow()
+
+
+def test_stale_jobs_are_requeued(ctx, handlers):
+    enqueue("test.ok", value=1)
+    db.session.commit()
+    [job_id] = claim("dead-worker", slots=1)
+
+    later = datetime.utcnow() + jobs.JOB_TIMEOUT + timedelta(seconds=1)
+    assert requeue_stale(now=later) == 1
+    db.session.commit()
+    [again] = claim("w2", slots=1, now=later)
+    assert again == job_id
+    # The vanished worker can no longer finish it
+    assert jobs._finish(job_id, "dead-worker", status="done") == 0
+
+
+def test_worker_runs_jobs(app, handlers):
+    with app.app_context():
+        for value in range(3):
+            enqueue("test.ok", value=value)
+        db.session.commit()
+
+    # One slot: the in-memory database is a single shared connection
+    worker = Worker(app, concurrency=1, poll_interval=0.01)
+    assert worker.poll() == 1
+    worker._pool.shutdown(wait=True)
+    assert calls == [0]
+
+
+def test_deleted_image_is_destroyed_by_job(app, captain_client, monkeypatch):
+    fake = FakeCloudinary()
+    monkeypatch.setattr(cloudinary_outbox, "default_client", fake)
+    with app.app_context():
+        announcement = Announcement.query.filter_by(captain_id=CAPTAIN_ID_BASE + 1).first()
+        announcement.image_url = "https://res.cloudinary.com/demo/image/upload/v1/announcements/a1.jpg"
+        announcement.image_public_id = "announcements/a1"
+        db.session.commit()
+        announcement_id = announcement.id
+
+    captain_client.delete(f"/api/captain/announcements/{announcement_id}/delete")
+
+    with app.app_context():
+        [job_id] = claim("w1", slots=5)
+        assert run_job(job_id, "w1") == "done"
+        assert fake.deleted == ["announcements/a1"]
+        assert CloudinaryDeletion.query.count() == 0
+
+
+def test_worker_entry_point_runs_registered_jobs(app, tmp_path):
+    """`python jobs.py work`, as the Procfile starts it, sees the app's handlers."""
+    url = f"sqlite:///{tmp_path / 'jobs.db'}"
+    in_memory = app.config["SQLALCHEMY_DATABASE_URI"]
+    app.config["SQLALCHEMY_DATABASE_URI"] = url
+    try:
+        with app.app_context():
+            db.create_all()
+            enqueue("cloudinary.drain", key="outbox")
+            db.session.commit()
+            job_id = Job.query.one().id
+            db.session.remove()
+            db.get_engine().dispose()
+
+        env = dict(os.environ, DATABASE_URL=url, CACHE_BUS="memory", ACCESS_LOG_FILE="")
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        worker = subprocess.Popen(
+            [sys.executable, "jobs.py", "work", "--poll", "0.1"], cwd=root, env=env,
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+        )
+        try:
+            deadline = time.monotonic() + 30
+            with app.app_context():
+                while time.monotonic() < deadline:
+                    row = db.session.get(Job, job_id)
+                    if row.status in ("done", "failed") or row.last_error:
+                        break
+                    db.session.remove()
+                    time.sleep(0.2)
+                assert row.status == "done", row.last_error
+        finally:
+            worker.send_signal(signal.SIGTERM)
+            worker.wait(10)
+    finally:
+        with app.app_context():
+            db.session.remove()
+            db.get_engine().dispose()
+        app.config["SQLALCHEMY_DATABASE_URI"] = in_memory
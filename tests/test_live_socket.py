@@ -0,0 +1,154 @@
+import json
+import queue
+import threading
+
+import pytest
+
+import app as web
+from ws_hub import RESYNC, Hub, PostgresBroker, parse_topics, serve
+
+
+def received(conn, timeout=2):
+    payload = conn.next(timeout=timeout)
+    return json.loads(payload) if payload else None
+
+
+@pytest.fixture
+def hub():
+    return Hub(shards=2, queue_size=3)
+
+
+def test_topics_reach_their_subscribers_once(hub):
+    everyone = hub.connect(["global"])
+    house_2 = hub.connect(["house:2"])
+    both = hub.connect(["global", "house:1"])
+
+    hub.publish(["global", "house:1"], {"type": "announcement", "id": 1})
+    assert received(everyone)["id"] == 1
+    assert received(both)["id"] == 1
+    assert both.next(timeout=0.1) is None
+    assert house_2.next(timeout=0.1) is None
+
+    hub.unsubscribe(both, ["global"])
+    hub.publish(["global"], {"type": "announcement", "id": 2})
+    assert received(everyone)["id"] == 2
+    assert both.next(timeout=0.1) is None
+
+
+def test_fan_out_to_many_connections():
+    hub = Hub(shards=4)
+    conns = [hub.connect(["global"]) for _ in range(2000)]
+    hub.publish(["global"], {"type": "points", "version": 7})
+    assert all(received(c)["version"] == 7 for c in conns)
+    assert hub.stats()["connections"] == 2000
+
+
+def test_slow_client_gets_resync_then_is_dropped(hub):
+    slow = hub.connect(["global"])
+    for i in range(4):
+        hub.publish(["global"], {"id": i})
+    hub.publish(["global"], {"id": 4})
+    # Four messages overflowed a queue of three: replaced by one resync
+    assert slow.next(timeout=2) == RESYNC
+    assert received(slow)["id"] == 4
+
+    for i in range(10):
+        hub.publish(["global"], {"id": i})
+    for _ in range(50):
+        if slow.closed:
+            break
+        threading.Event().wait(0.02)
+    assert slow.closed
+    assert hub.stats()["connections"] == 0
+
+
+def test_parse_topics():
+    assert parse_topics("global, house:3,admin,house:x") == ["global", "house:3"]
+    assert parse_topics(["house:1", 5]) == ["house:1"]
+    assert parse_topics(None) == []
+
+
+class FakeListener:
+    def __init__(self):
+        self.handlers = []
+
+    def subscribe(self, channel, handler):
+        self.handlers.append(handler)
+
+    def notify(self, channel, payload):
+        for handler in self.handlers:
+            handler(payload)
+
+
+def test_postgres_broker_reaches_other_workers_once():
+    listener = FakeListener()
+    here, there = Hub(PostgresBroker(None, listener)), Hub(PostgresBroker(None, listener))
+    mine, theirs = here.connect(["global"]), there.connect(["global"])
+
+    here.publish(["global"], {"id": 1})
+    here.publish(["global"], {"id": 2, "content": "x" * 9000})
+    assert [received(mine)["id"] for _ in range(2)] == [1, 2]
+    assert mine.next(timeout=0.1) is None
+    assert received(theirs)["id"] == 1
+    # Too big for NOTIFY: the other worker's clients are told to refetch
+    assert theirs.next(timeout=2) == RESYNC
+
+
+class FakeSocket:
+    def __init__(self):
+        self.inbox = queue.SimpleQueue()
+        self.sent = queue.SimpleQueue()
+
+    def send(self, payload):
+        self.sent.put(json.loads(payload))
+
+    def receive(self, timeout=None):
+        message = self.inbox.get(timeout=timeout)
+        if message is None:
+            raise ConnectionError("closed")
+        return message
+
+
+def test_serve_sends_and_applies_subscriptions(hub):
+    ws = FakeSocket()
+    thread = threading.Thread(target=serve, args=(ws, hub, ["global"]), kwargs={"heartbeat": 0.2}, daemon=True)
+    thread.start()
+    assert ws.sent.get(timeout=2) == {"type": "subscribed", "topics": ["global"]}
+
+    ws.inbox.put(json.dumps({"subscribe": ["house:4"], "unsubscribe": ["global"]}))
+    assert ws.sent.get(timeout=2) == {"type": "subscribed", "topics": ["house:4"]}
+    hub.publish(["global"], {"id": 1})
+    hub.publish(["house:4"], {"id": 2})
+    assert ws.sent.get(timeout=2) == {"id": 2}
+    # Nothing to send for a while: a heartbeat
+    assert ws.sent.get(timeout=2) == {"type": "ping"}
+
+    # The client closing ends the handler too
+    ws.inbox.put(None)
+    thread.join(2)
+    assert not thread.is_alive()
+    assert hub.stats()["connections"] == 0
+
+
+def test_idle_hub_queues_nothing(hub):
+    # A web worker publishes for the socket service but holds no sockets itself
+    hub.publish(["global"], {"id": 1})
+    assert all(shard.inbox.empty() for shard in hub._shards)
+
+
+def test_write_routes_publish(app, captain_client, admin_client):
+    with app.app_context():
+        conn = web.live_hub.for_tenant().connect(["global"])
+    try:
+        captain_client.post("/api/captain/announcements/create", json={"title": "Live", "content": "Now"})
+        message = received(conn)
+        assert message["type"] == "announcement"
+        assert message["announcement"]["title"] == "Live"
+        assert message["announcement"]["house_name"] == "House 1"
+
+        admin_client.post("/api/admin/points/add", json={"house_id": 2, "points": 5, "reason": "Quiz"})
+        message = received(conn)
+        assert message["type"] == "points"
+        assert next(h for h in message["houses"] if h["id"] == 2)["points"] == 205
+    finally:
+        web.live_hub.for_tenant().disconnect(conn)
@@ -0,0 +1,81 @@
+import threading
+import time
+
+from cache_bus import NamespacedBus, PostgresBus
+from live_updates import InProcessNotifier, PostgresNotifier, StandingsFeed
+from models import db
+from seasons import close_season
+from standings import StandingsEngine
+
+
+class FakeListener:
+    def __init__(self):
+        self.handlers = []
+
+    def subscribe(self, channel, handler):
+        self.handlers.append(handler)
+
+    def notify(self, channel, payload):
+        for handler in self.handlers:
+            handler(payload)
+
+
+def test_postgres_notifier_delivers_once_per_worker():
+    listener = FakeListener()
+    here, there = PostgresNotifier(None, listener), PostgresNotifier(None, listener)
+    seen_here, seen_there = [], []
+    here.subscribe(seen_here.append)
+    there.subscribe(seen_there.append)
+
+    here.publish(7)
+    assert seen_here == [7]
+    assert seen_there == [7]
+    assert there.version == 7
+
+
+def test_postgres_bus_invalidates_once_per_worker():
+    listener = FakeListener()
+    here = NamespacedBus(PostgresBus(None, listener), "school:")
+    there = NamespacedBus(PostgresBus(None, listener), "school:")
+    heard_here, heard_there = [], []
+    here.subscribe("ledger", heard_here.append)
+    there.subscribe("ledger", heard_there.append)
+
+    here.publish("ledger")
+    assert heard_here == ["ledger"]
+    assert heard_there == ["ledger"]
+
+
+def test_season_reset_takes_a_standings_version(app):
+    with app.app_context():
+        engine = StandingsEngine()
+        before, _ = engine.snapshot()
+
+        season, _, version = close_season(db.session, "Reset", reset_points=True)
+        assert version == before + 1
+
+        # A worker hearing the version reloads the zeroed totals
+        engine.observe(version)
+        after, ranked = engine.snapshot()
+        assert after == version
+        assert {h.points for h in ranked} == {0}
+        assert close_season(db.session, "Kept")[2] is None
+
+
+def test_waiters_beyond_the_cap_are_answered_at_once():
+    notifier = InProcessNotifier()
+    feed = StandingsFeed(notifier, lambda: (notifier.version, b"{}"), slots=threading.BoundedSemaphore(1))
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(feed.wait(0, 5)))
+    waiter.start()
+    time.sleep(0.1)
+
+    started = time.monotonic()
+    assert feed.wait(0, 5) == (0, None)
+    assert time.monotonic() - started < 1
+
+    notifier.publish(1)
+    waiter.join(2)
+    assert results == [(1, b"{}")]
+    # The slot is free again
+    assert feed.slots.acquire(blocking=False)
@@ -0,0 +1,169 @@
+import random
+import threading
+
+import pytest
+
+from conftest import APPROVED_EVENTS, HOUSES, login, reset_state, seed
+from models import db, House, PointTransaction, StandingsClock
+from standings import StandingsEngine, next_version
+
+HOUSE_ID = 1
+THREADS = 8
+REQUESTS_PER_THREAD = 30
+
+
+@pytest.fixture
+def file_app(app, tmp_path):
+    """The app on a SQLite file, so that every thread has its own connection."""
+    in_memory = app.config["SQLALCHEMY_DATABASE_URI"]
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'points.db'}"
+    with app.app_context():
+        db.create_all()
+        seed()
+        db.session.remove()
+    reset_state()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.get_engine().dispose()
+    app.config["SQLALCHEMY_DATABASE_URI"] = in_memory
+    reset_state()
+
+
+def house_row(app):
+    with app.app_context():
+        house = House.query.get(HOUSE_ID)
+        ledger = db.session.query(db.func.sum(PointTransaction.points_change)).filter_by(house_id=HOUSE_ID).scalar()
+        return house.house_points, house.version, ledger or 0
+
+
+def test_deduct_respects_floor(admin_client):
+    body = admin_client.post("/api/admin/points/deduct", json={"house_id": HOUSE_ID, "points": 99, "reason": "Fine"}).get_json()
+    assert body["house"]["points"] == 1
+
+    response = admin_client.post("/api/admin/points/deduct", json={"house_id": HOUSE_ID, "points": 2, "reason": "Fine"})
+    assert response.status_code == 400
+    assert response.get_json()["points"] == 1
+    assert admin_client.post("/api/admin/points/deduct", json={"house_id": 999, "points": 2, "reason": "Fine"}).status_code == 404
+
+
+def test_stale_version_is_rejected(admin_client):
+    body = admin_client.post("/api/admin/points/add", json={"house_id": HOUSE_ID, "points": 5, "reason": "Quiz"}).get_json()
+    seen = body["house"]["version"]
+    admin_client.post("/api/admin/points/add", json={"house_id": HOUSE_ID, "points": 5, "reason": "Quiz"})
+
+    stale = admin_client.post(
+        "/api/admin/points/deduct", json={"house_id": HOUSE_ID, "points": 3, "reason": "Late", "version": seen}
+    )
+    assert stale.status_code == 409
+    current = stale.get_json()
+    assert current["version"] == seen + 1 and current["points"] == 110
+
+    retried = admin_client.post(
+        "/api/admin/points/deduct", json={"house_id": HOUSE_ID, "points": 3, "reason": "Late", "version": current["version"]}
+    ).get_json()
+    assert retried["house"] == {"id": HOUSE_ID, "name": "House 1", "points": 107, "version": seen + 2}
+
+
+def test_standings_apply_only_the_next_version(app):
+    with app.app_context():
+        first = next_version()
+        second = next_version()
+        db.session.commit()
+        assert second == first + 1
+
+        engine = StandingsEngine()
+        version, ranked = engine.snapshot()
+        assert version == second
+        points = engine.get(HOUSE_ID).points
+
+        # Contiguous: applied in place
+        engine.apply({HOUSE_ID: 5}, version + 1)
+        assert engine.version == version + 1 and engine.get(HOUSE_ID).points == points + 5
+
+        # A gap means someone else's change is missing: reload from the database
+        engine.apply({HOUSE_ID: 5}, version + 3)
+        assert engine.snapshot()[0] == second
+        assert engine.get(HOUSE_ID).points == points
+
+        # Hearing of a version we have already loaded changes nothing
+        engine.observe(second)
+        assert engine._snapshot is not None
+
+
+def test_concurrent_add_and_deduct_keep_ledger_and_totals_in_step(file_app):
+    start_points, start_version, start_ledger = house_row(file_app)
+    with file_app.app_context():
+        start_clock = next_version()
+        db.session.commit()
+    results = []
+    errors = []
+    lock = threading.Lock()
+
+    def hammer(seed_value):
+        rng = random.Random(seed_value)
+        client = login(file_app.test_client(), "admin")
+        for _ in range(REQUESTS_PER_THREAD):
+            # Deductions outweigh additions so the floor is hit often
+            if rng.random() < 0.6:
+                url, points, sign = "/api/admin/points/deduct", rng.randint(1, 30), -1
+            else:
+                url, points, sign = "/api/admin/points/add", rng.randint(1, 20), 1
+            try:
+                response = client.post(url, json={"house_id": HOUSE_ID, "points": points, "reason": "Stress"})
+                with lock:
+                    results.append((response.status_code, sign * points, response.get_json()))
+            except Exception as e:
+                with lock:
+                    errors.append(e)
+
+    threads = [threading.Thread(target=hammer, args=(i,)) for i in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert {status for status, _, _ in results} <= {200, 400, 409}
+    applied = [(change, body) for status, change, body in results if status == 200]
+    assert any(status == 400 for status, _, _ in results), "the floor was never reached"
+
+    points, version, ledger = house_row(file_app)
+    assert points == start_points + sum(change for change, _ in applied)
+    assert points - start_points == ledger - start_ledger
+    assert version == start_version + len(applied)
+    assert points >= 0 and all(body["house"]["points"] >= 0 for _, body in applied)
+    # Every successful change saw a version of its own
+    assert len({body["house"]["version"] for _, body in applied}) == len(applied)
+
+    # One standings version per change, none lost to the race
+    with file_app.app_context():
+        assert db.session.query(StandingsClock.version).scalar() == start_clock + len(applied)
+
+    standings = file_app.test_client().get("/api/live-points").get_json()
+    assert next(s["points"] for s in standings if s["name"] == "House 1") == points
+
+
+def test_concurrent_approvals_award_once(file_app):
+    event_id = APPROVED_EVENTS + 1
+    with file_app.app_context():
+        ledger = PointTransaction.query.count()
+    statuses = []
+    barrier = threading.Barrier(4)
+
+    def approve():
+        client = login(file_app.test_client(), "admin")
+        barrier.wait()
+        statuses.append(client.post("/api/admin/events/approve", json={"event_ids": [event_id]}).status_code)
+
+    threads = [threading.Thread(target=approve) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(statuses)[0] == 200 and statuses.count(200) == 1
+    assert set(statuses) <= {200, 404, 409}
+    with file_app.app_context():
+        # One award per house with points (the last place scores nothing)
+        assert PointTransaction.query.count() - ledger == HOUSES - 1
@@ -0,0 +1,139 @@
+from conftest import (
+    ACHIEVEMENTS_PER_HOUSE, ANNOUNCEMENTS_PER_HOUSE, APPROVED_EVENTS, HOUSES,
+    MEMBERS_PER_HOUSE, OPEN_EVENTS, SEASONS
+)
+from logos import logo_token
+from models import db, Announcement
+
+
+def test_houses_sorted_by_name(client):
+    houses = client.get("/api/houses").get_json()
+    assert [h["name"] for h in houses] == sorted(f"House {h}" for h in range(1, HOUSES + 1))
+    assert {h["points"] for h in houses} == {100 * h for h in range(1, HOUSES + 1)}
+
+
+def test_live_points_ranked(client):
+    standings = client.get("/api/live-points").get_json()
+    assert [s["rank"] for s in standings] == list(range(1, HOUSES + 1))
+    assert standings[0]["name"] == f"House {HOUSES}"
+    assert standings[0]["points"] >= standings[-1]["points"]
+
+
+def test_live_points_wait_returns_current_version(client):
+    body = client.get("/api/live-points/wait?timeout=0").get_json()
+    assert body["changed"] is True
+    assert len(body["standings"]) == HOUSES
+
+    unchanged = client.get(f"/api/live-points/wait?version={body['version']}&timeout=0").get_json()
+    assert unchanged == {"version": body["version"], "changed": False}
+
+    for timeout in ("nan", "inf", "-inf"):
+        assert client.get(f"/api/live-points/wait?version={body['version']}&timeout={timeout}").status_code == 400
+
+
+def test_members_grouped_by_house(client):
+    groups = client.get("/api/members").get_json()
+    assert len(groups) == HOUSES
+    assert all(len(g["members"]) == MEMBERS_PER_HOUSE for g in groups)
+
+
+def test_members_of_one_house(client):
+    groups = client.get("/api/members?house=House 2").get_json()
+    assert [g["house"]["name"] for g in groups] == ["House 2"]
+    assert client.get("/api/members?house=Nowhere").status_code == 404
+
+
+def test_member_search(client):
+    body = client.get("/api/members/search?q=zai&house=House 3&limit=5").get_json()
+    assert body["query"] == "zai"
+    assert 0 < len(body["results"]) <= 5
+    assert all("Zainab" in r["name"] and r["house"]["name"] == "House 3" for r in body["results"])
+
+    assert client.get("/api/members/search").status_code == 400
+    assert len(client.get("/api/members/search?q=member&limit=1000").get_json()["results"]) == 50
+
+
+def test_announcements_newest_first(client):
+    announcements = client.get("/api/announcements").get_json()
+    assert len(announcements) == HOUSES * ANNOUNCEMENTS_PER_HOUSE
+    dates = [a["created_at"] for a in announcements]
+    assert dates == sorted(dates, reverse=True)
+    assert announcements[0]["house"]["name"] and announcements[0]["captain"]["username"]
+
+
+def test_announcements_without_captain(client, app):
+    with app.app_context():
+        announcement = Announcement.query.order_by(Announcement.created_at.desc()).first()
+        announcement.captain_id = None
+        db.session.commit()
+        kept_name = announcement.captain_name
+    announcements = client.get("/api/announcements").get_json()
+    assert len(announcements) == HOUSES * ANNOUNCEMENTS_PER_HOUSE
+    assert announcements[0]["captain"] == {"id": None, "username": None, "name": kept_name}
+
+
+def test_house_profile(client):
+    profile = client.get("/api/houses/3/profile").get_json()
+    assert profile["name"] == "House 3"
+    assert profile["member_count"] == MEMBERS_PER_HOUSE
+    assert len(profile["achievements"]) == ACHIEVEMENTS_PER_HOUSE
+    assert profile["rank"] == HOUSES - 2
+    assert client.get("/api/houses/999/profile").status_code == 404
+
+
+def test_achievements_filtered_by_house(client):
+    assert len(client.get("/api/achievements").get_json()) == HOUSES * ACHIEVEMENTS_PER_HOUSE
+    mine = client.get("/api/achievements?house_id=2").get_json()
+    assert len(mine) == ACHIEVEMENTS_PER_HOUSE
+    assert {a["house"]["id"] for a in mine} == {2}
+
+
+def test_house_announcements_pages(client):
+    seen = []
+    url = "/api/houses/1/announcements?limit=7"
+    while url:
+        page = client.get(url).get_json()
+        assert len(page["announcements"]) <= 7
+        seen += [a["id"] for a in page["announcements"]]
+        url = page["next_cursor"] and f"/api/houses/1/announcements?limit=7&cursor={page['next_cursor']}"
+    assert len(seen) == len(set(seen)) == ANNOUNCEMENTS_PER_HOUSE
+
+    assert client.get("/api/houses/999/announcements").status_code == 404
+    assert client.get("/api/houses/1/announcements?cursor=nonsense").status_code == 400
+
+
+def test_events_with_results(client):
+    events = client.get("/api/events").get_json()
+    assert len(events) == APPROVED_EVENTS + OPEN_EVENTS
+    approved = [e for e in events if e["status"] == "approved"]
+    assert len(approved) == APPROVED_EVENTS
+    assert all(len(e["results"]) == HOUSES for e in approved)
+    assert all(e["results"] == [] for e in events if e["status"] == "open")
+
+
+def test_seasons_with_standings(client):
+    seasons = client.get("/api/seasons").get_json()
+    assert len(seasons) == SEASONS
+    assert all([s["rank"] for s in season["standings"]] == list(range(1, HOUSES + 1)) for season in seasons)
+
+
+def test_house_logo(client):
+    url = client.get("/api/houses/1/logo").get_json()["url"]
+    token = logo_token("House 1", None)
+    assert url.endswith(f"/api/houses/1/logo/{token}")
+
+    image = client.get(f"/api/houses/1/logo/{token}")
+    assert image.mimetype == "image/svg+xml"
+    assert "immutable" in image.headers["Cache-Control"]
+    assert client.get("/api/houses/1/logo/stale").status_code == 302
+    assert client.get("/api/houses/999/logo").status_code == 404
+
+
+def test_public_rate_limit(client, monkeypatch):
+    import app as web
+
+    monkeypatch.setattr(web.public_limiter, "burst", 2.0)
+    monkeypatch.setattr(web.public_limiter, "rate", 0.001)
+    web.public_limiter._buckets.clear()
+    statuses = [client.get("/api/houses").status_code for _ in range(3)]
+    assert statuses == [200, 200, 429]
@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta
+
+from conftest import APPROVED_EVENTS, HOUSES
+from models import House, PointTransaction, ScoreSubmission, ScoringRule
+from scoring import Result, RuleSet
+
+EVENT = APPROVED_EVENTS + 1
+DEFAULT_TABLE = [50, 30, 20, 10, 5, 0]
+
+
+def rule(id, kind, **fields):
+    return ScoringRule(id=id, name=f"{kind} {id}", kind=kind, priority=fields.pop("priority", 0), **fields)
+
+
+def test_rule_set_combines_rules():
+    now = datetime(2026, 3, 1)
+    rule_set = RuleSet([
+        rule(1, "placement", placement_points="10,5", event_id=1),
+        rule(2, "placement", placement_points="100,60", event_id=1, priority=1),
+        rule(3, "bonus", points=3, house_id=2),
+        rule(4, "multiplier", factor=1.5, starts_at=now - timedelta(days=1), ends_at=now + timedelta(days=1)),
+        rule(5, "bonus", points=100, event_id=2),
+    ])
+    tables = {1: (1, 1), 3: (7, 4)}
+    awards = rule_set.score_many(
+        [Result(1, 1, 1), Result(1, 2, 2), Result(1, 3, 3), Result(3, 1, 2)], tables, at=now
+    )
+    # The higher-priority table wins; bonuses add before the multiplier
+    assert [a.points for a in awards] == [150, 95, 0, 6]
+    assert awards[1].rules == ("placement 2", "multiplier 4", "bonus 3")
+
+    later = rule_set.score_many([Result(1, 1, 1)], tables, at=now + timedelta(days=2))
+    assert later[0].points == 100
+
+
+def test_approve_applies_rules(admin_client, app):
+    admin_client.post("/api/admin/scoring/rules/create", json={
+        "name": "Double points", "kind": "multiplier", "factor": 2
+    })
+    admin_client.post("/api/admin/scoring/rules/create", json={
+        "name": "Fair play", "kind": "bonus", "points": 5, "house_id": HOUSES, "event_id": EVENT
+    })
+    body = admin_client.post("/api/admin/events/approve", json={"event_ids": [EVENT]}).get_json()
+
+    expected = {h: 2 * p for h, p in zip(range(1, HOUSES + 1), DEFAULT_TABLE)}
+    expected[HOUSES] += 10
+    assert body["points_by_house"] == {str(h): p for h, p in expected.items()}
+    with app.app_context():
+        sub = ScoreSubmission.query.filter_by(event_id=EVENT, house_id=HOUSES).one()
+        assert sub.points_awarded == 10
+        reason = PointTransaction.query.get(sub.transaction_id).reason
+        assert reason == f"Event {EVENT}: place {HOUSES} (Fair play, Double points)"
+
+
+def test_approval_respects_the_floor(admin_client, app):
+    admin_client.post("/api/admin/scoring/rules/create", json={
+        "name": "Penalty", "kind": "bonus", "points": -1000, "house_id": 1, "event_id": EVENT
+    })
+    response = admin_client.post("/api/admin/events/approve", json={"event_ids": [EVENT]})
+    assert response.status_code == 400
+    assert response.get_json()["points"] == 100
+
+    # Nothing of the approval was kept
+    with app.app_context():
+        assert House.query.get(1).house_points == 100
+        assert ScoreSubmission.query.filter_by(event_id=EVENT, status="pending").count() == HOUSES
+
+
+def test_preview_writes_nothing(admin_client, app):
+    admin_client.post("/api/admin/scoring/rules/create", json={
+        "name": "Finals", "kind": "placement", "placement_points": [500, 0], "event_id": EVENT
+    })
+    with app.app_context():
+        before = {h.id: h.house_points for h in House.query}
+        ledger = PointTransaction.query.count()
+
+    body = admin_client.post("/api/admin/scoring/preview", json={"event_ids": [EVENT]}).get_json()
+    assert [a["points"] for a in body["awards"]] == [500, 0, 0, 0, 0, 0]
+    house_1 = next(s for s in body["standings"] if s["id"] == 1)
+    assert house_1["delta"] == 500
+    assert house_1["new_rank"] == 1 and body["standings"][0]["id"] == 1
+
+    with app.app_context():
+        assert {h.id: h.house_points for h in House.query} == before
+        assert PointTransaction.query.count() == ledger
+        assert ScoreSubmission.query.filter_by(event_id=EVENT, status="pending").count() == HOUSES
+
+    hypothetical = admin_client.post("/api/admin/scoring/preview", json={
+        "results": [{"event_id": EVENT, "house_id": 2, "placement": 1}]
+    }).get_json()
+    assert hypothetical["awards"][0]["points"] == 500
+
+
+def test_rule_changes_reach_compiled_rules(admin_client):
+    created = admin_client.post("/api/admin/scoring/rules/create", json={
+        "name": "Triple", "kind": "multiplier", "factor": 3
+    }).get_json()["rule"]
+    preview = {"results": [{"event_id": EVENT, "house_id": 1, "placement": 1}]}
+    assert admin_client.post("/api/admin/scoring/preview", json=preview).get_json()["awards"][0]["points"] == 150
+
+    assert [r["name"] for r in admin_client.get("/api/admin/scoring/rules").get_json()] == ["Triple"]
+    admin_client.delete(f"/api/admin/scoring/rules/{created['id']}/delete")
+    assert admin_client.post("/api/admin/scoring/preview", json=preview).get_json()["awards"][0]["points"] == 50
+
+
+def test_invalid_rules_are_rejected(admin_client, captain_client):
+    for body in [
+        {"kind": "bonus", "points": 1},
+        {"name": "X", "kind": "jackpot"},
+        {"name": "X", "kind": "placement", "placement_points": [-1]},
+        {"name": "X", "kind": "bonus"},
+        {"name": "X", "kind": "multiplier", "factor": 2, "starts_at": "2026-03-02", "ends_at": "2026-03-01"},
+        {"name": "X", "kind": "bonus", "points": 1, "event_id": 999},
+        {"name": "X", "kind": "bonus", "points": 1, "house_id": 999},
+    ]:
+        assert admin_client.post("/api/admin/scoring/rules/create", json=body).status_code == 400
+    assert admin_client.post("/api/admin/scoring/preview", json={}).status_code == 400
+    assert captain_client.post("/api/admin/scoring/preview", json={"event_ids": [EVENT]}).status_code == 403
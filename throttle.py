@@ -0,0 +1,100 @@
+"""
+Load shedding for the hot public endpoints.
+
+* SingleFlight - concurrent callers asking for the same key share one call
+                 (one query, one serialization) instead of stampeding the DB
+* RateLimiter  - per-client token buckets kept in memory, checked before any
+                 database work so abusive pollers cost almost nothing
+"""
+import threading
+import time
+from functools import wraps
+
+from flask import jsonify, request
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class RateLimiter:
+    """
+    Token bucket per client: `burst` requests at once, refilled at `rate`
+    per second. Idle buckets are dropped once there are more than
+    `max_clients` of them, so memory stays bounded.
+    """
+
+    def __init__(self, rate, burst, max_clients=10000):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.max_clients = max_clients
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def hit(self, client, cost=1.0):
+        """Take a token. Returns 0 if allowed, else seconds until one is available."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(client, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens >= cost:
+                self._buckets[client] = (tokens - cost, now)
+                wait = 0.0
+            else:
+                self._buckets[client] = (tokens, now)
+                wait = (cost - tokens) / self.rate
+            if len(self._buckets) > self.max_clients:
+                self._prune(now)
+        return wait
+
+    def _prune(self, now):
+        # A bucket that would be full again carries no state worth keeping
+        refill = self.burst / self.rate
+        for client, (_, last) in list(self._buckets.items()):
+            if now - last >= refill:
+                del self._buckets[client]
+
+    def limit(self, f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            wait = self.hit(request.remote_addr or "unknown")
+            if wait:
+                response = jsonify({"error": "Too many requests"})
+                response.status_code = 429
+                response.headers["Retry-After"] = str(int(wait) + 1)
+                return response
+            return f(*args, **kwargs)
+        return decorated
@@ -0,0 +1,161 @@
+"""
+Worker warm-up and health checks.
+
+A fresh gunicorn worker has an empty connection pool, no standings, no
+cached payloads and cold import paths, so its first requests pay for all
+of that. gunicorn.conf.py runs `warmup.run()` in `post_worker_init`,
+before the worker accepts connections; for every tenant it
+
+* opens the pool's connections ("pool")
+* loads the standings engine and member search index ("standings")
+* renders the public payloads into the cache through the real routes
+  ("snapshots")
+
+Under other servers the first /readyz starts the warm-up in a thread.
+
+    /healthz  - liveness: the process answers; never touches the database
+    /readyz   - readiness: 200 once warm-up has finished, 503 before
+    /metrics  - warm-up timings in Prometheus text format
+
+A failed warm-up leaves the worker unready; the next /readyz retries it.
+"""
+import os
+import threading
+import time
+import traceback
+
+from tenants import TENANTS, TENANT_HEADER, tenant_context
+
+# Public payloads worth having in the cache before the first visitor
+WARMUP_PATHS = (
+    "/api/houses",
+    "/api/live-points",
+    "/api/members",
+    "/api/announcements",
+    "/api/events",
+    "/api/seasons",
+    "/api/achievements",
+)
+
+
+def open_pool(engine, size=None):
+    """Check out `size` connections at once (default: the pool size) and return them idle."""
+    if size is None:
+        pool_size = getattr(engine.pool, "size", None)
+        size = pool_size() if callable(pool_size) else 1
+    connections = []
+    try:
+        for _ in range(max(size, 1)):
+            connection = engine.connect()
+            connection.exec_driver_sql("SELECT 1")
+            connections.append(connection)
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+
+class WarmUp:
+    """
+    Runs the registered steps once per tenant and keeps the timings.
+    Steps are `fn(app, tenant)` registered with `@warmup.step(name)`.
+    """
+
+    def __init__(self, app=None):
+        self.app = app
+        self.steps = []
+        self.state = "pending"
+        self.error = None
+        self.started_at = None
+        self.seconds = None
+        # step name -> seconds, summed over tenants
+        self.phases = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def step(self, name):
+        def register(fn):
+            self.steps.append((name, fn))
+            return fn
+        return register
+
+    @property
+    def ready(self):
+        return self.state == "ready"
+
+    def run(self):
+        with self._lock:
+            if self.state in ("running", "ready"):
+                return self.ready
+            self.state = "running"
+        self.error = None
+        self.started_at = time.time()
+        started = time.perf_counter()
+        phases = {name: 0.0 for name, _ in self.steps}
+        try:
+            for tenant in TENANTS.values():
+                for name, fn in self.steps:
+                    step_started = time.perf_counter()
+                    with tenant_context(self.app, tenant):
+                        fn(self.app, tenant)
+                    phases[name] += time.perf_counter() - step_started
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            self.state = "failed"
+            print(f"❌ Warm-up failed in worker {os.getpid()}: {self.error}")
+            traceback.print_exc()
+        else:
+            self.state = "ready"
+            print(f"🔥 Worker {os.getpid()} warm in {time.perf_counter() - started:.2f}s")
+        self.phases = phases
+        self.seconds = time.perf_counter() - started
+        return self.ready
+
+    def run_in_background(self):
+        with self._lock:
+            if self.state in ("running", "ready") or (self._thread and self._thread.is_alive()):
+                return
+            self._thread = threading.Thread(target=self.run, daemon=True)
+            self._thread.start()
+
+    def status(self):
+        return {
+            "status": self.state,
+            "pid": os.getpid(),
+            "warmup_seconds": round(self.seconds, 3) if self.seconds is not None else None,
+            "phases": {name: round(seconds, 3) for name, seconds in self.phases.items()},
+            "error": self.error,
+        }
+
+    def metrics(self):
+        """Prometheus text exposition of this worker's warm-up."""
+        pid = os.getpid()
+        lines = [
+            "# HELP houses_worker_ready Whether this worker finished its warm-up.",
+            "# TYPE houses_worker_ready gauge",
+            f'houses_worker_ready{{pid="{pid}"}} {int(self.ready)}',
+            "# HELP houses_warmup_seconds Time spent warming this worker up, by phase.",
+            "# TYPE houses_warmup_seconds gauge",
+        ]
+        if self.seconds is not None:
+            lines.append(f'houses_warmup_seconds{{pid="{pid}",phase="total"}} {self.seconds:.6f}')
+            for name, seconds in self.phases.items():
+                lines.append(f'houses_warmup_seconds{{pid="{pid}",phase="{name}"}} {seconds:.6f}')
+        if self.started_at is not None:
+            lines += [
+                "# HELP houses_warmup_started_timestamp_seconds When the last warm-up started.",
+                "# TYPE houses_warmup_started_timestamp_seconds gauge",
+                f'houses_warmup_started_timestamp_seconds{{pid="{pid}"}} {self.started_at:.3f}',
+            ]
+        return "\n".join(lines) + "\n"
+
+
+def warm_paths(app, tenant, paths=WARMUP_PATHS):
+    """GET each path through the app so the route caches fill exactly as for visitors."""
+    client = app.test_client()
+    # A bucket of its own so warm-up never eats a real client's rate limit
+    environ = {"REMOTE_ADDR": f"warmup:{tenant.slug}"}
+    for path in paths:
+        response = client.get(path, headers={TENANT_HEADER: tenant.slug}, environ_base=environ)
+        if response.status_code >= 500:
+            raise RuntimeError(f"{path} returned {response.status_code} during warm-up")
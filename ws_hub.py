@@ -0,0 +1,316 @@
+"""
+WebSocket fan-out for live announcements and points.
+
+Clients connect to /ws and pick topics, either in the URL
+(`/ws?topics=global,house:3`) or later by sending
+
+    {"subscribe": ["house:3"]}      {"unsubscribe": ["house:3"]}
+
+Write routes publish after they commit; a new announcement goes to
+"global" and to its house's topic. Every message is JSON with a "type".
+
+* Each message is encoded once, however many sockets receive it.
+* Connections are spread over a few fan-out threads (shards). Publishing
+  only hands the message to each shard's inbox, so a write route never
+  waits on a socket.
+* Every connection has a bounded send queue, drained by that socket's own
+  handler. A client that falls behind loses its queue and gets a single
+  {"type": "resync"} instead (refetch over HTTP); one that still hasn't
+  taken that resync when the queue overflows again is closed.
+* A socket's handler sleeps on its queue and a reader sleeps on the
+  socket; nothing polls.
+
+Brokers carry messages between gunicorn workers:
+* InProcessBroker - this process only (tests, single worker)
+* PostgresBroker  - LISTEN/NOTIFY on the app's database
+
+The /ws route is served by its own gevent service (ws_server.py), so open
+sockets never hold the web workers' request threads.
+"""
+import itertools
+import json
+import queue
+import re
+import threading
+import uuid
+from collections import deque
+
+from pg_notify import PgChannelListener
+
+QUEUE_SIZE = 100
+SHARDS = 4
+MAX_TOPICS = 20
+HEARTBEAT_SECONDS = 25
+# NOTIFY payloads are capped at 8000 bytes
+NOTIFY_LIMIT = 7900
+
+GLOBAL = "global"
+TOPIC_RE = re.compile(r"^(global|house:\d+)$")
+RESYNC = json.dumps({"type": "resync"})
+HEARTBEAT = json.dumps({"type": "ping"})
+
+_ids = itertools.count(1)
+
+
+def house_topic(house_id):
+    return f"house:{house_id}"
+
+
+def parse_topics(value):
+    """Valid topics from a list or a comma-separated string; unknown ones are ignored."""
+    if isinstance(value, str):
+        value = value.split(",")
+    if not isinstance(value, list):
+        return []
+    return [t.strip() for t in value if isinstance(t, str) and TOPIC_RE.match(t.strip())][:MAX_TOPICS]
+
+
+class Connection:
+    """One socket's subscriptions and bounded send queue."""
+
+    def __init__(self, queue_size=QUEUE_SIZE):
+        self.id = next(_ids)
+        self.topics = set()
+        self.queue_size = queue_size
+        self.dropped = 0
+        self.closed = False
+        self._queue = deque()
+        self._cond = threading.Condition()
+
+    def offer(self, payload):
+        """Queue `payload` without blocking; False once the connection is closed."""
+        with self._cond:
+            if self.closed:
+                return False
+            if len(self._queue) >= self.queue_size:
+                if self._queue[0] is RESYNC:
+                    # Not even the resync got through: give up on this client
+                    self.closed = True
+                    self._cond.notify()
+                    return False
+                self.dropped += len(self._queue)
+                self._queue.clear()
+                payload = RESYNC
+            self._queue.append(payload)
+            self._cond.notify()
+            return True
+
+    def next(self, timeout=None):
+        """The next payload to send, or None after `timeout` or once closed."""
+        with self._cond:
+            if not self._queue and not self.closed:
+                self._cond.wait(timeout)
+            if self._queue and not self.closed:
+                return self._queue.popleft()
+            return None
+
+    def pending(self):
+        return len(self._queue)
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._queue.clear()
+            self._cond.notify()
+
+
+class _Shard:
+    def __init__(self, index):
+        self.index = index
+        self.lock = threading.Lock()
+        self.subscribers = {}
+        self.connections = set()
+        self.inbox = queue.SimpleQueue()
+        self.thread = None
+
+    def run(self):
+        while True:
+            topics, payload = self.inbox.get()
+            with self.lock:
+                # Once per connection, whichever of its topics matched
+                targets = set()
+                for topic in topics:
+                    targets.update(self.subscribers.get(topic, ()))
+                closed = [conn for conn in targets if not conn.offer(payload)]
+            for conn in closed:
+                self.remove(conn)
+
+    def remove(self, conn):
+        with self.lock:
+            self.connections.discard(conn)
+            for topic in conn.topics:
+                subscribers = self.subscribers.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(conn)
+                    if not subscribers:
+                        del self.subscribers[topic]
+
+
+class InProcessBroker:
+    def __init__(self):
+        self._handlers = []
+
+    def subscribe(self, handler):
+        """Call `handler(topics, payload)` for every message published to this worker."""
+        self._handlers.append(handler)
+
+    def publish(self, topics, payload):
+        self._deliver(topics, payload)
+
+    def _deliver(self, topics, payload):
+        for handler in self._handlers:
+            handler(topics, payload)
+
+
+class PostgresBroker(InProcessBroker):
+    def __init__(self, dsn, listener=None, channel="live_ws"):
+        super().__init__()
+        self.channel = channel
+        # Our own NOTIFYs come back to us; the origin tells them apart
+        self.origin = uuid.uuid4().hex
+        self.listener = listener or PgChannelListener(dsn)
+        self.listener.subscribe(self.channel, self._receive)
+
+    def publish(self, topics, payload):
+        self._deliver(topics, payload)
+        note = json.dumps({"origin": self.origin, "topics": topics, "payload": payload})
+        if len(note.encode()) > NOTIFY_LIMIT:
+            # Too big for NOTIFY: the other workers' clients refetch instead
+            note = json.dumps({"origin": self.origin, "topics": topics, "payload": RESYNC})
+        self.listener.notify(self.channel, note)
+
+    def _receive(self, note):
+        message = json.loads(note)
+        if message["origin"] != self.origin:
+            self._deliver(message["topics"], message["payload"])
+
+
+def make_broker(kind, database_url=None, channel="live_ws", listener=None):
+    if kind is None:
+        is_postgres = bool(database_url) and database_url.startswith("postgresql")
+        kind = "postgres" if is_postgres else "memory"
+    if kind == "postgres":
+        if not database_url or not database_url.startswith("postgresql"):
+            raise RuntimeError("LIVE_BROKER=postgres needs a Postgres DATABASE_URL")
+        return PostgresBroker(database_url, listener, channel)
+    return InProcessBroker()
+
+
+class Hub:
+    def __init__(self, broker=None, shards=SHARDS, queue_size=QUEUE_SIZE):
+        self.broker = broker or InProcessBroker()
+        self.broker.subscribe(self._fan_out)
+        self.queue_size = queue_size
+        self.published = 0
+        self._shards = [_Shard(i) for i in range(shards)]
+        self._lock = threading.Lock()
+
+    def _shard(self, conn):
+        return self._shards[conn.id % len(self._shards)]
+
+    def _ensure_started(self):
+        # Started lazily so gunicorn's fork happens before the threads exist
+        with self._lock:
+            for shard in self._shards:
+                if shard.thread is None or not shard.thread.is_alive():
+                    shard.thread = threading.Thread(
+                        target=shard.run, name=f"ws-fanout-{shard.index}", daemon=True
+                    )
+                    shard.thread.start()
+
+    def connect(self, topics=()):
+        self._ensure_started()
+        conn = Connection(self.queue_size)
+        with self._shard(conn).lock:
+            self._shard(conn).connections.add(conn)
+        self.subscribe(conn, topics)
+        return conn
+
+    def subscribe(self, conn, topics):
+        shard = self._shard(conn)
+        with shard.lock:
+            for topic in topics:
+                if len(conn.topics) >= MAX_TOPICS:
+                    break
+                conn.topics.add(topic)
+                shard.subscribers.setdefault(topic, set()).add(conn)
+
+    def unsubscribe(self, conn, topics):
+        shard = self._shard(conn)
+        with shard.lock:
+            for topic in topics:
+                conn.topics.discard(topic)
+                subscribers = shard.subscribers.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(conn)
+                    if not subscribers:
+                        del shard.subscribers[topic]
+
+    def disconnect(self, conn):
+        conn.close()
+        self._shard(conn).remove(conn)
+
+    def publish(self, topics, message):
+        """Send `message` (a dict) to every socket subscribed to any of `topics`."""
+        self.broker.publish(list(topics), json.dumps(message, separators=(",", ":")))
+
+    def _fan_out(self, topics, payload):
+        self.published += 1
+        for shard in self._shards:
+            # Web workers publish but hold no sockets: nothing would drain the inbox
+            if shard.connections:
+                shard.inbox.put((topics, payload))
+
+    def stats(self):
+        connections = [c for s in self._shards for c in list(s.connections)]
+        return {
+            "connections": len(connections),
+            "queued": sum(c.pending() for c in connections),
+            "dropped": sum(c.dropped for c in connections),
+            "published": self.published,
+        }
+
+
+def _subscribed(conn):
+    return json.dumps({"type": "subscribed", "topics": sorted(conn.topics)})
+
+
+def _read(ws, hub, conn):
+    """Apply the client's (un)subscribe messages until the socket closes."""
+    try:
+        while not conn.closed:
+            text = ws.receive()
+            try:
+                message = json.loads(text)
+            except (TypeError, ValueError):
+                continue
+            if isinstance(message, dict):
+                hub.subscribe(conn, parse_topics(message.get("subscribe")))
+                hub.unsubscribe(conn, parse_topics(message.get("unsubscribe")))
+                # Sent by serve(), the socket's only writer
+                conn.offer(_subscribed(conn))
+    except Exception:
+        # The client went away (flask-sock raises ConnectionClosed)
+        pass
+    finally:
+        hub.disconnect(conn)
+
+
+def serve(ws, hub, topics=(), heartbeat=HEARTBEAT_SECONDS):
+    """
+    Run one socket until it closes: send what the hub queues for it while a
+    reader applies the client's messages. `ws` is a flask-sock socket.
+    """
+    conn = hub.connect(topics)
+    ws.send(_subscribed(conn))
+    threading.Thread(target=_read, args=(ws, hub, conn), name=f"ws-read-{conn.id}", daemon=True).start()
+    try:
+        while True:
+            payload = conn.next(timeout=heartbeat)
+            if payload is None:
+                if conn.closed:
+                    break
+                payload = HEARTBEAT
+            ws.send(payload)
+    finally:
+        hub.disconnect(conn)
@@ -0,0 +1,54 @@
+"""
+The /ws WebSocket service, run apart from the web workers:
+
+    gunicorn ws_server:app -c gunicorn_ws.conf.py
+
+It is the same Flask app with the socket route added, served by gevent
+workers (see gunicorn_ws.conf.py): each open socket is a greenlet waiting
+on its queue, not one of the web workers' request threads, so one worker
+holds thousands of them. Write routes on the web service publish through
+the Postgres broker (see ws_hub.py), which reaches these workers.
+
+Long-polls (/api/live-points/wait) belong here for the same reason; set
+LONG_POLL_MAX_WAITERS=0 on this service so they are not capped. The web
+service still answers them, up to its own cap.
+
+Browsers can't set headers on a WebSocket, so the school comes from the
+host as usual or from `?tenant=` in place of the X-Tenant header.
+"""
+from urllib.parse import parse_qs
+
+from flask import jsonify, request
+from flask_login import login_required
+from flask_sock import Sock
+
+from app import app, admin_required, live_hub
+from tenants import TENANT_HEADER
+from ws_hub import GLOBAL, parse_topics, serve
+
+TENANT_ENVIRON = "HTTP_" + TENANT_HEADER.upper().replace("-", "_")
+
+
+def tenant_from_query(wsgi_app):
+    def wrapped(environ, start_response):
+        tenant = parse_qs(environ.get("QUERY_STRING", "")).get("tenant")
+        if tenant and TENANT_ENVIRON not in environ:
+            environ[TENANT_ENVIRON] = tenant[0]
+        return wsgi_app(environ, start_response)
+    return wrapped
+
+
+app.wsgi_app = tenant_from_query(app.wsgi_app)
+sock = Sock(app)
+
+
+@sock.route('/ws')
+def live_socket(ws):
+    serve(ws, live_hub.for_tenant(), parse_topics(request.args.get('topics', GLOBAL)))
+
+
+@app.route('/api/live/stats')
+@login_required
+@admin_required
+def live_stats():
+    return jsonify(live_hub.stats())